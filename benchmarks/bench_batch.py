@@ -0,0 +1,40 @@
+"""Benchmark of the batched evaluation with BigNumArray (needs numpy).
+
+Evaluates one expression for a growing number of variable bindings, once per
+binding with BigNum and once for the whole batch with BigNumArray, and prints
+the time per binding of both.
+
+    python benchmarks/bench_batch.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from bignum import BigNum
+from bignum_array import BigNumArray
+from expr_parser import run_one, Verification
+
+EXPRESSION = "(x + y) * (x + 3) * y + x * 1000000007 - y / 7 + x % 1000"
+SIZES = [1, 10, 100, 1000]
+DIGITS = 60
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    for verification in (Verification.OFF, Verification.FINAL):
+        print(f"verification {verification.name}")
+        for size in SIZES:
+            xs = [rnd.randrange(10 ** DIGITS) for _ in range(size)]
+            ys = [rnd.randrange(10 ** DIGITS) for _ in range(size)]
+            scalar = best_time(lambda: [run_one(EXPRESSION, {"x": BigNum(x), "y": BigNum(y)}, BigNum, verification)
+                                        for x, y in zip(xs, ys)])
+            batch = best_time(lambda: run_one(EXPRESSION, {"x": BigNumArray(xs), "y": BigNumArray(ys)}, BigNumArray, verification))
+            print(f"{size:>6} bindings BigNum={scalar / size * 1e6:9.1f}us BigNumArray={batch / size * 1e6:9.1f}us per binding")
@@ -0,0 +1,47 @@
+"""Benchmark of compiled expressions against Solver.solve_normal.
+
+Evaluates a few expressions many times with different variables, with the
+tree walk of solve_normal and with the function built by expr_compile, for
+the bignum and the int backends, and prints the time of one evaluation.
+
+    python benchmarks/bench_compiled.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import *
+
+EXPRESSIONS = [
+    "x + y",
+    "(x * 2 + y * z) % 1000 + x / 7",
+    "a * x * x + b * x + c - (a + b) % 13 + sqrt (x * y)",
+    "powmod(x, y + 3, 1000000007) + gcd(x * y, 360) + fact 20",
+]
+BACKENDS = ["bignum", "int"]
+BINDINGS = 100
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    for backend in BACKENDS:
+        number_type = get_backend(backend)
+        bindings = [{name: number_type(rnd.randrange(1, 10 ** 6)) for name in "xyzabc"} for _ in range(BINDINGS)]
+        for text in EXPRESSIONS:
+            expr = ExpressionParser(text, {}, number_type).run()
+            solver = Solver(number_type)
+            evaluate = expr_compile(expr, number_type)
+            assert all(str(evaluate(variables)) == str(solver.solve_normal(expr, variables)) for variables in bindings)
+
+            tree_time = best_time(lambda: [solver.solve_normal(expr, variables) for variables in bindings]) / BINDINGS
+            compiled_time = best_time(lambda: [evaluate(variables) for variables in bindings]) / BINDINGS
+            print(f"{backend:>7} {text[:40]:<40} solve_normal={tree_time * 1e6:8.2f}us "
+                  f"compiled={compiled_time * 1e6:8.2f}us x{tree_time / compiled_time:5.2f}")
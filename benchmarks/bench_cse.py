@@ -0,0 +1,49 @@
+"""Benchmark of the evaluation of expressions with repeated subexpressions.
+
+Evaluates generated expressions made of a few subexpressions repeated many
+times, with Solver.solve_normal on the tree and with Solver.solve_shared on
+the DAG built by expr_intern, and prints the nodes deduplicated and the time
+of one evaluation (the interning is timed apart).
+
+    python benchmarks/bench_cse.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import *
+
+SUBEXPRESSIONS = ["(a * b + c) ** 20", "powmod(a ** 30, b, 1000000007)", "fact (c % 200)", "sqrt (a ** 40 + d)"]
+TERMS = [10, 100, 1000]
+
+
+def generate(terms: int, rnd: random.Random) -> str:
+    return " + ".join(f"{rnd.choice(SUBEXPRESSIONS)} * {rnd.choice('abcd')}" for _ in range(terms))
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+if __name__ == "__main__":
+    # solve_normal is recursive
+    sys.setrecursionlimit(10 ** 4)
+    rnd = random.Random(2022)
+    variables = {name: BigNum(rnd.randrange(10 ** 8, 10 ** 9)) for name in "abcd"}
+    for terms in TERMS:
+        expr = ExpressionParser(generate(terms, rnd), variables).run()
+        shared, deduplicated = expr_intern(expr)
+        nodes = sum(1 for _ in postorder(expr))
+        solver = Solver(BigNum)
+
+        with local_context(maximum_digits=10 ** 5):
+            assert str(solver.solve_shared(shared, variables)) == str(solver.solve_normal(expr, variables))
+            tree_time = best_time(lambda: solver.solve_normal(expr, variables))
+            dag_time = best_time(lambda: solver.solve_shared(shared, variables))
+        intern_time = best_time(lambda: expr_intern(expr))
+        print(f"{terms:>5} terms {nodes:>6} nodes {deduplicated:>6} deduplicated tree={tree_time * 1e3:9.2f}ms "
+              f"dag={dag_time * 1e3:8.2f}ms interning={intern_time * 1e3:7.2f}ms")
@@ -0,0 +1,47 @@
+"""Calibration benchmark for the BigNum division threshold.
+
+Times Knuth's Algorithm D against the Burnikel-Ziegler recursive division
+dividing a 2n limbs number by a n limbs one and prints the measured crossover
+point, the value to use for BURNIKEL_ZIEGLER_THRESHOLD in bignum.py.
+
+    python benchmarks/bench_div.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+import bignum
+from bignum import _new_limbs, _divmod_knuth, _divmod_burnikel_ziegler
+
+SIZES = [32, 48, 64, 96, 128, 160, 200, 256, 320, 400, 512]
+
+
+def random_limbs(rnd, size):
+    return _new_limbs([rnd.randrange(1, bignum._BASE) for _ in range(size)])
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    threshold = None
+    for size in SIZES:
+        a, b = random_limbs(rnd, 2 * size), random_limbs(rnd, size)
+        # the recursion bottoms out in Algorithm D from half the probed size
+        bignum.BURNIKEL_ZIEGLER_THRESHOLD = size // 2
+        knuth = best_time(lambda: _divmod_knuth(a, b))
+        burnikel_ziegler = best_time(lambda: _divmod_burnikel_ziegler(a, b))
+        print(f"{size:>6} limbs knuth={knuth * 1000:9.3f}ms burnikel_ziegler={burnikel_ziegler * 1000:9.3f}ms")
+        if burnikel_ziegler >= knuth:
+            threshold = None
+        elif threshold is None:
+            threshold = size
+
+    print()
+    print(f"BURNIKEL_ZIEGLER_THRESHOLD = {threshold or 2 * SIZES[-1]}")
@@ -0,0 +1,82 @@
+"""Calibration benchmark for the BigNum multiplication thresholds.
+
+Times schoolbook, Karatsuba and Toom-3 multiplication (and squaring) on random
+operands of growing size and prints the measured crossover points, which are
+the values to use for the *_THRESHOLD constants of bignum.py.
+
+    python benchmarks/bench_mul.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+import bignum
+from bignum import _new_limbs, _mul_schoolbook, _sqr_schoolbook, _karatsuba, _toom3
+
+SIZES = [16, 24, 32, 48, 64, 96, 128, 160, 200, 256, 320, 400]
+
+
+def random_limbs(rnd, size):
+    return _new_limbs([rnd.randrange(1, bignum._BASE) for _ in range(size)])
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number
+
+
+def crossover(timings, slow, fast):
+    """ smallest size from which the fast algorithm always wins """
+    result = None
+    for size in sorted(timings, reverse=True):
+        if timings[size][fast] >= timings[size][slow]:
+            break
+        result = size
+    return result
+
+
+def measure(rnd, size, square, algorithms):
+    a, b = random_limbs(rnd, size), random_limbs(rnd, size)
+    if square:
+        b = a
+    functions = {
+        "schoolbook": lambda: _sqr_schoolbook(a) if square else _mul_schoolbook(a, b),
+        "karatsuba": lambda: _karatsuba(a, b, square),
+        "toom3": lambda: _toom3(a, b, square),
+    }
+    row = {name: best_time(functions[name]) for name in algorithms}
+    print(f"{size:>6} limbs " + " ".join(f"{name}={value * 1000:9.3f}ms" for name, value in row.items()))
+    return row
+
+
+def calibrate(square: bool):
+    rnd = random.Random(2022)
+    prefix = "KARATSUBA_SQR" if square else "KARATSUBA"
+
+    # Karatsuba against schoolbook, the recursive calls use the schoolbook method
+    setattr(bignum, prefix + "_THRESHOLD", 10 ** 9)
+    setattr(bignum, prefix.replace("KARATSUBA", "TOOM3") + "_THRESHOLD", 10 ** 9)
+    timings = {size: measure(rnd, size, square, ["schoolbook", "karatsuba"]) for size in SIZES}
+    karatsuba = crossover(timings, "schoolbook", "karatsuba") or SIZES[-1]
+
+    # Toom-3 against Karatsuba, the recursive calls use the calibrated Karatsuba threshold
+    setattr(bignum, prefix + "_THRESHOLD", karatsuba)
+    timings = {size: measure(rnd, size, square, ["karatsuba", "toom3"]) for size in SIZES if size >= karatsuba}
+    toom3 = crossover(timings, "karatsuba", "toom3") or 2 * SIZES[-1]
+    return karatsuba, toom3
+
+
+if __name__ == "__main__":
+    print("multiplication")
+    karatsuba, toom3 = calibrate(False)
+    print("squaring")
+    karatsuba_sqr, toom3_sqr = calibrate(True)
+
+    print()
+    print(f"KARATSUBA_THRESHOLD = {karatsuba}")
+    print(f"TOOM3_THRESHOLD = {toom3}")
+    print(f"KARATSUBA_SQR_THRESHOLD = {karatsuba_sqr}")
+    print(f"TOOM3_SQR_THRESHOLD = {toom3_sqr}")
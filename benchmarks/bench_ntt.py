@@ -0,0 +1,72 @@
+"""Calibration benchmark for the BigNum NTT multiplication threshold.
+
+Times the number theoretic transform multiplication (and squaring) against the
+Karatsuba / Toom-3 multiplication on random operands of growing size and prints
+the measured crossover points, which are the values to use for NTT_THRESHOLD
+and NTT_SQR_THRESHOLD in bignum.py.
+
+    python benchmarks/bench_ntt.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+import bignum
+from bignum import _new_limbs, _mul_limbs, _sqr_limbs, _mul_ntt
+
+SIZES = [64, 96, 128, 160, 200, 256, 320, 400, 512, 640, 800, 1024, 2048, 4096]
+
+
+def random_limbs(rnd, size):
+    return _new_limbs([rnd.randrange(1, bignum._BASE) for _ in range(size)])
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+def crossover(timings, slow, fast):
+    """ smallest size from which the fast algorithm always wins """
+    result = None
+    for size in sorted(timings, reverse=True):
+        if timings[size][fast] >= timings[size][slow]:
+            break
+        result = size
+    return result
+
+
+def measure(rnd, size, square):
+    a, b = random_limbs(rnd, size), random_limbs(rnd, size)
+    if square:
+        b = a
+    functions = {
+        "toom": lambda: _sqr_limbs(a) if square else _mul_limbs(a, b),
+        "ntt": lambda: _mul_ntt(a, b, square),
+    }
+    row = {name: best_time(function) for name, function in functions.items()}
+    print(f"{size:>6} limbs " + " ".join(f"{name}={value * 1000:9.3f}ms" for name, value in row.items()))
+    return row
+
+
+def calibrate(square: bool):
+    rnd = random.Random(2022)
+    name = "NTT_SQR_THRESHOLD" if square else "NTT_THRESHOLD"
+    # the dispatcher must not pick the NTT itself while it is measured against it
+    setattr(bignum, name, 10 ** 9)
+    timings = {size: measure(rnd, size, square) for size in SIZES}
+    return crossover(timings, "toom", "ntt") or 2 * SIZES[-1]
+
+
+if __name__ == "__main__":
+    print("multiplication")
+    ntt = calibrate(False)
+    print("squaring")
+    ntt_sqr = calibrate(True)
+
+    print()
+    print(f"NTT_THRESHOLD = {ntt}")
+    print(f"NTT_SQR_THRESHOLD = {ntt_sqr}")
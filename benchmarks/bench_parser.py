@@ -0,0 +1,113 @@
+"""Benchmark of the parser against the previous recursive descent implementation.
+
+Parses generated expressions of growing length (flat sums of products and
+powers) and of growing nesting depth (parens and sqrt chains), and prints the
+parse time of both parsers. The recursive parser is skipped where it would
+hit the recursion limit.
+
+    python benchmarks/bench_parser.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import *
+
+LENGTHS = [10 ** 4, 10 ** 5, 10 ** 6]
+DEPTHS = [100, 10 ** 3, 10 ** 4, 10 ** 5]
+TERMS = ["123456789", "x", "sqrt 49", "(7 + y)", "powmod(x, 3, 5)", "2 ** 10"]
+OPERATORS = [" + ", " - ", " * ", " / ", " % ", " ** "]
+
+
+class RecursiveParser(ExpressionParser):
+    """The recursive descent parser used before, one Python call per nesting level"""
+
+    def parse(self) -> Expr:
+        return self.parse_precedence(self.parse_expr(), 0)
+
+    def parse_expr(self) -> Expr:
+        tok = self.eat()
+        if tok.kind == TokenKind.NUMBER:
+            return NumericExpr(self.big_number_type(self.original_text[tok.loc.start:tok.loc.end]))
+        if tok.kind == TokenKind.OPEN_PAREN:
+            expr = self.parse()
+            if self.eat().kind != TokenKind.CLOSED_PAREN:
+                raise ValueError("expected )")
+            return expr
+        if tok.kind == TokenKind.SQRT or tok.kind == TokenKind.FACT:
+            subexpression = self.parse_expr()
+            op = token_to_unary_op(tok.kind)
+            return UnaryExpr(op, subexpression)
+        if tok.kind in (TokenKind.POWMOD, TokenKind.BINOM, TokenKind.GCD, TokenKind.ROOT, TokenKind.ILOG):
+            op = token_to_function_op(tok.kind)
+            return CallExpr(op, self.parse_arguments(op.arity()))
+        if tok.kind == TokenKind.VARIABLE:
+            return VariableExpr(self.original_text[tok.loc.start:tok.loc.end])
+        assert False, "unknown token"
+
+    def parse_arguments(self, count: int) -> list:
+        if self.eat().kind != TokenKind.OPEN_PAREN:
+            raise ValueError("expected (")
+        arguments = [self.parse()]
+        while len(arguments) < count:
+            if self.eat().kind != TokenKind.COMMA:
+                raise ValueError("expected ,")
+            arguments.append(self.parse())
+        if self.eat().kind != TokenKind.CLOSED_PAREN:
+            raise ValueError("expected )")
+        return arguments
+
+    def parse_precedence(self, left, min_priority) -> Expr:
+        lookahead = self.peek()
+        while not self.precedence_expr_is_done() and get_op_priority(lookahead.kind) >= min_priority:
+            op = self.eat()
+            right = self.parse_expr()
+
+            lookahead = self.peek()
+            while not self.precedence_expr_is_done() and get_op_priority(lookahead.kind) > get_op_priority(op.kind):
+                right = self.parse_precedence(right, min_priority + 1)
+                lookahead = self.peek()
+
+            binary_operator = token_to_binary_op(op.kind)
+            left = BinaryExpr(left, binary_operator, right)
+        return left
+
+
+def flat(length: int, rnd: random.Random) -> str:
+    parts = [rnd.choice(TERMS)]
+    size = len(parts[0])
+    while size < length:
+        for part in (rnd.choice(OPERATORS), rnd.choice(TERMS)):
+            parts.append(part)
+            size += len(part)
+    return "".join(parts)
+
+
+def nested(depth: int) -> str:
+    return "(1 + " * depth + "x" + ")" * depth + " + " + "sqrt " * depth + "4"
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+def compare(name: str, text: str, recursive: bool):
+    iterative_time = best_time(lambda: ExpressionParser(text, {}).run())
+    line = f"{name:>24} {len(text):>8} chars iterative={iterative_time * 1e3:9.1f}ms"
+    if recursive:
+        recursive_time = best_time(lambda: RecursiveParser(text, {}).run())
+        line += f" recursive={recursive_time * 1e3:9.1f}ms"
+    print(line)
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    for length in LENGTHS:
+        compare(f"flat {length}", flat(length, rnd), True)
+    for depth in DEPTHS:
+        # every level costs a few Python frames in the recursive parser
+        compare(f"nested {depth}", nested(depth), depth * 4 < sys.getrecursionlimit())
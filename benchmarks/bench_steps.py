@@ -0,0 +1,68 @@
+"""Benchmark of the step traces against the previous solve_leftmost loop.
+
+Traces generated expressions with a growing number of operators, a flat sum of
+products and a chain nested in parens, and prints the time of StepTracer and
+of the loop that built a new tree with Solver.solve_leftmost and dumped it for
+every step. The old loop is skipped where it would take too long.
+
+    python benchmarks/bench_steps.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import *
+
+OPERATORS = [10 ** 2, 10 ** 3, 3000]
+OLD_LOOP_OPERATORS = 10 ** 3
+
+
+def flat(count: int, rnd: random.Random) -> str:
+    parts = [str(rnd.randrange(1, 1000))]
+    for _ in range(count):
+        parts.append(rnd.choice([" + ", " * ", " + x * "]) + str(rnd.randrange(1, 1000)))
+    return "".join(parts)
+
+
+def nested(count: int, rnd: random.Random) -> str:
+    return "(" * count + "x" + "".join(f" + {rnd.randrange(1000)})" for _ in range(count))
+
+
+def old_steps(expr: Expr, variables: dict) -> str:
+    result = str(expr.dump()) + '\n'
+    while not isinstance(expr, NumericExpr):
+        expr = Solver(BigNum).solve_leftmost(expr, variables)
+        result += str(expr.dump()) + '\n'
+    return result
+
+
+def new_steps(expr: Expr, variables: dict) -> str:
+    return "".join(step + '\n' for step in StepTracer(expr, variables, Solver(BigNum)).steps())
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+def compare(name: str, text: str, count: int):
+    variables = {"x": BigNum(7)}
+    expr = ExpressionParser(text, variables).run()
+    trace = new_steps(expr, variables)
+    line = f"{name:>14} {len(trace):>11} chars of steps tracer={best_time(lambda: new_steps(expr, variables)) * 1e3:9.1f}ms"
+    if count <= OLD_LOOP_OPERATORS:
+        assert old_steps(expr, variables) == trace
+        line += f" solve_leftmost={best_time(lambda: old_steps(expr, variables)) * 1e3:9.1f}ms"
+    print(line)
+
+
+if __name__ == "__main__":
+    # the dump of the old loop is recursive
+    sys.setrecursionlimit(10 ** 5)
+    rnd = random.Random(2022)
+    for count in OPERATORS:
+        compare(f"flat {count}", flat(count, rnd), count)
+        compare(f"nested {count}", nested(count, rnd), count)
@@ -0,0 +1,49 @@
+"""Benchmark of the tokenizer on generated expressions of 10**5 and 10**6 characters.
+
+Prints the throughput of tokenize(), which builds the whole token list, and of
+iter_tokens(), the generator that feeds the parser one token at a time, for
+a workload made of numbers, variables, keywords, operators and parens.
+
+    python benchmarks/bench_tokenizer.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import ExpressionTokenizer
+
+SIZES = [10 ** 5, 10 ** 6]
+TERMS = ["123456789", "x", "yz", "sqrt 49", "(7 + q)", "powmod(a, 3, 5)", "2 ** 10", "1000000007"]
+OPERATORS = [" + ", " - ", " * ", " / ", " % ", "+", "*"]
+
+
+def generate(size: int, rnd: random.Random) -> str:
+    parts = [rnd.choice(TERMS)]
+    length = len(parts[0])
+    while length < size:
+        for part in (rnd.choice(OPERATORS), rnd.choice(TERMS)):
+            parts.append(part)
+            length += len(part)
+    return "".join(parts)
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    for size in SIZES:
+        text = generate(size, rnd)
+        tokens = len(ExpressionTokenizer(text).tokenize())
+        modes = [("tokenize", lambda: ExpressionTokenizer(text).tokenize())]
+        if hasattr(ExpressionTokenizer, "iter_tokens"):
+            modes.append(("iter_tokens", lambda: sum(1 for _ in ExpressionTokenizer(text).iter_tokens())))
+        for name, func in modes:
+            seconds = best_time(func)
+            print(f"{len(text):>8} chars {tokens:>7} tokens {name:>12}: {seconds * 1e3:9.1f}ms "
+                  f"{len(text) / seconds / 1e6:6.2f}M chars/s")
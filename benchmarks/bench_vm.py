@@ -0,0 +1,64 @@
+"""Benchmark of the bytecode virtual machine against Solver.solve_normal.
+
+Evaluates a few expressions many times with different variables with
+solve_normal, with VirtualMachine (with and without the opcode counters) and
+with the function built by expr_compile, for the bignum and the int backends,
+then evaluates expressions too deep for solve_normal. Prints the time of one
+evaluation.
+
+    python benchmarks/bench_vm.py
+"""
+import os, sys, random, timeit
+
+# path hack to be able to import the sources, same as tests/test.py
+root_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(root_dir, "src"))
+
+from expr_parser import *
+
+EXPRESSIONS = [
+    "x + y",
+    "(x * 2 + y * z) % 1000 + x / 7",
+    "a * x * x + b * x + c - (a + b) % 13 + sqrt (x * y)",
+    "powmod(x, y + 3, 1000000007) + gcd(x * y, 360) + fact 20",
+]
+BACKENDS = ["bignum", "int"]
+BINDINGS = 100
+DEPTHS = [10 ** 4, 10 ** 5]
+
+
+def best_time(func):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+if __name__ == "__main__":
+    rnd = random.Random(2022)
+    for backend in BACKENDS:
+        number_type = get_backend(backend)
+        bindings = [{name: number_type(rnd.randrange(1, 10 ** 6)) for name in "xyzabc"} for _ in range(BINDINGS)]
+        for text in EXPRESSIONS:
+            expr = ExpressionParser(text, {}, number_type).run()
+            solver = Solver(number_type)
+            program = BytecodeCompiler(number_type).compile(expr)
+            evaluate = expr_compile(expr, number_type)
+            machine, counting = VirtualMachine(), VirtualMachine(count=True)
+            assert all(str(machine.run(program, variables)) == str(solver.solve_normal(expr, variables))
+                       for variables in bindings)
+
+            times = [best_time(lambda: [run(variables) for variables in bindings]) / BINDINGS for run in [
+                lambda variables: solver.solve_normal(expr, variables),
+                lambda variables: machine.run(program, variables),
+                lambda variables: counting.run(program, variables),
+                evaluate,
+            ]]
+            print(f"{backend:>7} {text[:40]:<40} " + " ".join(
+                f"{name}={seconds * 1e6:8.2f}us" for name, seconds in zip(["solve_normal", "vm", "vm+counters", "compiled"], times)))
+
+    for depth in DEPTHS:
+        expr = ExpressionParser("(1 + " * depth + "x" + ")" * depth, {}).run()
+        program = BytecodeCompiler().compile(expr)
+        seconds = best_time(lambda: VirtualMachine().run(program, {"x": BigNum(1)}))
+        print(f"nested {depth}: vm={seconds * 1e3:8.2f}ms (code of {len(program.code)} ints, "
+              f"{program.registers} registers)")
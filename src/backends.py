@@ -0,0 +1,63 @@
+from typing import Protocol, runtime_checkable
+from bignum import BigNum
+from bignum_array import BigNumArray, numpy
+from hybrid_num import HybridNum
+from int_num import IntNum
+
+
+@runtime_checkable
+class NumberType(Protocol):
+    """What the parser and the solver need from the numbers of an arithmetic backend.
+
+    The type is built from the literals (str) and from ints, it has the arithmetic operators
+    (negative results are errors), the comparisons, isqrtrem(), irootrem(), ilog(), factorial(),
+    binomial() and gcd(); all of them respect the digits limit of the current bignum evaluation
+    context, with the errors of BigNum.
+    """
+
+    def __add__(self, other): ...
+    def __sub__(self, other): ...
+    def __mul__(self, other): ...
+    def __floordiv__(self, other): ...
+    def __mod__(self, other): ...
+    def __divmod__(self, other): ...
+    def __pow__(self, power, modulo=None): ...
+    def __lt__(self, other): ...
+    def isqrtrem(self): ...
+    def irootrem(self, k): ...
+    def ilog(self, base): ...
+    def factorial(self): ...
+    def binomial(self, k): ...
+    def gcd(self, other): ...
+
+
+_BACKENDS = {}
+
+
+def register_backend(name: str, number_type: type):
+    """Make number_type available by name for run_one and BackendBridge"""
+    if not issubclass(number_type, NumberType):
+        raise ValueError(f"{number_type.__name__} is not a valid number type")
+    _BACKENDS[name] = number_type
+
+
+def get_backend(backend) -> type:
+    """The number type of a backend given by name or by type; the builtin int is served by the int backend"""
+    if isinstance(backend, str):
+        if backend not in _BACKENDS:
+            raise ValueError(f"unknown backend {backend}, expected one of: {', '.join(backend_names())}")
+        return _BACKENDS[backend]
+    if backend is int:
+        return IntNum
+    return backend
+
+
+def backend_names() -> list:
+    return sorted(_BACKENDS)
+
+
+register_backend("bignum", BigNum)
+register_backend("int", IntNum)
+register_backend("hybrid", HybridNum)
+if numpy is not None:
+    register_backend("batch", BigNumArray)
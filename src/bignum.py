@@ -1,77 +1,1175 @@
+import contextlib
+import contextvars
+import enum
+import math
+import sys
+from array import array
+
+_LIMB_DIGITS = 9
+_BASE = 10 ** _LIMB_DIGITS
+_LIMB_FORMAT = "{:09d}"
+
+
+def _new_limbs(values=()) -> array:
+    return array('I', values)
+
+
+def _from_small_int(value: int) -> array:
+    limbs = _new_limbs()
+    while True:
+        value, limb = divmod(value, _BASE)
+        limbs.append(limb)
+        if value == 0:
+            return limbs
+
+
+def _trim(limbs: array) -> array:
+    """ drop the most significant zero limbs, keeping at least one limb """
+    while len(limbs) > 1 and limbs[-1] == 0:
+        limbs.pop()
+    return limbs
+
+
+def _digits_count(limbs) -> int:
+    return (len(limbs) - 1) * _LIMB_DIGITS + len(str(limbs[-1]))
+
+
+def _cmp_limbs(arr1_, arr2_) -> int:
+    """ Compare two trimmed limb arrays, returns -1, 0 or 1 """
+    if len(arr1_) != len(arr2_):
+        return 1 if len(arr1_) > len(arr2_) else -1
+    for i in range(len(arr1_) - 1, -1, -1):
+        if arr1_[i] != arr2_[i]:
+            return 1 if arr1_[i] > arr2_[i] else -1
+    return 0
+
+
+def _iadd_limbs(acc: array, arr_) -> array:
+    """ Compute acc += arr in place, returns acc """
+    n = min(len(acc), len(arr_))
+    if len(acc) < len(arr_):
+        acc.extend(arr_[n:])
+    carry = 0
+    for i in range(n):
+        res = acc[i] + arr_[i] + carry
+        if res >= _BASE:
+            acc[i] = res - _BASE
+            carry = 1
+        else:
+            acc[i] = res
+            carry = 0
+    i = n
+    while carry and i < len(acc):
+        res = acc[i] + 1
+        if res == _BASE:
+            acc[i] = 0
+        else:
+            acc[i] = res
+            carry = 0
+        i += 1
+    if carry:
+        acc.append(carry)
+    return acc
+
+
+def _add_limbs(arr1_, arr2_) -> array:
+    """ Compute arr1 + arr2 """
+    if len(arr1_) < len(arr2_):
+        arr1_, arr2_ = arr2_, arr1_
+    return _iadd_limbs(_new_limbs(arr1_), arr2_)
+
+
+def _isub_limbs(acc: array, arr_) -> array:
+    """ Compute acc -= arr in place, acc must be greater or equal than arr; returns acc """
+    borrow = 0
+    for i in range(len(arr_)):
+        res = acc[i] - arr_[i] - borrow
+        if res < 0:
+            acc[i] = res + _BASE
+            borrow = 1
+        else:
+            acc[i] = res
+            borrow = 0
+    i = len(arr_)
+    while borrow and i < len(acc):
+        if acc[i] == 0:
+            acc[i] = _BASE - 1
+        else:
+            acc[i] -= 1
+            borrow = 0
+        i += 1
+    assert borrow == 0, "Negative result!"
+    return _trim(acc)
+
+
+def _sub_limbs(arr1_, arr2_) -> array:
+    """ Compute arr1 - arr2, arr1 must be greater or equal than arr2 """
+    return _isub_limbs(_new_limbs(arr1_), arr2_)
+
+
+# Crossover points (in limbs) of the multiplication algorithms, measured by benchmarks/bench_mul.py
+KARATSUBA_THRESHOLD = 96
+TOOM3_THRESHOLD = 320
+KARATSUBA_SQR_THRESHOLD = 96
+TOOM3_SQR_THRESHOLD = 320
+NTT_THRESHOLD = 400
+NTT_SQR_THRESHOLD = 400
+
+
+def _split_limbs(arr_, k: int):
+    """ Split arr in (arr mod BASE ** k, arr // BASE ** k) """
+    low = _trim(_new_limbs(arr_[:k])) if k < len(arr_) else _new_limbs(arr_)
+    high = _new_limbs(arr_[k:]) if k < len(arr_) else _new_limbs([0])
+    return low, high
+
+
+def _accumulate(acc: list, arr_, offset: int):
+    """ acc += arr * BASE ** offset, acc must be long enough to hold the result """
+    carry = 0
+    k = offset
+    for el in arr_:
+        res = acc[k] + el + carry
+        if res >= _BASE:
+            acc[k] = res - _BASE
+            carry = 1
+        else:
+            acc[k] = res
+            carry = 0
+        k += 1
+    while carry:
+        res = acc[k] + 1
+        if res == _BASE:
+            acc[k] = 0
+        else:
+            acc[k] = res
+            carry = 0
+        k += 1
+
+
+def _mul_schoolbook(arr1_, arr2_) -> array:
+    """ Compute arr1 * arr2 using the schoolbook method """
+    if len(arr1_) < len(arr2_):
+        arr1_, arr2_ = arr2_, arr1_
+    arr1_ = arr1_.tolist() if isinstance(arr1_, array) else arr1_
+    result = [0] * (len(arr1_) + len(arr2_))
+    for j in range(len(arr2_)):
+        digit = arr2_[j]
+        if digit == 0:
+            continue
+        carry = 0
+        k = j
+        for el in arr1_:
+            res = el * digit + result[k] + carry
+            carry = res // _BASE
+            result[k] = res - carry * _BASE
+            k += 1
+        result[k] = carry
+    return _trim(_new_limbs(result))
+
+
+def _sqr_schoolbook(arr_) -> array:
+    """ Compute arr * arr, every cross product is computed only once """
+    arr_ = arr_.tolist() if isinstance(arr_, array) else list(arr_)
+    n = len(arr_)
+    result = [0] * (2 * n)
+    for i in range(n - 1):
+        digit = arr_[i]
+        if digit == 0:
+            continue
+        carry = 0
+        k = 2 * i + 1
+        for j in range(i + 1, n):
+            res = digit * arr_[j] + result[k] + carry
+            carry = res // _BASE
+            result[k] = res - carry * _BASE
+            k += 1
+        result[k] = carry
+    # double the cross products and add the squares from the diagonal
+    carry = 0
+    for k in range(2 * n):
+        square = arr_[k >> 1] * arr_[k >> 1]
+        res = 2 * result[k] + carry + (square % _BASE if k % 2 == 0 else square // _BASE)
+        carry = res // _BASE
+        result[k] = res - carry * _BASE
+    return _trim(_new_limbs(result))
+
+
+def _combine(parts, k: int) -> array:
+    """ Compute sum(parts[i] * BASE ** (i * k)) """
+    size = max(len(part) + i * k for i, part in enumerate(parts)) + 1
+    acc = [0] * size
+    for i, part in enumerate(parts):
+        _accumulate(acc, part, i * k)
+    return _trim(_new_limbs(acc))
+
+
+def _karatsuba(arr1_, arr2_, square: bool) -> array:
+    k = (max(len(arr1_), len(arr2_)) + 1) // 2
+    a0, a1 = _split_limbs(arr1_, k)
+    if square:
+        z0 = _sqr_limbs(a0)
+        z2 = _sqr_limbs(a1)
+        z1 = _sqr_limbs(_add_limbs(a0, a1))
+    else:
+        b0, b1 = _split_limbs(arr2_, k)
+        z0 = _mul_limbs(a0, b0)
+        z2 = _mul_limbs(a1, b1)
+        z1 = _mul_limbs(_add_limbs(a0, a1), _add_limbs(b0, b1))
+    z1 = _isub_limbs(_isub_limbs(z1, z0), z2)
+    return _combine([z0, z1, z2], k)
+
+
+def _signed_add(x, y):
+    """ Add two (sign, limbs) pairs """
+    if x[0] == y[0]:
+        return x[0], _add_limbs(x[1], y[1])
+    cmp = _cmp_limbs(x[1], y[1])
+    if cmp == 0:
+        return 1, _new_limbs([0])
+    if cmp > 0:
+        return x[0], _sub_limbs(x[1], y[1])
+    return y[0], _sub_limbs(y[1], x[1])
+
+
+def _signed_sub(x, y):
+    return _signed_add(x, (-y[0], y[1]))
+
+
+def _signed_divexact(x, value: int):
+    q, r = _divmod_small(x[1], value)
+    assert r == 0, "Inexact Toom-3 interpolation!"
+    return x[0], q
+
+
+def _toom3(arr1_, arr2_, square: bool) -> array:
+    """ Toom-Cook 3-way multiplication, using Bodrato's evaluation and interpolation sequence """
+    k = (max(len(arr1_), len(arr2_)) + 2) // 3
+
+    def __evaluate(arr_):
+        a0, rest = _split_limbs(arr_, k)
+        a1, a2 = _split_limbs(rest, k)
+        tmp = _add_limbs(a0, a2)
+        p1 = (1, _add_limbs(tmp, a1))
+        pm1 = _signed_sub((1, tmp), (1, a1))
+        pm2 = _signed_add(pm1, (1, a2))
+        pm2 = _signed_sub((pm2[0], _mul_small(pm2[1], 2)), (1, a0))
+        return [(1, a0), p1, pm1, pm2, (1, a2)]
+
+    def __mul(x, y):
+        product = _sqr_limbs(x[1]) if square else _mul_limbs(x[1], y[1])
+        return x[0] * y[0], product
+
+    points1 = __evaluate(arr1_)
+    points2 = points1 if square else __evaluate(arr2_)
+    r0, r1, rm1, rm2, rinf = [__mul(x, y) for x, y in zip(points1, points2)]
+
+    t3 = _signed_divexact(_signed_sub(rm2, r1), 3)
+    t1 = _signed_divexact(_signed_sub(r1, rm1), 2)
+    t2 = _signed_sub(rm1, r0)
+    t3 = _signed_add(_signed_divexact(_signed_sub(t2, t3), 2), (1, _mul_small(rinf[1], 2)))
+    t2 = _signed_sub(_signed_add(t2, t1), rinf)
+    t1 = _signed_sub(t1, t3)
+
+    for coefficient in (t1, t2, t3):
+        assert coefficient[0] > 0 or coefficient[1] == _new_limbs([0]), "Negative Toom-3 coefficient!"
+    return _combine([r0[1], t1[1], t2[1], t3[1], rinf[1]], k)
+
+
+# NTT friendly primes p = c * 2 ** k + 1 with a primitive root g, as (p, k, g); the product of the
+# three primes bounds the convolution coefficients (n * (BASE - 1) ** 2) for up to 2 ** 23 limbs
+_NTT_PRIMES = ((998244353, 23, 3), (167772161, 25, 3), (469762049, 26, 3))
+_NTT_MAX_SIZE = 1 << min(k for _, k, _ in _NTT_PRIMES)
+# _NTT_TWIDDLES[(p, h, inverse)] == [w ** j % p for j < h], w a primitive 2h-th root of unity mod p
+_NTT_TWIDDLES = {}
+
+
+def _ntt_twiddles(p: int, g: int, h: int, inverse: bool) -> list:
+    key = (p, h, inverse)
+    twiddles = _NTT_TWIDDLES.get(key)
+    if twiddles is None:
+        w = pow(g, (p - 1) // (2 * h), p)
+        if inverse:
+            w = pow(w, p - 2, p)
+        twiddles = [1] * h
+        for j in range(1, h):
+            twiddles[j] = twiddles[j - 1] * w % p
+        _NTT_TWIDDLES[key] = twiddles
+    return twiddles
+
+
+def _ntt_forward(a: list, p: int, g: int):
+    """ In place decimation in frequency transform, natural order input, bit reversed output """
+    n = len(a)
+    h = n >> 1
+    while h:
+        step = 2 * h
+        twiddles = _ntt_twiddles(p, g, h, False)
+        if h >= n // step:
+            # few long butterfly blocks - process one block at a time
+            for s in range(0, n, step):
+                lo, hi = a[s:s + h], a[s + h:s + step]
+                a[s:s + h] = [(u + v) % p for u, v in zip(lo, hi)]
+                a[s + h:s + step] = [(u - v) * w % p for u, v, w in zip(lo, hi, twiddles)]
+        else:
+            # many short blocks - process the j-th butterfly of all the blocks at a time
+            for j in range(h):
+                w = twiddles[j]
+                lo, hi = a[j::step], a[j + h::step]
+                a[j::step] = [(u + v) % p for u, v in zip(lo, hi)]
+                a[j + h::step] = [(u - v) * w % p for u, v in zip(lo, hi)]
+        h >>= 1
+
+
+def _ntt_inverse(a: list, p: int, g: int):
+    """ In place decimation in time inverse transform, bit reversed input, natural order output """
+    n = len(a)
+    h = 1
+    while h < n:
+        step = 2 * h
+        twiddles = _ntt_twiddles(p, g, h, True)
+        if h >= n // step:
+            for s in range(0, n, step):
+                lo = a[s:s + h]
+                hi = [v * w % p for v, w in zip(a[s + h:s + step], twiddles)]
+                a[s:s + h] = [(u + v) % p for u, v in zip(lo, hi)]
+                a[s + h:s + step] = [(u - v) % p for u, v in zip(lo, hi)]
+        else:
+            for j in range(h):
+                w = twiddles[j]
+                lo = a[j::step]
+                hi = [v * w % p for v in a[j + h::step]]
+                a[j::step] = [(u + v) % p for u, v in zip(lo, hi)]
+                a[j + h::step] = [(u - v) % p for u, v in zip(lo, hi)]
+        h <<= 1
+    n_inverse = pow(n, p - 2, p)
+    a[:] = [x * n_inverse % p for x in a]
+
+
+def _ntt_convolution(arr1_, arr2_, size: int, p: int, g: int) -> list:
+    """ Cyclic convolution of arr1 and arr2 modulo p, with a transform of the given size """
+    a = [x % p for x in arr1_] + [0] * (size - len(arr1_))
+    _ntt_forward(a, p, g)
+    if arr2_ is None:
+        a = [x * x % p for x in a]
+    else:
+        b = [x % p for x in arr2_] + [0] * (size - len(arr2_))
+        _ntt_forward(b, p, g)
+        a = [x * y % p for x, y in zip(a, b)]
+    _ntt_inverse(a, p, g)
+    return a
+
+
+def _mul_ntt(arr1_, arr2_, square: bool) -> array:
+    """ Number theoretic transform multiplication: the convolution of the limbs is computed
+    modulo three word sized primes and recovered with the chinese remainder theorem """
+    count = len(arr1_) + len(arr2_) - 1
+    size = 1 << (count - 1).bit_length()
+    assert size <= _NTT_MAX_SIZE, "Operands too big for the NTT multiplication!"
+    (p1, _, g1), (p2, _, g2), (p3, _, g3) = _NTT_PRIMES
+    other = None if square else arr2_
+    r1 = _ntt_convolution(arr1_, other, size, p1, g1)
+    r2 = _ntt_convolution(arr1_, other, size, p2, g2)
+    r3 = _ntt_convolution(arr1_, other, size, p3, g3)
+
+    # Garner's algorithm, every coefficient is smaller than p1 * p2 * p3
+    p1_inverse = pow(p1, p2 - 2, p2)
+    p12 = p1 * p2
+    p12_inverse = pow(p12 % p3, p3 - 2, p3)
+    result = _new_limbs()
+    carry = 0
+    for k in range(count):
+        x1 = r1[k]
+        x12 = x1 + (r2[k] - x1) * p1_inverse % p2 * p1
+        res = x12 + (r3[k] - x12) * p12_inverse % p3 * p12 + carry
+        carry = res // _BASE
+        result.append(res - carry * _BASE)
+    while carry:
+        carry, limb = divmod(carry, _BASE)
+        result.append(limb)
+    return _trim(result)
+
+
+def _mul_limbs(arr1_, arr2_) -> array:
+    """ Compute arr1 * arr2, choosing the algorithm by the operand sizes """
+    if len(arr1_) < len(arr2_):
+        arr1_, arr2_ = arr2_, arr1_
+    n, m = len(arr1_), len(arr2_)
+    if m == 1:
+        return _mul_small(arr1_, arr2_[0])
+    if m < KARATSUBA_THRESHOLD:
+        return _mul_schoolbook(arr1_, arr2_)
+    if m >= NTT_THRESHOLD and n + m <= _NTT_MAX_SIZE:
+        return _mul_ntt(arr1_, arr2_, False)
+    if n >= 2 * m:
+        # unbalanced operands - multiply m sized chunks of the longer one
+        parts = [_mul_limbs(_trim(_new_limbs(arr1_[i:i + m])), arr2_) for i in range(0, n, m)]
+        return _combine(parts, m)
+    if m < TOOM3_THRESHOLD:
+        return _karatsuba(arr1_, arr2_, False)
+    return _toom3(arr1_, arr2_, False)
+
+
+def _sqr_limbs(arr_) -> array:
+    """ Compute arr * arr, choosing the algorithm by the operand size """
+    if len(arr_) < KARATSUBA_SQR_THRESHOLD:
+        return _sqr_schoolbook(arr_)
+    if len(arr_) < TOOM3_SQR_THRESHOLD:
+        return _karatsuba(arr_, arr_, True)
+    if len(arr_) >= NTT_SQR_THRESHOLD and 2 * len(arr_) <= _NTT_MAX_SIZE:
+        return _mul_ntt(arr_, arr_, True)
+    return _toom3(arr_, arr_, True)
+
+
+def _imul_small(acc: array, value: int) -> array:
+    """ Compute acc *= value in place, where 0 <= value < BASE; returns acc """
+    carry = 0
+    for i in range(len(acc)):
+        res = acc[i] * value + carry
+        carry = res // _BASE
+        acc[i] = res - carry * _BASE
+    if carry:
+        acc.append(carry)
+    return _trim(acc)
+
+
+def _mul_small(arr_, value: int) -> array:
+    """ Compute arr * value, where 0 <= value < BASE """
+    return _imul_small(_new_limbs(arr_), value)
+
+
+def _idivmod_small(acc: array, value: int) -> int:
+    """ Compute acc //= value in place, where 0 < value < BASE; returns the remainder """
+    remainder = 0
+    for i in range(len(acc) - 1, -1, -1):
+        cur = remainder * _BASE + acc[i]
+        acc[i] = q = cur // value
+        remainder = cur - q * value
+    _trim(acc)
+    return remainder
+
+
+def _divmod_small(arr_, value: int):
+    """ Compute divmod(arr, value), where 0 < value < BASE """
+    result = _new_limbs(arr_)
+    remainder = _idivmod_small(result, value)
+    return result, remainder
+
+
+_POWERS_OF_TEN = {10 ** i: i for i in range(_LIMB_DIGITS)}
+
+
+def _pow10_exponent(arr_):
+    """ k if arr == 10 ** k, None otherwise """
+    top = _POWERS_OF_TEN.get(arr_[-1])
+    if top is None or any(arr_[i] for i in range(len(arr_) - 1)):
+        return None
+    return (len(arr_) - 1) * _LIMB_DIGITS + top
+
+
+def _mul_pow10(arr_, k: int) -> array:
+    """ Compute arr * 10 ** k as a limbs shift followed by a single limb multiplication """
+    count, digits = divmod(k, _LIMB_DIGITS)
+    return _shift_limbs(_mul_small(arr_, 10 ** digits), count)
+
+
+def _divmod_pow10(arr_, k: int):
+    """ Compute divmod(arr, 10 ** k) as a limbs shift followed by a single limb division """
+    count, digits = divmod(k, _LIMB_DIGITS)
+    if count >= len(arr_):
+        return _new_limbs([0]), _new_limbs(arr_)
+    q, remainder = _divmod_small(arr_[count:], 10 ** digits)
+    r = _new_limbs(arr_[:count])
+    r.append(remainder)
+    return q, _trim(r)
+
+
+# Size (in limbs) under which the int conversions use the simple one limb per step loops
+_INT_CONVERSION_THRESHOLD = 64
+# _INT_POWERS[k] == BASE ** (_INT_CONVERSION_THRESHOLD * 2 ** k), computed once and reused
+_INT_POWERS = []
+
+
+def _int_power(k: int) -> int:
+    while len(_INT_POWERS) <= k:
+        _INT_POWERS.append(_BASE ** _INT_CONVERSION_THRESHOLD if not _INT_POWERS else _INT_POWERS[-1] ** 2)
+    return _INT_POWERS[k]
+
+
+def _limbs_from_int(value: int, size: int = None) -> list:
+    """ Convert a non-negative int to limbs, by recursive splitting in halves; padded to size if given """
+    if size is None:
+        # upper bound of the limbs count, from the bits count
+        size = (value.bit_length() * 30103 // 100000) // _LIMB_DIGITS + 1
+    if size <= _INT_CONVERSION_THRESHOLD:
+        result = []
+        for _ in range(size):
+            value, limb = divmod(value, _BASE)
+            result.append(limb)
+        return result
+    k = 0
+    while _INT_CONVERSION_THRESHOLD << (k + 1) < size:
+        k += 1
+    half = _INT_CONVERSION_THRESHOLD << k
+    high, low = divmod(value, _int_power(k))
+    return _limbs_from_int(low, half) + _limbs_from_int(high, size - half)
+
+
+def _int_from_limbs(arr_, start: int = 0, stop: int = None) -> int:
+    """ Convert arr[start:stop] to int, by recursive combining of halves """
+    stop = len(arr_) if stop is None else stop
+    if stop - start <= _INT_CONVERSION_THRESHOLD:
+        value = 0
+        for i in range(stop - 1, start - 1, -1):
+            value = value * _BASE + arr_[i]
+        return value
+    k = 0
+    while _INT_CONVERSION_THRESHOLD << (k + 1) < stop - start:
+        k += 1
+    middle = start + (_INT_CONVERSION_THRESHOLD << k)
+    return _int_from_limbs(arr_, middle, stop) * _int_power(k) + _int_from_limbs(arr_, start, middle)
+
+
+def _shift_limbs(arr_, count: int) -> array:
+    """ Compute arr * BASE ** count """
+    if len(arr_) == 1 and arr_[0] == 0:
+        return _new_limbs(arr_)
+    return _new_limbs([0] * count) + _new_limbs(arr_)
+
+
+# Divisor size (in limbs) from which the Burnikel-Ziegler recursive division is used
+BURNIKEL_ZIEGLER_THRESHOLD = 160
+
+
+def _divmod_knuth(arr1_, arr2_):
+    """ Knuth's Algorithm D (TAOCP vol. 2, 4.3.1), arr2 has at least 2 limbs """
+    n = len(arr2_)
+    m = len(arr1_) - n
+    if m < 0:
+        return _new_limbs([0]), _new_limbs(arr1_)
+
+    # normalize, so that the top limb of the divisor is at least BASE / 2
+    d = _BASE // (arr2_[-1] + 1)
+    vn = _mul_small(arr2_, d).tolist()
+    un = _mul_small(arr1_, d).tolist()
+    un += [0] * (len(arr1_) + 1 - len(un))
+    v_top, v_next = vn[-1], vn[-2]
+
+    q = [0] * (m + 1)
+    for j in range(m, -1, -1):
+        # estimate the quotient limb from the top limbs, it is at most 2 too big
+        qhat, rhat = divmod(un[j + n] * _BASE + un[j + n - 1], v_top)
+        while qhat >= _BASE or qhat * v_next > rhat * _BASE + un[j + n - 2]:
+            qhat -= 1
+            rhat += v_top
+            if rhat >= _BASE:
+                break
+        if qhat == 0:
+            continue
+
+        # multiply and subtract
+        carry = borrow = 0
+        for i in range(n):
+            res = qhat * vn[i] + carry
+            carry = res // _BASE
+            res = un[i + j] - (res - carry * _BASE) - borrow
+            if res < 0:
+                un[i + j] = res + _BASE
+                borrow = 1
+            else:
+                un[i + j] = res
+                borrow = 0
+        res = un[j + n] - carry - borrow
+
+        if res < 0:
+            # the estimate was one too big - add back
+            qhat -= 1
+            carry = 0
+            for i in range(n):
+                res2 = un[i + j] + vn[i] + carry
+                if res2 >= _BASE:
+                    un[i + j] = res2 - _BASE
+                    carry = 1
+                else:
+                    un[i + j] = res2
+                    carry = 0
+            res = (res + _BASE + carry) % _BASE
+        un[j + n] = res
+        q[j] = qhat
+
+    r, remainder = _divmod_small(_trim(_new_limbs(un[:n])), d)
+    assert remainder == 0, "Invalid normalization!"
+    return _trim(_new_limbs(q)), r
+
+
+def _div2n1n(arr1_, arr2_, n: int):
+    """ Burnikel-Ziegler: divide arr1 < arr2 * BASE ** n by the n limbs normalized arr2 """
+    if n < BURNIKEL_ZIEGLER_THRESHOLD:
+        return _divmod_knuth(arr1_, arr2_)
+    pad = n % 2
+    if pad:
+        arr1_, arr2_, n = _shift_limbs(arr1_, 1), _shift_limbs(arr2_, 1), n + 1
+    half = n // 2
+    b2, b1 = _split_limbs(arr2_, half)
+    a34, a12 = _split_limbs(arr1_, n)
+    a4, a3 = _split_limbs(a34, half)
+    q1, r = _div3n2n(a12, a3, arr2_, b1, b2, half)
+    q2, r = _div3n2n(r, a4, arr2_, b1, b2, half)
+    if pad:
+        r = _split_limbs(r, 1)[1]
+    return _combine([q2, q1], half), r
+
+
+def _div3n2n(a12, a3, arr2_, b1, b2, n: int):
+    """ Burnikel-Ziegler: divide a12 * BASE ** n + a3 by arr2 = b1 * BASE ** n + b2 """
+    _, a1 = _split_limbs(a12, n)
+    if _cmp_limbs(a1, b1) == 0:
+        # the quotient would be BASE ** n or more, use BASE ** n - 1 instead
+        q = _new_limbs([_BASE - 1] * n)
+        r = _sub_limbs(_add_limbs(a12, b1), _shift_limbs(b1, n))
+    else:
+        q, r = _div2n1n(a12, b1, n)
+    # r * BASE ** n + a3 - q * b2 might be negative, fix it by decrementing q
+    r = _add_limbs(_shift_limbs(r, n), a3)
+    d = _mul_limbs(q, b2)
+    while _cmp_limbs(r, d) < 0:
+        q = _isub_limbs(q, [1])
+        r = _iadd_limbs(r, arr2_)
+    return q, _isub_limbs(r, d)
+
+
+def _divmod_burnikel_ziegler(arr1_, arr2_):
+    """ Recursive division of Burnikel and Ziegler, for large divisors """
+    d = _BASE // (arr2_[-1] + 1)
+    b = _mul_small(arr2_, d)
+    a = _mul_small(arr1_, d)
+    n = len(b)
+
+    # the dividend as base BASE ** n digits, the top one smaller than b
+    chunks = [_trim(a[i:i + n]) for i in range(0, len(a), n)]
+    r = chunks.pop() if _cmp_limbs(chunks[-1], b) < 0 else _new_limbs([0])
+    q_chunks = []
+    while chunks:
+        q_chunk, r = _div2n1n(_add_limbs(_shift_limbs(r, n), chunks.pop()), b, n)
+        q_chunks.append(q_chunk)
+
+    r, remainder = _divmod_small(r, d)
+    assert remainder == 0, "Invalid normalization!"
+    return _combine(q_chunks[::-1], n), r
+
+
+def _divmod_limbs(arr1_, arr2_):
+    """ Compute divmod(arr1, arr2), choosing the algorithm by the operand sizes """
+    if _cmp_limbs(arr1_, arr2_) < 0:
+        return _new_limbs([0]), _new_limbs(arr1_)
+    if len(arr2_) == 1:
+        q, r = _divmod_small(arr1_, arr2_[0])
+        return q, _new_limbs([r])
+    if len(arr2_) < BURNIKEL_ZIEGLER_THRESHOLD or len(arr1_) - len(arr2_) < BURNIKEL_ZIEGLER_THRESHOLD:
+        return _divmod_knuth(arr1_, arr2_)
+    return _divmod_burnikel_ziegler(arr1_, arr2_)
+
+
+def _barrett_mu(modulus) -> array:
+    """ Barrett's constant BASE ** (2 * k) // modulus, for a k limbs modulus """
+    return _divmod_limbs(_shift_limbs(_new_limbs([1]), 2 * len(modulus)), modulus)[0]
+
+
+def _barrett_reduce(arr_, modulus, mu) -> array:
+    """ Compute arr mod modulus using only multiplications, arr < BASE ** (2 * k) """
+    k = len(modulus)
+    if len(arr_) < k:
+        return arr_
+    # estimate the quotient, it is at most 2 smaller than the real one
+    q = _split_limbs(_mul_limbs(_split_limbs(arr_, k - 1)[1], mu), k + 1)[1]
+    r = _sub_limbs(arr_, _mul_limbs(q, modulus))
+    while _cmp_limbs(r, modulus) >= 0:
+        _isub_limbs(r, modulus)
+    return r
+
+
+def _pow_limbs(arr_, exponent: int, modulus=None) -> array:
+    """ Left-to-right sliding window exponentiation, exponent >= 1; reduced by modulus if given """
+    if modulus is not None:
+        mu = _barrett_mu(modulus)
+        arr_ = _divmod_limbs(arr_, modulus)[1]
+
+    def __reduce(value):
+        return value if modulus is None else _barrett_reduce(value, modulus, mu)
+
+    bits = exponent.bit_length()
+    window = 1 if bits <= 8 else 2 if bits <= 24 else 3 if bits <= 80 else 4 if bits <= 240 else 5
+
+    # precompute the odd powers base ** 1, base ** 3, ..., base ** (2 ** window - 1)
+    odd_powers = [__reduce(arr_)]
+    if window > 1:
+        square = __reduce(_sqr_limbs(odd_powers[0]))
+        for _ in range((1 << (window - 1)) - 1):
+            odd_powers.append(__reduce(_mul_limbs(odd_powers[-1], square)))
+
+    result = None
+    i = bits - 1
+    while i >= 0:
+        if not (exponent >> i) & 1:
+            result = __reduce(_sqr_limbs(result))
+            i -= 1
+            continue
+        # the longest window of at most `window` bits starting at bit i and ending with a set bit
+        j = max(i - window + 1, 0)
+        while not (exponent >> j) & 1:
+            j += 1
+        value = (exponent >> j) & ((1 << (i - j + 1)) - 1)
+        if result is None:
+            result = odd_powers[value >> 1]
+        else:
+            for _ in range(i - j + 1):
+                result = __reduce(_sqr_limbs(result))
+            result = __reduce(_mul_limbs(result, odd_powers[value >> 1]))
+        i = j - 1
+    return result
+
+
+def _isqrt_limbs(arr_) -> array:
+    """ Integer square root by Newton's method, starting from the square root of the top half """
+    if len(arr_) <= 2:
+        value = arr_[-1] * _BASE + arr_[0] if len(arr_) == 2 else arr_[0]
+        return _from_small_int(math.isqrt(value))
+
+    # sqrt(arr) < (isqrt(top) + 1) * BASE ** k, an overestimate with half of the limbs correct
+    k = max(1, len(arr_) // 4)
+    x = _shift_limbs(_add_limbs(_isqrt_limbs(_new_limbs(arr_[2 * k:])), [1]), k)
+
+    # every step roughly doubles the correct limbs, the sequence decreases until isqrt(arr)
+    while True:
+        # the quotient is a new array, so y = (x + q) // 2 is computed in it in place
+        y, _ = _divmod_limbs(arr_, x)
+        _iadd_limbs(y, x)
+        _idivmod_small(y, 2)
+        if _cmp_limbs(y, x) >= 0:
+            return x
+        x = y
+
+
+def _log10_limbs(arr_) -> float:
+    """ log10(arr) for arr > 0, from the top two limbs """
+    top = arr_[-1] * _BASE + arr_[-2] if len(arr_) > 1 else arr_[-1]
+    return math.log10(top) + _LIMB_DIGITS * max(len(arr_) - 2, 0)
+
+
+def _iroot_limbs(arr_, k: int) -> array:
+    """ Integer k-th root by Newton's method, starting from an overestimate with the top digits correct """
+    if k == 1 or (len(arr_) == 1 and arr_[0] < 2):
+        return _new_limbs(arr_)
+    if k == 2:
+        return _isqrt_limbs(arr_)
+    if k > 4 * _digits_count(arr_):
+        # arr < 10 ** digits < 2 ** k
+        return _new_limbs([1])
+
+    m = (len(arr_) + k - 1) // k // 2
+    if m > 0:
+        # (iroot(top) + 1) * BASE ** m is an overestimate with half of the limbs correct,
+        # where top = arr // BASE ** (k * m)
+        x = _shift_limbs(_add_limbs(_iroot_limbs(_new_limbs(arr_[k * m:]), k), [1]), m)
+    else:
+        # a root of at most one limb, from its logarithm rounded up (the relative error of the
+        # float computations is much smaller than the margin)
+        x = _from_small_int(int(10 ** (_log10_limbs(arr_) / k) * (1 + 1e-9)) + 1)
+
+    # x = ((k - 1) * x + arr // x ** (k - 1)) // k decreases until the root, like for the square root
+    while True:
+        y, _ = _divmod_limbs(arr_, _pow_limbs(x, k - 1))
+        _iadd_limbs(y, _mul_small(x, k - 1))
+        _idivmod_small(y, k)
+        _trim(y)
+        if _cmp_limbs(y, x) >= 0:
+            return x
+        x = y
+
+
+def _ilog_limbs(arr_, base_) -> int:
+    """ floor(log(arr, base)) for arr >= 1 and base >= 2, estimated from the logarithms of the top
+    limbs and corrected with exact powers """
+    if _cmp_limbs(arr_, base_) < 0:
+        return 0
+    e = max(int(_log10_limbs(arr_) / _log10_limbs(base_)), 1)
+    power = _pow_limbs(base_, e)
+    while _cmp_limbs(power, arr_) > 0:
+        e -= 1
+        power, _ = _divmod_limbs(power, base_)
+    while True:
+        bigger = _mul_limbs(power, base_)
+        if _cmp_limbs(bigger, arr_) > 0:
+            return e
+        e += 1
+        power = bigger
+
+
+# Count of word sized factors multiplied one by one at the leaves of the product trees
+_PRODUCT_LEAF = 16
+
+
+def _product_limbs(factors: list, start: int = 0, stop: int = None) -> array:
+    """ Product of factors[start:stop] (ints, 0 < factor < BASE) by binary splitting, so the big
+    multiplications have operands of similar sizes """
+    stop = len(factors) if stop is None else stop
+    if stop - start <= _PRODUCT_LEAF:
+        acc = _new_limbs([1])
+        for i in range(start, stop):
+            _imul_small(acc, factors[i])
+        return acc
+    middle = (start + stop) // 2
+    return _mul_limbs(_product_limbs(factors, start, middle), _product_limbs(factors, middle, stop))
+
+
+def _product_tree(values: list) -> array:
+    """ Product of limb arrays by binary splitting """
+    while len(values) > 1:
+        values = [_mul_limbs(values[i], values[i + 1]) if i + 1 < len(values) else values[i]
+                  for i in range(0, len(values), 2)]
+    return _trim(values[0])
+
+
+def _primes(n: int) -> list:
+    """ The primes up to n, by the sieve of Eratosthenes """
+    if n < 2:
+        return []
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, math.isqrt(n) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, n + 1, p)))
+    return [p for p in range(n + 1) if sieve[p]]
+
+
+def _prime_power_factors(primes: list, exponent) -> list:
+    """ The factors p ** exponent(p) of the primes with a non zero exponent, as word sized factors """
+    factors = []
+    for p in primes:
+        e = exponent(p)
+        while e:
+            # split the powers, so every factor is below BASE
+            power = 1
+            while e and power * p < _BASE:
+                power *= p
+                e -= 1
+            factors.append(power)
+    return factors
+
+
+def _swing_limbs(n: int, primes: list) -> array:
+    """ The swinging factorial n! / ((n // 2)!) ** 2, from its prime factorization """
+    def __exponent(p):
+        # the bits of floor(n / p ** i), summed modulo 2
+        e, q = 0, n
+        while q:
+            q //= p
+            e += q & 1
+        return e
+    return _product_limbs(_prime_power_factors([p for p in primes if p <= n], __exponent))
+
+
+def _factorial_limbs(n: int, primes: list = None) -> array:
+    """ Luschny's prime swing factorial: n! = ((n // 2)!) ** 2 * swing(n), so most of the work is
+    done by squarings of the smaller factorials """
+    if primes is None:
+        primes = _primes(n)
+    if n < 2:
+        return _new_limbs([1])
+    return _mul_limbs(_sqr_limbs(_factorial_limbs(n // 2, primes)), _swing_limbs(n, primes))
+
+
+def _binomial_limbs(n: int, k: int) -> array:
+    """ n! / (k! * (n - k)!) for 0 <= k <= n / 2 """
+    if k == 0:
+        return _new_limbs([1])
+    if n < _BASE and n <= 4 * k:
+        # Kummer: the exponent of p is the count of the carries when adding k and n - k in base p
+        def __exponent(p):
+            e, a, b, carry = 0, k, n - k, 0
+            while a or b:
+                carry = 1 if a % p + b % p + carry >= p else 0
+                e += carry
+                a //= p
+                b //= p
+            return e
+        return _product_limbs(_prime_power_factors(_primes(n), __exponent))
+    # few big factors: (n - k + 1) * ... * n, divided exactly by k!
+    numerator = _product_tree([_new_limbs(_limbs_from_int(n - i)) for i in range(k)])
+    quotient, _ = _divmod_limbs(numerator, _factorial_limbs(k))
+    return quotient
+
+
+def _combine_limbs(arr1_, c1: int, arr2_, c2: int) -> array:
+    """ Compute c1 * arr1 + c2 * arr2 for int coefficients of any sign, the result has to be non negative """
+    result = _new_limbs()
+    carry = 0
+    for i in range(max(len(arr1_), len(arr2_))):
+        res = (c1 * arr1_[i] if i < len(arr1_) else 0) + (c2 * arr2_[i] if i < len(arr2_) else 0) + carry
+        carry, limb = divmod(res, _BASE)
+        result.append(limb)
+    while carry > 0:
+        carry, limb = divmod(carry, _BASE)
+        result.append(limb)
+    assert carry == 0, "negative linear combination"
+    return _trim(result)
+
+
+# Count of top limbs from which Lehmer's gcd computes the quotients, about half of their digits are
+# reduced by every linear combination
+_LEHMER_LIMBS = 16
+
+
+def _gcd_limbs(arr1_, arr2_) -> array:
+    """ Lehmer's gcd: the quotients of the Euclidean steps are found from the top limbs only,
+    and several steps are applied at once as a linear combination of the operands """
+    a, b = _new_limbs(arr1_), _new_limbs(arr2_)
+    if _cmp_limbs(a, b) < 0:
+        a, b = b, a
+    while len(b) > _LEHMER_LIMBS:
+        n = len(a)
+        x = _int_from_limbs(a, n - _LEHMER_LIMBS)
+        y = _int_from_limbs(b, n - _LEHMER_LIMBS) if len(b) > n - _LEHMER_LIMBS else 0
+        # Knuth's algorithm L: the quotient is used only when the bounds of the cofactors agree on it
+        c1, d1, c2, d2 = 1, 0, 0, 1
+        while y + c2 != 0 and y + d2 != 0:
+            q = (x + c1) // (y + c2)
+            if q != (x + d1) // (y + d2):
+                break
+            c1, c2 = c2, c1 - q * c2
+            d1, d2 = d2, d1 - q * d2
+            x, y = y, x - q * y
+        if d1 == 0:
+            # no quotient could be found from the top limbs, one full division step
+            a, b = b, _divmod_limbs(a, b)[1]
+        else:
+            a, b = _combine_limbs(a, c1, b, d1), _combine_limbs(a, c2, b, d2)
+    if len(b) == 1 and b[0] == 0:
+        return a
+    a, b = b, _divmod_limbs(a, b)[1]
+    return _from_small_int(math.gcd(_int_from_limbs(a), _int_from_limbs(b)))
+
+
+def _factorial_digits(n: int) -> int:
+    """ lower bound of the digits count of n!, from Stirling's formula n! > (n / e) ** n """
+    if n < 3:
+        return 1
+    if n.bit_length() > 1000:
+        # too big for a float: n! > (n / e) ** n > 10 ** n
+        return n
+    return max(math.floor(n * (math.log10(n) - math.log10(math.e)) * (1 - 1e-12)) + 1, 1)
+
+
+def _binomial_digits(n: int, k: int) -> int:
+    """ lower bound of the digits count of n! / (k! * (n - k)!), for 0 < k <= n / 2: (n / k) ** k """
+    if k == 0:
+        return 1
+    if k.bit_length() > 1000:
+        # too big for a float: (n / k) ** k >= 2 ** k > 10 ** (0.30102 * k)
+        return k * 30102 // 100000
+    return max(math.floor(k * (math.log10(n) - math.log10(k)) * (1 - 1e-12)) + 1, 1)
+
+
+def _factorial_mod(n: int, prime: int) -> int:
+    result = 1
+    for i in range(2, min(n, prime - 1) + 1):
+        result = result * i % prime
+    return result if n < prime else 0
+
+
+def _binomial_mod(n: int, k: int, prime: int) -> int:
+    """ n! / (k! * (n - k)!) mod prime, by Lucas' theorem: the product of the binomials of the base prime digits """
+    result = 1
+    while k and result:
+        ni, ki = n % prime, k % prime
+        if ki > ni:
+            return 0
+        ki = min(ki, ni - ki)
+        numerator = denominator = 1
+        for i in range(ki):
+            numerator = numerator * (ni - i) % prime
+            denominator = denominator * (i + 1) % prime
+        result = result * numerator * pow(denominator, prime - 2, prime) % prime
+        n //= prime
+        k //= prime
+    return result
+
+
+class Verification(enum.IntEnum):
+    """Policy of the arithmetic self-checks"""
+    OFF = 0     # no checks
+    SAMPLE = 1  # check every n-th BigNum operation modulo a few word sized primes
+    FINAL = 2   # check only the final result of an evaluation, see expr_parser.expr_solve
+
+
+# word sized primes used to verify the results by their residues
+_VERIFICATION_PRIMES = (4294967291, 4294967279)
+
+
+def _residue(arr_, prime: int) -> int:
+    result = 0
+    for i in range(len(arr_) - 1, -1, -1):
+        result = (result * _BASE + arr_[i]) % prime
+    return result
+
+
+class EvaluationContext:
+    """Digits limit and self-checks policy of the BigNum operations of one evaluation"""
+
+    def __init__(self, maximum_digits: int = 1000, verification: Verification = Verification.OFF,
+                 verification_period: int = 16):
+        self.maximum_digits = maximum_digits
+        self.verification = verification
+        self.verification_period = verification_period
+        self.operations_count = 0
+
+    def copy(self):
+        return EvaluationContext(self.maximum_digits, self.verification, self.verification_period)
+
+    def __repr__(self):
+        return "EvaluationContext(maximum_digits={}, verification={}, verification_period={})".format(
+            self.maximum_digits, self.verification.name, self.verification_period)
+
+
+# template of the context of every thread that did not set one yet, like decimal.DefaultContext
+DEFAULT_CONTEXT = EvaluationContext()
+
+_current_context = contextvars.ContextVar("bignum_context")
+
+
+def get_context() -> EvaluationContext:
+    """ context of the current thread or asyncio task, created from DEFAULT_CONTEXT on first use """
+    try:
+        return _current_context.get()
+    except LookupError:
+        context = DEFAULT_CONTEXT.copy()
+        _current_context.set(context)
+        return context
+
+
+def set_context(context: EvaluationContext):
+    _current_context.set(context)
+
+
+@contextlib.contextmanager
+def local_context(context: EvaluationContext = None, **settings):
+    """Run a block with a copy of context (default the current one) updated with settings,
+    e.g. `with local_context(maximum_digits=50): ...`; the previous context is restored at exit"""
+    context = (context if context is not None else get_context()).copy()
+    for name, value in settings.items():
+        if not hasattr(context, name):
+            raise AttributeError("unknown context setting " + name)
+        if value is not None:
+            setattr(context, name, value)
+    if context.maximum_digits <= 0:
+        raise Exception("invalid exponent value")
+    if context.verification_period <= 0:
+        raise Exception("invalid verification period")
+    context.verification = Verification(context.verification)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
+
+
 class BigNum:
     """A generic class for operations with big numbers"""
 
-    _maximum_digits = 1000
+    # the limbs are shared between copies, so they are never modified once wrapped in a BigNum
+    __hash = None
 
     def __digits_count(self):
-        return len(self.__arr_digits)
+        return _digits_count(self.__limbs)
 
     def __reset(self):
-        self.__arr_digits = []  # internal representation - array of digits
+        self.__limbs = _new_limbs()  # internal representation - array of base 10**9 limbs
 
     def __check_digits(self, nr_digits, err: str = "Maximum digits count reached!"):
-        if nr_digits > self._maximum_digits:
+        if nr_digits > get_context().maximum_digits:
             raise Exception(err)
 
+    @staticmethod
+    def __sampled() -> bool:
+        """ True when the current operation has to be verified """
+        context = get_context()
+        if context.verification != Verification.SAMPLE:
+            return False
+        context.operations_count += 1
+        return context.operations_count % context.verification_period == 0
+
+    @staticmethod
+    def __congruent(relation, *operands) -> bool:
+        """ check relation(prime, residues of operands...) for all the verification primes """
+        return all(relation(p, *[_residue(x.__limbs, p) for x in operands]) for p in _VERIFICATION_PRIMES)
+
+    @staticmethod
+    def __verify(condition: bool):
+        if not condition:
+            raise Exception("Arithmetic verification failed!")
+
     def __from_int(self, value: int):
         assert isinstance(value, int), "Value is not int!"
         assert value >= 0
 
-        self.__check_digits(len(str(value)))
+        # reject the too big values before the conversion, from a lower bound of the digits count
+        self.__check_digits(max(value.bit_length() - 1, 0) * 30102 // 100000 + 1)
 
-        self.__reset()
+        self.__limbs = _trim(_new_limbs(_limbs_from_int(value)))
 
-        if value == 0:
-            self.__arr_digits.append(0)
-            return
-        while value > 0:
-            self.__arr_digits.append(value % 10)
-            value //= 10
+        self.__check_digits(self.__digits_count())
 
     def __from_string(self, value: str):
         assert isinstance(value, str), "Value is not str!"
 
         self.__check_digits(len(value))
 
+        if not value.isascii() or not value.isdigit():
+            raise Exception("Invalid numeric string!")
+
         self.__reset()
 
-        try:
-            for el in value[::-1]:
-                self.__arr_digits.append(int(el))
-        except ValueError:
-            assert True, "Invalid numeric string!"
+        for end in range(len(value), 0, -_LIMB_DIGITS):
+            self.__limbs.append(int(value[max(0, end - _LIMB_DIGITS):end]))
+        _trim(self.__limbs)
 
     def __from_array(self, value: list):
         assert isinstance(value, list), "Value is not list!"
 
         self.__check_digits(len(value))
 
-        self.__reset()
-
         try:
-            for el in value:
-                self.__arr_digits.append(int(el))
+            digits = "".join(str(int(el)) for el in value[::-1])
         except ValueError:
-            assert True, "Invalid list value!"
+            raise Exception("Invalid list value!")
+        self.__from_string(digits if digits else "0")
 
     def __from_bignum(self, value):
         assert isinstance(self, BigNum)
-        self.__arr_digits = value.__arr_digits.copy()
+        self.__limbs = value.__limbs
+        self.__hash = value.__hash
 
     @staticmethod
-    def __normalize_arrays(arr1_, arr2_):
-        if len(arr1_) != len(arr2_):
-            if len(arr1_) > len(arr2_):
-                arr2_ = arr2_ + [0] * (len(arr1_) - len(arr2_))
-            else:
-                arr1_ = arr1_ + [0] * (len(arr2_) - len(arr1_))
-        return arr1_, arr2_
+    def __coerce(value):
+        """ convert an operand to BigNum, without copying it when it is already a BigNum """
+        if isinstance(value, BigNum):
+            return value
+        if type(value) is int and 0 <= value < _BASE:
+            # word sized operand - a single limb, no digits conversion needed
+            if value in _INTERNED:
+                return _INTERNED[value]
+            return BigNum.__from_limbs(_new_limbs([value]))
+        return BigNum(value)
+
+    def __is_zero(self) -> bool:
+        return len(self.__limbs) == 1 and self.__limbs[0] == 0
 
-    def __trim_zeroes(self):
-        tmp = self.__arr_digits[-1:] == 0
-        while self.__digits_count() > 1 and self.__arr_digits[-1] == 0:
-            self.__arr_digits.pop()
-        return self
+    @staticmethod
+    def __from_limbs(limbs: array):
+        """ wrap an already trimmed limb array, without copying it """
+        result = BigNum.__new__(BigNum)
+        result.__limbs = limbs
+        result.__check_digits(result.__digits_count())
+        return result
 
     def __init__(self, value):
         if isinstance(value, int):
@@ -86,241 +1184,295 @@ class BigNum:
             raise Exception("Invalid value type!")
 
     def __eq__(self, other):
-        other = BigNum(other)
-        return \
-            self.__digits_count() == other.__digits_count() and \
-            all([self.__arr_digits[i] == other.__arr_digits[i] for i in range(self.__digits_count())])
+        other = BigNum.__coerce(other)
+        return self.__limbs is other.__limbs or _cmp_limbs(self.__limbs, other.__limbs) == 0
 
     def __ne__(self, other):
-        other = BigNum(other)
         return not self.__eq__(other)
 
     def __gt__(self, other):
-        other = BigNum(other)
-        if self.__digits_count() != other.__digits_count():
-            return self.__digits_count() > other.__digits_count()
-        for i in range(self.__digits_count() - 1, -1, -1):
-            if self.__arr_digits[i] > other.__arr_digits[i]:
-                return True
-            elif self.__arr_digits[i] < other.__arr_digits[i]:
-                return False
-        return False
+        other = BigNum.__coerce(other)
+        return _cmp_limbs(self.__limbs, other.__limbs) > 0
 
     def __ge__(self, other):
-        other = BigNum(other)
-        return not self < other
+        other = BigNum.__coerce(other)
+        return _cmp_limbs(self.__limbs, other.__limbs) >= 0
 
     def __lt__(self, other):
-        other = BigNum(other)
-        return other.__gt__(self)
+        other = BigNum.__coerce(other)
+        return _cmp_limbs(self.__limbs, other.__limbs) < 0
+
+    def __le__(self, other):
+        other = BigNum.__coerce(other)
+        return _cmp_limbs(self.__limbs, other.__limbs) <= 0
+
+    def __hash__(self):
+        """ same hash as the equal int value, so BigNum and int keys are interchangeable """
+        if self.__hash is None:
+            modulus = sys.hash_info.modulus
+            value = 0
+            for i in range(len(self.__limbs) - 1, -1, -1):
+                value = (value * _BASE + self.__limbs[i]) % modulus
+            self.__hash = -2 if value == -1 else value
+        return self.__hash
 
     def __add__(self, other):
-        other = BigNum(other)
-
-        def __add_eq_len_arrays(arr1_, arr2_):
-            result = []
-            remainder = 0
-            for i in range(len(arr1_)):
-                res = arr1_[i] + arr2_[i] + remainder
-                result.append(res % 10)
-                remainder = res // 10
-            if remainder:
-                result.append(remainder)
-            return result
+        other = BigNum.__coerce(other)
 
-        __result = __add_eq_len_arrays(*BigNum.__normalize_arrays(self.__arr_digits, other.__arr_digits))
-        __result = BigNum(__result).__trim_zeroes()
+        __result = BigNum.__from_limbs(_add_limbs(self.__limbs, other.__limbs))
 
-        assert __result >= self and __result >= other
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, a, b, c: (a + b - c) % p == 0, self, other, __result))
 
         return __result
 
     def __sub__(self, other):
-        other = BigNum(other)
+        other = BigNum.__coerce(other)
 
         if self < other:
             raise Exception("Invalid sub operation! Negative result!")
 
-        def __sub_eq_len_arrays(arr1_, arr2_):
-            result = []
-            remainder = 0
-            for i in range(len(arr1_)):
-                res = arr1_[i] - arr2_[i] - remainder
-                remainder = 0
-                if res < 0:
-                    res += 10
-                    remainder = 1
-                result.append(res)
-            assert remainder == 0, "Negative result!"
-            return result
-
-        __result = __sub_eq_len_arrays(*BigNum.__normalize_arrays(self.__arr_digits, other.__arr_digits))
-        __result = BigNum(__result).__trim_zeroes()
+        __result = BigNum.__from_limbs(_sub_limbs(self.__limbs, other.__limbs))
 
-        assert __result <= self
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, a, b, c: (c + b - a) % p == 0, self, other, __result))
 
         return __result
 
     def __mul__(self, other):
-        other = BigNum(other)
-        if self == BigNum(0) or other == BigNum(0):
-            return BigNum(0)
+        other = BigNum.__coerce(other)
+        if self.__is_zero() or other.__is_zero():
+            return BigNum.ZERO
 
         self.__check_digits(self.__digits_count() + other.__digits_count() - 1)  # lowest: m+n-1; highest: m+n
 
-        def __mul_arrays(arr1_, arr2_):
-            """ Compute arr1 * arr2 """
-            result = [0] * (len(arr1_) + len(arr2_))
-            for j in range(len(arr2_)):
-                remainder = 0
-                for i in range(len(arr1_)):
-                    res = arr1_[i] * arr2_[j] + remainder
-                    res += result[i + j]
-                    result[i + j] = res % 10
-                    remainder = res // 10
-                if remainder:
-                    result[len(arr1_) + j] += remainder
-            return result
-
-        # optimize -- biggest array/number first
-        arr1, arr2 = [self.__arr_digits, other.__arr_digits] \
-            if self.__digits_count() >= other.__digits_count() \
-            else [other.__arr_digits, self.__arr_digits]
-
-        __result = __mul_arrays(arr1, arr2)
-        __result = BigNum(__result).__trim_zeroes()
-
-        assert __result >= self or __result >= other
+        if self.__limbs is other.__limbs or self == other:
+            return self.__square()
+
+        # decimal shift, when one of the operands is a power of ten
+        shift = _pow10_exponent(other.__limbs)
+        if shift is not None:
+            __result = BigNum.__from_limbs(_mul_pow10(self.__limbs, shift))
+        elif len(self.__limbs) == 1 and _pow10_exponent(self.__limbs) is not None:
+            __result = BigNum.__from_limbs(_mul_pow10(other.__limbs, _pow10_exponent(self.__limbs)))
+        else:
+            __result = BigNum.__from_limbs(_mul_limbs(self.__limbs, other.__limbs))
+
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, a, b, c: (a * b - c) % p == 0, self, other, __result))
 
         return __result
 
-    @staticmethod
-    def __internal_pow(n, p):
-        if p == 0:
-            return BigNum(1)
-        if p == 1:
-            return BigNum(n)
-        if p.__arr_digits[0] % 2 == 0:
-            return BigNum.__internal_pow(n * n, p // 2)
-        return n * BigNum.__internal_pow(n * n, p // 2)
+    def __square(self):
+        """ Compute self * self using the dedicated squaring algorithms """
+        self.__check_digits(2 * self.__digits_count() - 1)
+
+        __result = BigNum.__from_limbs(_sqr_limbs(self.__limbs))
+
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, a, c: (a * a - c) % p == 0, self, __result))
+
+        return __result
+
+    def __estimate_pow_digits(self, power: int) -> int:
+        """ lower bound of the digits count of self ** power, from the top limbs only """
+        return math.floor(power * _log10_limbs(self.__limbs) * (1 - 1e-12)) + 1
 
     def __pow__(self, power, modulo=None):
-        power = BigNum(power)
-        if power == 0:
-            return 1
-        if power == 1:
-            return BigNum(self.__arr_digits)  # copy
+        power = BigNum.__coerce(power)
 
-        if self > 1:
-            self.__check_digits(power)
+        if modulo is not None:
+            modulo = BigNum.__coerce(modulo)
+            if not modulo > 0:
+                raise Exception("Invalid modulo operand!")
+            if power == 0:
+                return BigNum.ONE % modulo
+            return BigNum.__from_limbs(_pow_limbs(self.__limbs, int(power), modulo.__limbs))
 
-        res = BigNum.__internal_pow(self, power)
-        assert res >= self
+        if power == 0:
+            return BigNum.ONE
+        if power == 1 or self < 2:
+            return self
+
+        # reject too big results before doing any multiplication
+        self.__check_digits(power)
+        power = int(power)
+        self.__check_digits(self.__estimate_pow_digits(power))
+
+        res = BigNum.__from_limbs(_pow_limbs(self.__limbs, power))
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, a, c: pow(a, power, p) == c, self, res))
         return res
 
     def __mod__(self, other):
-        other = BigNum(other)
+        other = BigNum.__coerce(other)
         if not other > 0:
             raise Exception("Invalid modulo operand!")
-        res = self - (self // other) * other
-        assert res < other
+        _, res = divmod(self, other)
         return res
 
     def __floordiv__(self, other):
         """ long division """
+        __result, _ = divmod(self, other)
+        return __result
+
+    def __divmod__(self, other):
+        """ quotient and remainder, computed by a single long division """
         a = self
-        b = BigNum(other)
+        b = BigNum.__coerce(other)
 
-        if b == 0:
+        if b.__is_zero():
             raise Exception("Division by 0!")
 
-        if a <= BigNum(0):
-            return BigNum(0)
+        if a < b:
+            return BigNum.ZERO, a
 
-        __q_array = [0] * a.__digits_count()
-        r = BigNum(0)
+        shift = _pow10_exponent(b.__limbs)
+        if shift is not None:
+            q, r = _divmod_pow10(a.__limbs, shift)
+        else:
+            q, r = _divmod_limbs(a.__limbs, b.__limbs)
+        q = BigNum.__from_limbs(q)
+        r = BigNum.__from_limbs(r)
 
-        for i in range(a.__digits_count())[::-1]:
-            r = r * 10 + a.__arr_digits[i]
-            while r >= b:
-                __q_array[i] += 1
-                r -= b
+        if BigNum.__sampled():
+            BigNum.__verify(r < b and BigNum.__congruent(lambda p, a_, b_, q_, r_: (b_ * q_ + r_ - a_) % p == 0, a, b, q, r))
 
-        __result = BigNum(__q_array).__trim_zeroes()
+        return q, r
 
-        assert b * __result + r == self
+    def sqrt(self):
+        """ integer square root, rounded down """
+        res, _ = self.isqrtrem()
+        return res
 
-        return __result
+    def isqrtrem(self):
+        """ integer square root and remainder: self = s * s + r, with 0 <= r <= 2 * s """
+        s = BigNum.__from_limbs(_isqrt_limbs(self.__limbs))
+        r = self - s.__square() if s > 1 else self - s
 
-    def sqrt(self):
-        n = BigNum(self.__arr_digits)  # copy
-        if n < 2:
-            return n
-
-        def __internal_sqrt(n_: BigNum):
-            if n_ < 2:
-                return n_
-            start, stop = BigNum(1), n_ // 2
-            while start <= stop:
-                m = (start + stop) // 2
-                sq = m * m
-                sq1 = (m+1) * (m+1)
-                if sq == n_ or (sq < n_ < sq1):
-                    return m
-                elif sq < n_:
-                    start = m + 1
-                else:
-                    stop = m - 1
-
-        def __find_d(p_: BigNum, r_: BigNum):
-            """ find the greatest digit d such that ((2p)|d) * d ≤ r """
-            n_ = p_ * 2
-            tmp_num = BigNum(n_)
-            tmp_num.__arr_digits.insert(0, 0)  # *= 10
-            for d_ in range(0, 10):
-                tmp_num.__arr_digits[0] = d_
-                if tmp_num * d_ <= r_:
-                    if d_ != 9:
-                        if (tmp_num + 1) * (d_ + 1) <= r_:
-                            continue
-                    return d_, tmp_num * d_
-
-        # pad with zero to have pairs of 2, if needed
-        if n.__digits_count() % 2 == 1:
-            n.__arr_digits.append(0)
-
-        r = BigNum(n.__arr_digits[-1] * 10 + n.__arr_digits[-2])
-        p = __internal_sqrt(r)
-        r = r - (p * p)
-
-        if n.__digits_count() > 2:
-            for i in range(0, n.__digits_count(), 2)[:-1][::-1]:
-                r = r * 100 + n.__arr_digits[i + 1] * 10 + n.__arr_digits[i]
-                d, tmp_r = __find_d(p, r)
-                p.__arr_digits.insert(0, 0)  # *= 10
-                p.__arr_digits[0] = d
-                r -= tmp_r  # r -= ((2p)|d * d)
-
-        res = p
-
-        assert res * res <= self < (res+1) * (res+1)
+        if BigNum.__sampled():
+            BigNum.__verify(r <= s + s and BigNum.__congruent(lambda p, n_, s_, r_: (s_ * s_ + r_ - n_) % p == 0, self, s, r))
 
+        return s, r
+
+    def iroot(self, k):
+        """ integer k-th root, rounded down """
+        res, _ = self.irootrem(k)
+        return res
+
+    def irootrem(self, k):
+        """ integer k-th root and remainder: self = s ** k + r, with s ** k <= self < (s + 1) ** k """
+        k = BigNum.__coerce(k)
+        if k.__is_zero():
+            raise Exception("Invalid root degree!")
+        # the roots of a degree above the bits of self are 1, self < 10 ** limit < 2 ** BASE
+        k = k.__limbs[0] if len(k.__limbs) == 1 else _BASE
+        s = BigNum.__from_limbs(_iroot_limbs(self.__limbs, k))
+        r = BigNum.__from_limbs(_sub_limbs(self.__limbs, _pow_limbs(s.__limbs, k)))
+
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, n_, s_, r_: (pow(s_, k, p) + r_ - n_) % p == 0, self, s, r))
+
+        return s, r
+
+    def ilog(self, base):
+        """ integer logarithm, rounded down: base ** e <= self < base ** (e + 1) """
+        base = BigNum.__coerce(base)
+        if self.__is_zero():
+            raise Exception("Invalid log operand!")
+        if base < 2:
+            raise Exception("Invalid log base!")
+        res = BigNum.__coerce(_ilog_limbs(self.__limbs, base.__limbs))
+
+        if BigNum.__sampled():
+            power = _pow_limbs(base.__limbs, int(res)) if not res.__is_zero() else _new_limbs([1])
+            BigNum.__verify(_cmp_limbs(power, self.__limbs) <= 0 < _cmp_limbs(_mul_limbs(power, base.__limbs), self.__limbs))
+        return res
+
+    def factorial(self):
+        """ self!, by the prime swing algorithm """
+        n = int(self)
+        # reject too big results before doing any multiplication
+        self.__check_digits(_factorial_digits(n))
+
+        res = BigNum.__from_limbs(_factorial_limbs(n))
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, c: _factorial_mod(n, p) == c, res))
+        return res
+
+    def binomial(self, k):
+        """ the binomial coefficient self! / (k! * (self - k)!), 0 when k > self """
+        k = BigNum.__coerce(k)
+        if k > self:
+            return BigNum.ZERO
+        n = int(self)
+        k = min(int(k), n - int(k))
+        self.__check_digits(_binomial_digits(n, k))
+
+        res = BigNum.__from_limbs(_binomial_limbs(n, k))
+        if BigNum.__sampled():
+            BigNum.__verify(BigNum.__congruent(lambda p, c: _binomial_mod(n, k, p) == c, res))
+        return res
+
+    def gcd(self, other):
+        """ greatest common divisor, by Lehmer's algorithm; gcd(0, 0) == 0 """
+        other = BigNum.__coerce(other)
+        res = BigNum.__from_limbs(_gcd_limbs(self.__limbs, other.__limbs))
+
+        if BigNum.__sampled():
+            BigNum.__verify(res.__is_zero() or all(
+                not any(_divmod_limbs(x.__limbs, res.__limbs)[1]) for x in (self, other)))
         return res
 
+    def __int__(self):
+        return _int_from_limbs(self.__limbs)
+
     def __str__(self):
-        return "".join(str(el) for el in self.__arr_digits[::-1])
+        # every limb is exactly 9 decimal digits, so no radix conversion is needed
+        limbs = self.__limbs
+        return str(limbs[-1]) + "".join(map(_LIMB_FORMAT.format, reversed(limbs[:-1])))
+
+    def write_to(self, file, chunk_limbs: int = 4096):
+        """ write the decimal digits to a text file, in chunks, without building the whole string """
+        limbs = self.__limbs
+        file.write(str(limbs[-1]))
+        for stop in range(len(limbs) - 1, 0, -chunk_limbs):
+            chunk = limbs[max(0, stop - chunk_limbs):stop]
+            file.write("".join(map(_LIMB_FORMAT.format, reversed(chunk))))
 
     @classmethod
     def exponent(cls, value = None):
-        """Getter and setter for maximum digits class variable"""
-        
+        """Getter and setter for the maximum digits of the current evaluation context"""
+
         if value is None:
-            return cls._maximum_digits
+            return get_context().maximum_digits
 
         if value == 0:
             raise Exception("invalid exponent value")
 
-        cls._maximum_digits = value 
+        get_context().maximum_digits = value
+
+    @classmethod
+    def verification(cls, mode: Verification = None, period: int = None):
+        """Getter and setter for the arithmetic self-checks policy of the current context; SAMPLE verifies one of every period operations"""
+
+        context = get_context()
+        if mode is None and period is None:
+            return context.verification
+
+        if period is not None:
+            if period <= 0:
+                raise Exception("invalid verification period")
+            context.verification_period = period
+
+        if mode is not None:
+            context.verification = Verification(mode)
+
+
+BigNum.ZERO = BigNum(0)
+BigNum.ONE = BigNum(1)
+BigNum.TEN = BigNum(10)
+_INTERNED = {0: BigNum.ZERO, 1: BigNum.ONE, 10: BigNum.TEN}
 
 
 if __name__ == '__main__':
@@ -340,5 +1492,3 @@ if __name__ == '__main__':
     assert BigNum("123190238120111111111111").sqrt() == 350984669351
     print(BigNum("2") ** BigNum(1000))
     # assert BigNum("1231902381201111111111").sqrt() == 35098466935
-
-
@@ -0,0 +1,344 @@
+import math
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, only BigNumArray needs it
+    numpy = None
+
+from bignum import BigNum, get_context, local_context, _BASE, _LIMB_DIGITS
+from int_num import _INT_STR_DIGITS
+
+
+# the biggest divisor of the vectorized short division, remainder * BASE + limb has to fit in int64
+_SHORT_DIVISOR_MAX = 2 ** 32
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("BigNumArray requires numpy, install it with: pip install numpy")
+
+
+def _trim_columns(matrix):
+    """ drop the most significant limb columns that are zero in every row, keeping at least one """
+    nonzero = numpy.flatnonzero(matrix.any(axis=0))
+    width = int(nonzero[-1]) + 1 if len(nonzero) else 1
+    return matrix[:, :width] if width < matrix.shape[1] else matrix
+
+
+def _pad_columns(matrix, width: int):
+    if matrix.shape[1] >= width:
+        return matrix
+    return numpy.pad(matrix, ((0, 0), (0, width - matrix.shape[1])))
+
+
+def _propagate(matrix):
+    """ normalize every limb to [0, BASE) moving the carries (or borrows) up, one column at a time;
+    the carry out of the top column is left in it """
+    for column in range(matrix.shape[1] - 1):
+        carry = matrix[:, column] // _BASE
+        matrix[:, column] -= carry * _BASE
+        matrix[:, column + 1] += carry
+    return matrix
+
+
+def _limbs_from_ints(values: list):
+    """ limb matrix of a list of non negative python ints, the columns are split for all the rows at once """
+    rest = numpy.array(values, dtype=object)
+    columns = []
+    while True:
+        columns.append((rest % _BASE).astype(numpy.int64))
+        rest = rest // _BASE
+        if not rest.any():
+            break
+    return numpy.stack(columns, axis=1)
+
+
+def _ints_from_limbs(matrix) -> list:
+    values = numpy.zeros(matrix.shape[0], dtype=object)
+    for column in range(matrix.shape[1] - 1, -1, -1):
+        values = values * _BASE + matrix[:, column].astype(object)
+    return [int(value) for value in values]
+
+
+class BigNumArray:
+    """A batch of big numbers stored as a limb matrix, one row per number, for evaluating
+    one expression over many variable bindings at once.
+
+    The rows use the BigNum representation (base 10**9 limbs, least significant first) and the
+    same digits limit. Batches of one row are broadcast against bigger batches, so the literals
+    of an expression are batches of one row. Additions, subtractions, multiplications, comparisons
+    and divisions by word sized divisors are vectorized over the rows; the other operations are
+    computed row by row with BigNum.
+    """
+
+    __array_priority__ = 1000  # numpy defers the mixed operators to BigNumArray
+    __hash__ = None
+
+    def __init__(self, values):
+        _require_numpy()
+        if isinstance(values, BigNumArray):
+            self.__limbs = values.__limbs
+            return
+        if isinstance(values, (list, tuple)) or (numpy is not None and isinstance(values, numpy.ndarray)):
+            values = list(values)
+        else:
+            values = [values]
+        if not values:
+            raise Exception("Empty BigNumArray!")
+        self.__limbs = BigNumArray.__checked(_limbs_from_ints([BigNumArray.__to_int(value) for value in values]))
+
+    @staticmethod
+    def __to_int(value) -> int:
+        if isinstance(value, str):
+            # same validation and limit as a BigNum literal
+            return int(BigNum(value))
+        if isinstance(value, BigNum):
+            return int(value)
+        if isinstance(value, bool) or not isinstance(value, (int, numpy.integer)):
+            raise Exception("Invalid value type!")
+        if value < 0:
+            raise Exception("Invalid negative value!")
+        return int(value)
+
+    @staticmethod
+    def __checked(matrix):
+        """ trim the limb matrix and check the biggest row against the digits limit """
+        matrix = _trim_columns(matrix)
+        top = int(matrix[:, -1].max())
+        digits = (matrix.shape[1] - 1) * _LIMB_DIGITS + len(str(top))
+        if digits > get_context().maximum_digits:
+            raise Exception("Maximum digits count reached!")
+        return matrix
+
+    @staticmethod
+    def __from_limbs(matrix, check: bool = True):
+        result = BigNumArray.__new__(BigNumArray)
+        result.__limbs = BigNumArray.__checked(matrix) if check else _trim_columns(matrix)
+        return result
+
+    @staticmethod
+    def __from_ints(values: list, check: bool = True):
+        return BigNumArray.__from_limbs(_limbs_from_ints(values), check)
+
+    @staticmethod
+    def __coerce(value):
+        if isinstance(value, BigNumArray):
+            return value
+        return BigNumArray(value)
+
+    @property
+    def batch_size(self) -> int:
+        return self.__limbs.shape[0]
+
+    def __rows(self, other) -> int:
+        if self.batch_size != other.batch_size and 1 not in (self.batch_size, other.batch_size):
+            raise Exception("Batch sizes {} and {} don't match!".format(self.batch_size, other.batch_size))
+        return max(self.batch_size, other.batch_size)
+
+    def __padded(self, other, extra: int = 0):
+        """ the limb matrices of both operands with the same width """
+        self.__rows(other)
+        width = max(self.__limbs.shape[1], other.__limbs.shape[1]) + extra
+        return _pad_columns(self.__limbs, width), _pad_columns(other.__limbs, width)
+
+    def __cmp(self, other):
+        """ -1, 0 or 1 for every row """
+        other = BigNumArray.__coerce(other)
+        a, b = self.__padded(other)
+        diff = a - b
+        nonzero = diff != 0
+        top = diff.shape[1] - 1 - numpy.argmax(nonzero[:, ::-1], axis=1)
+        return numpy.sign(diff[numpy.arange(diff.shape[0]), top]) * nonzero.any(axis=1)
+
+    def __eq__(self, other):
+        return self.__cmp(other) == 0
+
+    def __ne__(self, other):
+        return self.__cmp(other) != 0
+
+    def __gt__(self, other):
+        return self.__cmp(other) > 0
+
+    def __ge__(self, other):
+        return self.__cmp(other) >= 0
+
+    def __lt__(self, other):
+        return self.__cmp(other) < 0
+
+    def __le__(self, other):
+        return self.__cmp(other) <= 0
+
+    def __add__(self, other):
+        other = BigNumArray.__coerce(other)
+        a, b = self.__padded(other, 1)
+        return BigNumArray.__from_limbs(_propagate(a + b))
+
+    def __radd__(self, other):
+        return BigNumArray.__coerce(other) + self
+
+    def __sub__(self, other):
+        other = BigNumArray.__coerce(other)
+        a, b = self.__padded(other)
+        result = _propagate(a - b)
+        if (result[:, -1] < 0).any():
+            raise Exception("Invalid sub operation! Negative result!")
+        return BigNumArray.__from_limbs(result)
+
+    def __rsub__(self, other):
+        return BigNumArray.__coerce(other) - self
+
+    def __mul__(self, other):
+        other = BigNumArray.__coerce(other)
+        rows = self.__rows(other)
+        a, b = self.__limbs, other.__limbs
+        if a.shape[1] < b.shape[1]:
+            a, b = b, a
+        n, m = a.shape[1], b.shape[1]
+        result = numpy.zeros((rows, n + m), dtype=numpy.int64)
+        for i in range(m):
+            # the products are below BASE ** 2, so after adding one partial product it is enough to
+            # move the carries up by one column to keep all the limbs of the window below 2 * BASE
+            window = result[:, i:i + n]
+            window += a * b[:, i:i + 1]
+            carry = window // _BASE
+            window -= carry * _BASE
+            result[:, i + 1:i + n + 1] += carry
+        return BigNumArray.__from_limbs(_propagate(result))
+
+    def __rmul__(self, other):
+        return BigNumArray.__coerce(other) * self
+
+    def __divmod__(self, other):
+        other = BigNumArray.__coerce(other)
+        rows = self.__rows(other)
+        if (other == 0).any():
+            raise Exception("Division by 0!")
+        divisor = other.__limbs[:, 0]
+        if other.__limbs.shape[1] == 2:
+            divisor = divisor + other.__limbs[:, 1] * _BASE
+        if other.__limbs.shape[1] > 2 or divisor.max() > _SHORT_DIVISOR_MAX:
+            return self.__by_rows(lambda a, b: divmod(a, b), other, results=2)
+
+        # word sized divisors - short division from the top limb, for all the rows at once
+        a = self.__limbs
+        quotient = numpy.zeros((rows, a.shape[1]), dtype=numpy.int64)
+        remainder = numpy.zeros(rows, dtype=numpy.int64)
+        for column in range(a.shape[1] - 1, -1, -1):
+            current = remainder * _BASE + a[:, column]
+            quotient[:, column] = current // divisor
+            remainder = current - quotient[:, column] * divisor
+        remainder = numpy.stack([remainder % _BASE, remainder // _BASE], axis=1)
+        # like BigNum, the rows smaller than the divisor are returned unchanged, without the digits check
+        divided = numpy.broadcast_to(self >= other, (rows,))
+        if divided.any():
+            BigNumArray.__checked(quotient[divided])
+            BigNumArray.__checked(remainder[divided])
+        return BigNumArray.__from_limbs(quotient, False), BigNumArray.__from_limbs(remainder, False)
+
+    def __floordiv__(self, other):
+        quotient, _ = divmod(self, other)
+        return quotient
+
+    def __mod__(self, other):
+        other = BigNumArray.__coerce(other)
+        if not (other > 0).all():
+            raise Exception("Invalid modulo operand!")
+        _, remainder = divmod(self, other)
+        return remainder
+
+    def __pow__(self, power, modulo=None):
+        power = BigNumArray.__coerce(power)
+        if modulo is not None:
+            return self.__by_rows(lambda a, b, m: pow(a, b, m), power, BigNumArray.__coerce(modulo))
+        if power.batch_size > 1:
+            return self.__by_rows(lambda a, b: a ** b, power)
+
+        # the same exponent for all the rows - square and multiply with vectorized multiplications
+        exponent = int(power)
+        if exponent == 0:
+            return BigNumArray.__from_ints([1] * self.batch_size)
+        if exponent > 1:
+            # reject too big results before any multiplication, with the checks of BigNum on every row
+            limit = get_context().maximum_digits
+            for value in set(self.tolist()):
+                if value >= 2 and (exponent > limit or
+                                   math.floor(exponent * math.log10(value) * (1 - 1e-12)) + 1 > limit):
+                    raise Exception("Maximum digits count reached!")
+        result = self
+        for bit in bin(exponent)[3:]:
+            result = result * result
+            if bit == '1':
+                result = result * self
+        return result
+
+    def sqrt(self):
+        """ integer square root of every row, rounded down """
+        res, _ = self.isqrtrem()
+        return res
+
+    def isqrtrem(self):
+        """ integer square root and remainder of every row """
+        return self.__by_rows(lambda n: n.isqrtrem(), results=2)
+
+    def iroot(self, k):
+        """ integer k-th root of every row, rounded down """
+        res, _ = self.irootrem(k)
+        return res
+
+    def irootrem(self, k):
+        """ integer k-th root and remainder of every row """
+        return self.__by_rows(lambda n, k_: n.irootrem(k_), BigNumArray.__coerce(k), results=2)
+
+    def ilog(self, base):
+        """ integer logarithm of every row, rounded down """
+        return self.__by_rows(lambda n, b: n.ilog(b), BigNumArray.__coerce(base))
+
+    def factorial(self):
+        """ factorial of every row """
+        return self.__by_rows(lambda n: n.factorial())
+
+    def binomial(self, k):
+        """ binomial coefficient of every row """
+        return self.__by_rows(lambda n, k_: n.binomial(k_), BigNumArray.__coerce(k))
+
+    def gcd(self, other):
+        """ greatest common divisor of every row """
+        return self.__by_rows(lambda a, b: a.gcd(b), BigNumArray.__coerce(other))
+
+    def __by_rows(self, function, *others, results: int = 1):
+        """ compute function(*operands) on the BigNum values of every row """
+        rows = self.batch_size
+        for other in others:
+            rows = max(rows, self.__rows(other))
+        # the rows are already under the limit they were built with, so they are converted without
+        # the current one, like BigNum operands carried over from a bigger limit
+        digits = max(operand.__limbs.shape[1] for operand in (self,) + others) * _LIMB_DIGITS
+        with local_context(maximum_digits=max(get_context().maximum_digits, digits)):
+            operands = [[BigNum(value) for value in operand.tolist()] for operand in (self,) + others]
+        values = []
+        for i in range(rows):
+            value = function(*[column[i if len(column) > 1 else 0] for column in operands])
+            values.append(value if results > 1 else (value,))
+        # the results are checked by BigNum, or are operands returned unchanged
+        columns = [BigNumArray.__from_ints([int(value[k]) for value in values], False) for k in range(results)]
+        return tuple(columns) if results > 1 else columns[0]
+
+    def tolist(self) -> list:
+        return _ints_from_limbs(self.__limbs)
+
+    def __int__(self):
+        if self.batch_size != 1:
+            raise Exception("Only a batch of one row can be converted to int!")
+        return self.tolist()[0]
+
+    def __str__(self):
+        values = self.tolist()
+        if self.__limbs.shape[1] * _LIMB_DIGITS <= _INT_STR_DIGITS:
+            values = [str(value) for value in values]
+        else:
+            # BigNum prints the limbs directly, without the int to str conversion limit
+            values = [str(BigNum(value)) for value in values]
+        return values[0] if len(values) == 1 else "[" + ", ".join(values) + "]"
+
+    def __repr__(self):
+        return "BigNumArray({})".format(str(self))
@@ -39,5 +39,5 @@ class DataValidator:
         assert type(input_data) is str, "invalid value type"
 
         for char in input_data:
-            if not char.isalnum() and char not in "+-*/()^% ":
+            if not char.isalnum() and char not in "+-*/()^%, ":
                 raise Exception("invalid value, expected a valid math expression")
@@ -1,6 +1,11 @@
+import contextvars
 import enum
+import functools
+import heapq
+import re
 from typing import TypeVar
-from bignum import BigNum
+from bignum import BigNum, EvaluationContext, Verification, get_context, local_context, _binomial_mod, _factorial_mod
+from backends import get_backend
 
 T = TypeVar('T')
 
@@ -18,28 +23,76 @@ class TokenKind(enum.IntEnum):
     OPEN_PAREN = 9
     CLOSED_PAREN = 10
     END = 11
+    COMMA = 12
+    POWMOD = 13
+    FACT = 14
+    BINOM = 15
+    GCD = 16
+    ROOT = 17
+    ILOG = 18
 
 
 def is_operator(text: str):
     return text in ['+', '-', '*', '/', '%']
 
 
+KEYWORDS = {
+    'sqrt': TokenKind.SQRT,
+    'powmod': TokenKind.POWMOD,
+    'fact': TokenKind.FACT,
+    'binom': TokenKind.BINOM,
+    'gcd': TokenKind.GCD,
+    'root': TokenKind.ROOT,
+    'ilog': TokenKind.ILOG,
+}
+
+PUNCTUATION = {
+    '(': TokenKind.OPEN_PAREN,
+    ')': TokenKind.CLOSED_PAREN,
+    ',': TokenKind.COMMA,
+}
+
+OPERATORS = {
+    '**': TokenKind.DOUBLE_STAR,
+    '+': TokenKind.PLUS,
+    '-': TokenKind.MINUS,
+    '*': TokenKind.STAR,
+    '/': TokenKind.SLASH,
+    '%': TokenKind.MODULO,
+}
+
+# the spaces before a token and one alternative per token class; the words are letters only,
+# so "x2" is a variable followed by a number
+TOKEN_PATTERN = re.compile(r"""
+    \s*
+    (?:
+        (?P<number>\d+)
+      | (?P<word>[^\W\d_]+)
+      | (?P<symbol>\*\*|[-+*/%(),])
+    )
+""", re.VERBOSE)
+
+
 class SourceLocation:
+    __slots__ = ("start", "end")
+
     def __init__(self, start: int, end: int):
         self.start = start
         self.end = end
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({"start": self.start, "end": self.end})
 
 
 class Token:
+    __slots__ = ("kind", "loc")
+
     def __init__(self, kind: TokenKind, loc: SourceLocation = 0):
         self.kind = kind
         self.loc = loc
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({"kind": self.kind, "loc": self.loc})
 
 
 class ExpressionTokenizer:
@@ -50,74 +103,36 @@ class ExpressionTokenizer:
 
     def tokenize(self):
         assert len(self.tokens) == 0, "Cannot call tokenize more times"
-
-        while self.offset < len(self.source):
-            first = self.source[self.offset]
-
-            if first.isnumeric():
-                self.tokenize_number()
-            elif first.isspace():
-                self.offset += 1
-            elif first.isalpha():
-                self.tokenize_variable()
-            elif is_operator(first):
-                self.tokenize_operator()
-            elif first == '(' or first == ')':
-                ty = TokenKind.OPEN_PAREN if first == '(' else TokenKind.CLOSED_PAREN
-                token = Token(ty, SourceLocation(self.offset, self.offset + 1))
-                self.tokens.append(token)
-                self.offset += 1
-            else:
-                raise ValueError("unknown token")
-
-        self.tokens.append(Token(TokenKind.END, SourceLocation(self.offset, self.offset)))
+        self.tokens.extend(self.iter_tokens())
         return self.tokens
 
-    def tokenize_number(self):
-        start = self.offset
-        while self.offset < len(self.source):
-            if not self.source[self.offset].isnumeric():
-                break
-            self.offset += 1
-
-        token = Token(TokenKind.NUMBER, SourceLocation(start, self.offset))
-        self.tokens.append(token)
-
-    def tokenize_variable(self):
-        start = self.offset
-        while self.offset < len(self.source):
-            if not self.source[self.offset].isalpha():
-                break
-            self.offset += 1
-
-        ty = TokenKind.SQRT if self.source[start:self.offset] == 'sqrt' else TokenKind.VARIABLE
-        token = Token(ty, SourceLocation(start, self.offset))
-        self.tokens.append(token)
-
-    def tokenize_operator(self):
-        if self.source[self.offset:].startswith("**"):
-            token = Token(TokenKind.DOUBLE_STAR, SourceLocation(self.offset, self.offset + 2))
-            self.offset += 2
-            self.tokens.append(token)
-            return
-
-        op = self.source[self.offset]
-        if op == '+':
-            ty = TokenKind.PLUS
-        elif op == '-':
-            ty = TokenKind.MINUS
-        elif op == '*':
-            ty = TokenKind.STAR
-        elif op == '/':
-            ty = TokenKind.SLASH
-        elif op == '%':
-            ty = TokenKind.MODULO
-        else:
-            assert False, "unknown operator"
+    def iter_tokens(self):
+        """Generate the tokens one by one, ending with the END token; the source is scanned by a single
+        compiled pattern, so the parser can consume the tokens while they are produced"""
+        symbols = {**OPERATORS, **PUNCTUATION}
+        source = self.source
+        for match in TOKEN_PATTERN.finditer(source):
+            if match.start() != self.offset:
+                raise ValueError("unknown token")
+            group = match.lastgroup
+            start, end = match.span(group)
+            self.offset = end
+            if group == 'number':
+                kind = TokenKind.NUMBER
+            elif group == 'word':
+                word = match.group(group)
+                if not word.isalpha():
+                    # the numeric characters which are not decimal digits, e.g. superscripts
+                    raise ValueError("unknown token")
+                kind = KEYWORDS.get(word, TokenKind.VARIABLE)
+            else:
+                kind = symbols[match.group(group)]
+            yield Token(kind, SourceLocation(start, end))
 
-        token = Token(ty, SourceLocation(self.offset, self.offset + 1))
-        self.offset += 1
-        self.tokens.append(token)
+        if source[self.offset:].strip():
+            raise ValueError("unknown token")
+        self.offset = len(source)
+        yield Token(TokenKind.END, SourceLocation(self.offset, self.offset))
 
 
 class Expr:
@@ -178,10 +193,13 @@ class BinaryExpr(Expr):
 
 class UnaryOperator(enum.IntEnum):
     SQRT = 0
+    FACT = 1
 
     def __str__(self):
         if self == UnaryOperator.SQRT:
             return 'sqrt'
+        if self == UnaryOperator.FACT:
+            return 'fact'
         assert False, "unknown unary operator"
 
 
@@ -198,6 +216,47 @@ class UnaryExpr(Expr):
         return result
 
 
+class FunctionOperator(enum.IntEnum):
+    POWMOD = 0
+    BINOM = 1
+    GCD = 2
+    ROOT = 3
+    ILOG = 4
+
+    def __str__(self):
+        if self == FunctionOperator.POWMOD:
+            return 'powmod'
+        if self == FunctionOperator.BINOM:
+            return 'binom'
+        if self == FunctionOperator.GCD:
+            return 'gcd'
+        if self == FunctionOperator.ROOT:
+            return 'root'
+        if self == FunctionOperator.ILOG:
+            return 'ilog'
+        assert False, "unknown function operator"
+
+    def arity(self) -> int:
+        if self == FunctionOperator.POWMOD:
+            return 3
+        if self in (FunctionOperator.BINOM, FunctionOperator.GCD, FunctionOperator.ROOT, FunctionOperator.ILOG):
+            return 2
+        assert False, "unknown function operator"
+
+
+class CallExpr(Expr):
+    def __init__(self, op: FunctionOperator, arguments: list):
+        self.op = op
+        self.arguments = arguments
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+    def dump(self) -> str:
+        result = f'{str(self.op)}({", ".join(argument.dump() for argument in self.arguments)})'
+        return result
+
+
 class VariableExpr(Expr):
     def __init__(self, variable_name: str):
         self.variable_name = variable_name
@@ -239,11 +298,39 @@ def token_to_binary_op(kind: TokenKind) -> BinaryOperator:
 def token_to_unary_op(kind: TokenKind) -> UnaryOperator:
     if kind == TokenKind.SQRT:
         return UnaryOperator.SQRT
+    if kind == TokenKind.FACT:
+        return UnaryOperator.FACT
     assert False, "unknown token kind -> operator"
 
 
+def token_to_function_op(kind: TokenKind) -> FunctionOperator:
+    if kind == TokenKind.POWMOD:
+        return FunctionOperator.POWMOD
+    if kind == TokenKind.BINOM:
+        return FunctionOperator.BINOM
+    if kind == TokenKind.GCD:
+        return FunctionOperator.GCD
+    if kind == TokenKind.ROOT:
+        return FunctionOperator.ROOT
+    if kind == TokenKind.ILOG:
+        return FunctionOperator.ILOG
+    assert False, "unknown token kind -> operator"
+
+
+UNARY_TOKENS = (TokenKind.SQRT, TokenKind.FACT)
+FUNCTION_TOKENS = (TokenKind.POWMOD, TokenKind.BINOM, TokenKind.GCD, TokenKind.ROOT, TokenKind.ILOG)
+
+# the kinds of the pending frames of ExpressionParser.parse
+OPERAND_FRAME = 0
+PRECEDENCE_FRAME = 1
+PAREN_FRAME = 2
+UNARY_FRAME = 3
+CALL_FRAME = 4
+
+
 class ExpressionParser:
-    def __init__(self, expression: str, variables: dict, big_number_type=BigNum):
+    def __init__(self, expression: str, variables: dict, big_number_type=BigNum, context: EvaluationContext = None):
+        big_number_type = get_backend(big_number_type)
         assert big_number_type is not None
         assert big_number_type.__add__ is not None
         assert big_number_type.__sub__ is not None
@@ -255,115 +342,258 @@ class ExpressionParser:
 
         self.original_text = expression
         self.vars = variables
-        self.tokens = []
-        self.offset = 0
+        self.tokens = iter(())
+        self.lookahead = None
         self.big_number_type = big_number_type
+        # the literals are checked against the digits limit of the context the parser was created in
+        self.context = context if context is not None else get_context()
 
     def run(self):
-        self.tokens = ExpressionTokenizer(self.original_text).tokenize()
-        expr = self.parse()
+        with local_context(self.context):
+            # the tokens are consumed while the tokenizer produces them
+            self.tokens = ExpressionTokenizer(self.original_text).iter_tokens()
+            self.lookahead = next(self.tokens)
+            expr = self.parse()
+            # the rest of the source is still scanned, so invalid characters are always rejected
+            for _ in self.tokens:
+                pass
         return expr
 
     def parse(self) -> Expr:
-        return self.parse_precedence(self.parse_expr(), 0)
-
-    def parse_expr(self) -> Expr:
-        tok = self.eat()
-        if tok.kind == TokenKind.NUMBER:
-            return NumericExpr(self.big_number_type(self.original_text[tok.loc.start:tok.loc.end]))
-        if tok.kind == TokenKind.OPEN_PAREN:
-            expr = self.parse()
-            if self.eat().kind != TokenKind.CLOSED_PAREN:
-                raise ValueError("expected )")
-            return expr
-        if tok.kind == TokenKind.SQRT:
-            subexpression = self.parse_expr()
-            op = token_to_unary_op(tok.kind)
-            return UnaryExpr(op, subexpression)
-        if tok.kind == TokenKind.VARIABLE:
-            return VariableExpr(self.original_text[tok.loc.start:tok.loc.end])
-        assert False, "unknown token"
-
-    def parse_precedence(self, left, min_priority) -> Expr:
-        lookahead = self.peek()
-        while not self.precedence_expr_is_done() and get_op_priority(lookahead.kind) >= min_priority:
-            op = self.eat()
-            right = self.parse_expr()
-
-            lookahead = self.peek()
-            while not self.precedence_expr_is_done() and get_op_priority(lookahead.kind) > get_op_priority(op.kind):
-                right = self.parse_precedence(right, min_priority + 1)
-                lookahead = self.peek()
-
-            binary_operator = token_to_binary_op(op.kind)
-            left = BinaryExpr(left, binary_operator, right)
-        return left
+        """Precedence climbing with an explicit stack of pending frames instead of recursive calls, so
+        the nesting depth is limited only by the memory, in linear time.
+
+        The frames are the parse_precedence calls waiting for a right operand (PRECEDENCE_FRAME),
+        the open parens, the unary operators, the function calls waiting for an argument and the
+        operands that start a new precedence level (OPERAND_FRAME). Every operand is parsed in the
+        outer loop and then given to the frames in the inner loop, until one of them needs a new
+        operand or the stack is empty.
+        """
+        stack = [(OPERAND_FRAME,)]
+        while True:
+            tok = self.eat()
+            kind = tok.kind
+            if kind == TokenKind.NUMBER:
+                value = NumericExpr(self.big_number_type(self.original_text[tok.loc.start:tok.loc.end]))
+            elif kind == TokenKind.VARIABLE:
+                value = VariableExpr(self.original_text[tok.loc.start:tok.loc.end])
+            elif kind == TokenKind.OPEN_PAREN:
+                stack.append((PAREN_FRAME,))
+                stack.append((OPERAND_FRAME,))
+                continue
+            elif kind in UNARY_TOKENS:
+                stack.append((UNARY_FRAME, token_to_unary_op(kind)))
+                continue
+            elif kind in FUNCTION_TOKENS:
+                if self.eat().kind != TokenKind.OPEN_PAREN:
+                    raise ValueError("expected (")
+                stack.append((CALL_FRAME, token_to_function_op(kind), []))
+                stack.append((OPERAND_FRAME,))
+                continue
+            else:
+                assert False, "unknown token"
+
+            while stack:
+                frame = stack.pop()
+                tag = frame[0]
+                if tag is UNARY_FRAME:
+                    value = UnaryExpr(frame[1], value)
+                    continue
+                if tag is PAREN_FRAME:
+                    if self.eat().kind != TokenKind.CLOSED_PAREN:
+                        raise ValueError("expected )")
+                    continue
+                if tag is CALL_FRAME:
+                    _, op, arguments = frame
+                    arguments.append(value)
+                    if len(arguments) < op.arity():
+                        if self.eat().kind != TokenKind.COMMA:
+                            raise ValueError("expected ,")
+                        stack.append(frame)
+                        stack.append((OPERAND_FRAME,))
+                        break
+                    if self.eat().kind != TokenKind.CLOSED_PAREN:
+                        raise ValueError("expected )")
+                    value = CallExpr(op, arguments)
+                    continue
+
+                if tag is OPERAND_FRAME:
+                    # a new precedence level, the value is its left operand
+                    left, min_priority = value, 0
+                else:
+                    # the value is the right operand of op, which takes the next operators while
+                    # they have a higher priority, in a new level of min_priority + 1
+                    _, left, min_priority, op = frame
+                    priority = self.next_priority()
+                    if priority is not None and priority > get_op_priority(op.kind):
+                        stack.append(frame)
+                        left, min_priority = value, min_priority + 1
+                    else:
+                        left = BinaryExpr(left, token_to_binary_op(op.kind), value)
+
+                priority = self.next_priority()
+                if priority is not None and priority >= min_priority:
+                    stack.append((PRECEDENCE_FRAME, left, min_priority, self.eat()))
+                    break
+                value = left
+            else:
+                return value
 
     def peek(self) -> Token:
-        assert self.offset < len(self.tokens), "can't peek when stream already terminated"
-        return self.tokens[self.offset]
+        assert self.lookahead is not None, "can't peek when stream already terminated"
+        return self.lookahead
 
     def eat(self) -> Token:
-        assert self.offset < len(self.tokens), "can't eat when stream already terminated"
-        self.offset += 1
-        return self.tokens[self.offset - 1]
+        assert self.lookahead is not None, "can't eat when stream already terminated"
+        tok = self.lookahead
+        self.lookahead = next(self.tokens, None)
+        return tok
 
     def next_is_end(self) -> bool:
         return self.peek().kind == TokenKind.END
 
     def precedence_expr_is_done(self):
-        return self.next_is_end() or self.peek().kind == TokenKind.CLOSED_PAREN
+        return self.next_is_end() or self.peek().kind == TokenKind.CLOSED_PAREN or self.peek().kind == TokenKind.COMMA
+
+    def next_priority(self):
+        """The priority of the next operator, None when the precedence expression is done"""
+        if self.precedence_expr_is_done():
+            return None
+        return get_op_priority(self.peek().kind)
+
+
+def any_row(condition) -> bool:
+    """The comparisons of batched number types (BigNumArray) give one result per row;
+    an operation fails when it fails for any of the rows"""
+    return bool(condition.any()) if hasattr(condition, "any") else bool(condition)
 
 
 class Solver:
-    def __init__(self, big_number_type):
+    def __init__(self, big_number_type, certificates: list = None):
         self.has_reached_leftmost = False
-        self.big_number_type = big_number_type
+        self.big_number_type = get_backend(big_number_type)
+        self.certificates = certificates
+        self.zero = self.big_number_type(0)
+
+    def certify(self, op, operands: tuple, results: tuple):
+        """Record the operands and results of an operation that is verified at the end by ResultVerifier"""
+        if self.certificates is not None:
+            self.certificates.append((op, operands, results))
 
     def solve_normal(self, expr: Expr, variables: dict):
         if isinstance(expr, BinaryExpr):
             left = self.solve_normal(expr.left, variables)
             right = self.solve_normal(expr.right, variables)
-            
+            return self.apply(expr, [left, right])
+        elif isinstance(expr, UnaryExpr):
+            return self.apply(expr, [self.solve_normal(expr.subexpression, variables)])
+        elif isinstance(expr, CallExpr):
+            return self.apply(expr, [self.solve_normal(argument, variables) for argument in expr.arguments])
+        elif isinstance(expr, VariableExpr):
+            assert isinstance(variables[expr.variable_name], self.big_number_type), "Variable must have passed type"
+            return variables[expr.variable_name]
+        elif isinstance(expr, NumericExpr):
+            assert isinstance(expr.value, self.big_number_type), "Number must have passed type"
+            return expr.value
+        else:
+            assert False, "unknown node type"
+
+    def solve_shared(self, expr: Expr, variables: dict):
+        """Like solve_normal, without recursion, and the nodes shared by several operations (see
+        ExpressionInterner) are solved once"""
+        values = {}
+        for node in postorder(expr):
+            operands = operands_of(node)
+            if operands:
+                values[id(node)] = self.apply(node, [values[id(operand)] for operand in operands])
+            else:
+                values[id(node)] = self.solve_normal(node, variables)
+        return values[id(expr)]
+
+    def apply(self, expr: Expr, operands: list):
+        """The operation of a binary, unary or call node on the values of its operands"""
+        if isinstance(expr, BinaryExpr):
+            left, right = operands
+
             assert isinstance(left, self.big_number_type), "Solve must return the same type"
             assert isinstance(right, self.big_number_type), "Solve must return the same type"
 
             if expr.op == BinaryOperator.ADD:
                 result = left + right
             elif expr.op == BinaryOperator.SUB:
-                if left < right:
+                if any_row(left < right):
                     raise ValueError(f"{left}-{right} would result in negative number")
                 result = left - right
             elif expr.op == BinaryOperator.MUL:
                 result = left * right
             elif expr.op == BinaryOperator.DIV:
-                if right == self.big_number_type(0):
+                if any_row(right == self.zero):
                     raise ValueError("can't divide by 0")
-                result = left // right
+                result, remainder = divmod(left, right)
+                self.certify(expr.op, (left, right), (result, remainder))
             elif expr.op == BinaryOperator.POWER:
                 result = left ** right
+                self.certify(expr.op, (left, right), (result,))
             elif expr.op == BinaryOperator.REM:
-                if right == self.big_number_type(0):
+                if any_row(right == self.zero):
                     raise ValueError("can't divide by 0")
-                result = left % right
+                quotient, result = divmod(left, right)
+                self.certify(expr.op, (left, right), (quotient, result))
             else:
                 assert False, "unknown operator"
 
             assert isinstance(result, self.big_number_type), "Result must be the same type"
             return result
         elif isinstance(expr, UnaryExpr):
+            value, = operands
             if expr.op == UnaryOperator.SQRT:
-                if self.big_number_type == int:
-                    return int(self.solve_normal(expr.subexpression, variables) ** (1/2))
-                return self.solve_normal(expr.subexpression, variables).sqrt()
+                result, remainder = value.isqrtrem()
+                self.certify(expr.op, (value,), (result, remainder))
+                return result
+            elif expr.op == UnaryOperator.FACT:
+                result = value.factorial()
+                self.certify(expr.op, (value,), (result,))
+                return result
             else:
                 assert False, "unknown operator"
-        elif isinstance(expr, VariableExpr):
-            assert isinstance(variables[expr.variable_name], self.big_number_type), "Variable must have passed type"
-            return variables[expr.variable_name]
-        elif isinstance(expr, NumericExpr):
-            assert isinstance(expr.value, self.big_number_type), "Number must have passed type"
-            return expr.value
+        elif isinstance(expr, CallExpr):
+            arguments = operands
+            for argument in arguments:
+                assert isinstance(argument, self.big_number_type), "Solve must return the same type"
+
+            if expr.op == FunctionOperator.POWMOD:
+                base, power, modulo = arguments
+                if any_row(modulo == self.zero):
+                    raise ValueError("can't divide by 0")
+                result = pow(base, power, modulo)
+                self.certify(expr.op, (base, power, modulo), (result,))
+            elif expr.op == FunctionOperator.BINOM:
+                n, k = arguments
+                result = n.binomial(k)
+                self.certify(expr.op, (n, k), (result,))
+            elif expr.op == FunctionOperator.GCD:
+                a, b = arguments
+                result = a.gcd(b)
+                self.certify(expr.op, (a, b), (result,))
+            elif expr.op == FunctionOperator.ROOT:
+                value, degree = arguments
+                if any_row(degree == self.zero):
+                    raise ValueError("root of degree 0")
+                result, remainder = value.irootrem(degree)
+                self.certify(expr.op, (value, degree), (result, remainder))
+            elif expr.op == FunctionOperator.ILOG:
+                value, base = arguments
+                if any_row(value == self.zero):
+                    raise ValueError("can't compute the log of 0")
+                if any_row(base < 2):
+                    raise ValueError("log base must be at least 2")
+                result = value.ilog(base)
+                self.certify(expr.op, (value, base), (result,))
+            else:
+                assert False, "unknown operator"
+
+            assert isinstance(result, self.big_number_type), "Result must be the same type"
+            return result
         else:
             assert False, "unknown node type"
 
@@ -373,9 +603,11 @@ class Solver:
 
         is_leftmost_unary = not self.has_reached_leftmost and isinstance(expr, UnaryExpr) and isinstance(
             expr.subexpression, NumericExpr)
+        is_leftmost_call = not self.has_reached_leftmost and isinstance(expr, CallExpr) and all(
+            isinstance(argument, NumericExpr) for argument in expr.arguments)
         is_leftmost_variable = not self.has_reached_leftmost and isinstance(expr, VariableExpr)
 
-        if is_leftmost_binary or is_leftmost_unary or is_leftmost_variable:
+        if is_leftmost_binary or is_leftmost_unary or is_leftmost_call or is_leftmost_variable:
             self.has_reached_leftmost = True
             return NumericExpr(self.solve_normal(expr, variables))
 
@@ -386,6 +618,9 @@ class Solver:
         elif isinstance(expr, UnaryExpr):
             subexpression = self.solve_leftmost(expr.subexpression, variables)
             return UnaryExpr(expr.op, subexpression)
+        elif isinstance(expr, CallExpr):
+            arguments = [self.solve_leftmost(argument, variables) for argument in expr.arguments]
+            return CallExpr(expr.op, arguments)
         elif isinstance(expr, VariableExpr):
             return expr
         if isinstance(expr, NumericExpr):
@@ -393,18 +628,752 @@ class Solver:
         assert False, "unknown node type"
 
 
-def expr_solve(expr: Expr, variables: dict, big_number_type=BigNum):
-    result = str(expr.dump()) + '\n'
-    while not isinstance(expr, NumericExpr):
-        expr = Solver(big_number_type).solve_leftmost(expr, variables)
-        result += str(expr.dump()) + '\n'
-    if isinstance(expr, NumericExpr):
-        return result, expr.value
-    assert False, "unreachable"
-
-def run_one(text: str, variables: dict, big_number_type=BigNum):
-    expr = ExpressionParser(text, variables, big_number_type).run()
-    (string, result) = expr_solve(expr, variables, big_number_type)
-    string = text + '\n' + str(expr.dump()) + '\n' + string + '\n'
-    # print(string)
-    return result
\ No newline at end of file
+def operands_of(expr: Expr) -> list:
+    """The operand nodes of expr, in the order they are solved"""
+    if isinstance(expr, BinaryExpr):
+        return [expr.left, expr.right]
+    if isinstance(expr, UnaryExpr):
+        return [expr.subexpression]
+    if isinstance(expr, CallExpr):
+        return expr.arguments
+    return []
+
+
+def postorder(expr: Expr):
+    """Generates the nodes of expr in the order Solver.solve_normal solves them, without recursion;
+    a node shared by several operations (see ExpressionInterner) is generated once, at its first use"""
+    pending = [(expr, False)]
+    seen = set()
+    while pending:
+        node, ready = pending.pop()
+        if ready:
+            yield node
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        operands = operands_of(node)
+        if operands:
+            pending.append((node, True))
+            pending += [(operand, False) for operand in reversed(operands)]
+        else:
+            yield node
+
+
+class ExpressionInterner:
+    """Hash-consing of expressions: the structurally identical subexpressions become one node.
+
+    The result is a DAG in which every distinct subexpression is solved once for each variables
+    binding, by Solver.solve_shared, ExpressionCompiler, BytecodeCompiler and StepTracer. The nodes of
+    the original expression are kept where they can be, and the original is not changed, so it can still
+    be dumped and traced with its own shape. canonical maps the id of every interned node to its node
+    in the DAG, and deduplicated counts the interned nodes that were found in it already.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.canonical = {}
+        self.deduplicated = 0
+
+    def intern(self, expr: Expr) -> Expr:
+        for node in postorder(expr):
+            operands = [self.canonical[id(operand)] for operand in operands_of(node)]
+            if isinstance(node, NumericExpr):
+                key = (NumericExpr, str(node.value))
+            elif isinstance(node, VariableExpr):
+                key = (VariableExpr, node.variable_name)
+            else:
+                key = (type(node), node.op) + tuple(id(operand) for operand in operands)
+
+            canonical = self.nodes.get(key)
+            if canonical is not None:
+                self.deduplicated += 1
+            elif all(operand is original for operand, original in zip(operands, operands_of(node))):
+                canonical = self.nodes[key] = node
+            elif isinstance(node, BinaryExpr):
+                canonical = self.nodes[key] = BinaryExpr(operands[0], node.op, operands[1])
+            elif isinstance(node, UnaryExpr):
+                canonical = self.nodes[key] = UnaryExpr(node.op, operands[0])
+            else:
+                canonical = self.nodes[key] = CallExpr(node.op, operands)
+            self.canonical[id(node)] = canonical
+        return self.canonical[id(expr)]
+
+
+# the events of StepTracer, in the order of the rendering of the expression
+TEXT_EVENT = 0
+LITERAL_EVENT = 1
+REDUCE_EVENT = 2
+
+
+class StepTracer:
+    """Solves an expression in one post-order pass and renders the steps of the solution.
+
+    A step reduces the leftmost operation (or variable) that has all its operands known, the same
+    as Solver.solve_leftmost, and that is the post-order of the tree. The rendering of the expression
+    is flattened once into a list of events: text pieces, literals and the reductions of the nodes.
+    Replaying them keeps the rendering of the part that was already solved as a stack of pieces,
+    where a reduction replaces the pieces of its node by its value; the rest of the step is the
+    unchanged end of the original rendering. So every step costs a join of the solved part instead
+    of a new tree and a dump of the whole expression.
+
+    With an ExpressionInterner that interned expr, the steps keep the shape of expr but a repeated
+    subexpression is solved only the first time, the next steps reuse its value.
+    """
+    def __init__(self, expr: Expr, variables: dict, solver: Solver, interner: ExpressionInterner = None):
+        self.events = self.flatten(expr)
+        self.variables = variables
+        self.solver = solver
+        self.interner = interner
+        self.value = None
+
+    @staticmethod
+    def flatten(expr: Expr) -> list:
+        """The events of the rendering of expr, which joined give expr.dump(), without recursion;
+        the reductions have the depth of their node, 0 for the root"""
+        events = []
+        pending = [(expr, 0)]
+        while pending:
+            item, depth = pending.pop()
+            if isinstance(item, tuple):
+                events.append(item)
+            elif isinstance(item, NumericExpr):
+                events.append((LITERAL_EVENT, str(item.value), item.value))
+            elif isinstance(item, BinaryExpr):
+                # ( left op right ), a reduction replaces 5 pieces and takes 2 values
+                pending += [((REDUCE_EVENT, item, 5, 2, depth), None), ((TEXT_EVENT, ')'), None),
+                            (item.right, depth + 1), ((TEXT_EVENT, f' {str(item.op)} '), None),
+                            (item.left, depth + 1), ((TEXT_EVENT, '('), None)]
+            elif isinstance(item, UnaryExpr):
+                pending += [((REDUCE_EVENT, item, 2, 1, depth), None), (item.subexpression, depth + 1),
+                            ((TEXT_EVENT, f'{str(item.op)} '), None)]
+            elif isinstance(item, CallExpr):
+                arity = len(item.arguments)
+                pending += [((REDUCE_EVENT, item, 2 * arity + 1, arity, depth), None), ((TEXT_EVENT, ')'), None)]
+                for index in range(arity - 1, -1, -1):
+                    pending.append((item.arguments[index], depth + 1))
+                    pending.append(((TEXT_EVENT, ', ' if index else f'{str(item.op)}('), None))
+            elif isinstance(item, VariableExpr):
+                events += [(TEXT_EVENT, item.variable_name), (REDUCE_EVENT, item, 1, 0, depth)]
+            else:
+                assert False, "unknown node type"
+        return events
+
+    def steps(self, every: int = 1, max_depth: int = None):
+        """Generates the rendering of the expression and then the one after every step,
+        the value of the expression is in self.value from the last step.
+
+        Only the steps that reduce a node at most max_depth levels under the root are shown (1 shows the
+        steps of the operands of the top-level operation), and of them only every k-th one. The last
+        step, the value of the expression, is always shown. The steps that are not shown are not rendered.
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth can't be negative")
+        return self.__replay(every, max_depth)
+
+    def __replay(self, every: int, max_depth):
+        original = "".join(event[1] for event in self.events if event[0] != REDUCE_EVENT)
+        yield original
+
+        solved = []
+        values = []
+        # the values of the interned nodes solved so far
+        known = {}
+        offset = 0
+        shown = 0
+        for event in self.events:
+            tag = event[0]
+            if tag == TEXT_EVENT:
+                solved.append(event[1])
+                offset += len(event[1])
+            elif tag == LITERAL_EVENT:
+                solved.append(event[1])
+                values.append(event[2])
+                offset += len(event[1])
+            else:
+                _, expr, width, arity, depth = event
+                node = self.interner.canonical[id(expr)] if self.interner is not None else expr
+                value = known.get(id(node))
+                if value is None:
+                    if arity:
+                        value = self.solver.apply(expr, values[-arity:])
+                    else:
+                        value = self.solver.solve_normal(expr, self.variables)
+                    if self.interner is not None:
+                        known[id(node)] = value
+                if arity:
+                    del values[-arity:]
+                values.append(value)
+                del solved[-width:]
+                solved.append(str(value))
+
+                if max_depth is not None and depth > max_depth:
+                    continue
+                shown += 1
+                if depth == 0:
+                    # the root is the last reduction
+                    self.value = value
+                if shown % every == 0 or depth == 0:
+                    yield "".join(solved) + original[offset:]
+
+        assert len(values) == 1, "unreachable"
+        self.value = values[0]
+
+
+class ExpressionCompiler:
+    """Compiles an expression to a Python function of the variables, for repeated evaluations.
+
+    The tree is translated once into straight-line code: one assignment per operation, in the order
+    of Solver.solve_normal, with the checks of the operations that can fail and the same errors. The
+    literals are constants of the function, every variable is read once, where solve_normal reads
+    it first, and the repeated subexpressions are computed once (see ExpressionInterner). So an
+    evaluation makes no call per node, no isinstance dispatch and no type assertion, and it is not
+    limited by the recursion limit. The final verification of expr_evaluate is not done, the
+    evaluation uses the current context.
+    """
+    def __init__(self, big_number_type=BigNum):
+        self.big_number_type = get_backend(big_number_type)
+        # the comparisons of batched number types give one result per row
+        self.batched = hasattr(self.big_number_type, "batch_size")
+
+    def compile(self, expr: Expr):
+        """A function taking the variables dict and returning the value of expr"""
+        namespace = {"any_row": any_row, "zero": self.big_number_type(0)}
+        lines = []
+        # the name of the constant or of the variable holding the value of every node
+        names = {}
+        expr = ExpressionInterner().intern(expr)
+        for node in postorder(expr):
+            if isinstance(node, NumericExpr):
+                assert isinstance(node.value, self.big_number_type), "Number must have passed type"
+                name = f"c{len(namespace)}"
+                namespace[name] = node.value
+            elif isinstance(node, VariableExpr):
+                name = f"t{len(names)}"
+                lines.append(f"{name} = variables[{node.variable_name!r}]")
+            else:
+                name = f"t{len(names)}"
+                lines += self.operation(node, name, [names[id(operand)] for operand in operands_of(node)])
+            names[id(node)] = name
+
+        lines.append(f"return {names[id(expr)]}")
+        source = "def evaluate(variables):\n" + "".join(f"    {line}\n" for line in lines)
+        exec(compile(source, "<compiled expression>", "exec"), namespace)
+        return namespace["evaluate"]
+
+    def condition(self, text: str) -> str:
+        return f"any_row({text})" if self.batched else text
+
+    def operation(self, expr: Expr, result: str, operands: list) -> list:
+        """The lines computing the operation of expr on the operands into result"""
+        if isinstance(expr, BinaryExpr):
+            left, right = operands
+            if expr.op == BinaryOperator.ADD:
+                return [f"{result} = {left} + {right}"]
+            if expr.op == BinaryOperator.SUB:
+                return [f"if {self.condition(f'{left} < {right}')}:",
+                        f"    raise ValueError(f'{{{left}}}-{{{right}}} would result in negative number')",
+                        f"{result} = {left} - {right}"]
+            if expr.op == BinaryOperator.MUL:
+                return [f"{result} = {left} * {right}"]
+            if expr.op == BinaryOperator.DIV or expr.op == BinaryOperator.REM:
+                return [f"if {self.condition(f'{right} == zero')}:",
+                        "    raise ValueError(\"can't divide by 0\")",
+                        f"{result} = divmod({left}, {right})[{0 if expr.op == BinaryOperator.DIV else 1}]"]
+            if expr.op == BinaryOperator.POWER:
+                return [f"{result} = {left} ** {right}"]
+            assert False, "unknown operator"
+        if isinstance(expr, UnaryExpr):
+            value, = operands
+            if expr.op == UnaryOperator.SQRT:
+                return [f"{result} = {value}.isqrtrem()[0]"]
+            if expr.op == UnaryOperator.FACT:
+                return [f"{result} = {value}.factorial()"]
+            assert False, "unknown operator"
+        if isinstance(expr, CallExpr):
+            if expr.op == FunctionOperator.POWMOD:
+                base, power, modulo = operands
+                return [f"if {self.condition(f'{modulo} == zero')}:",
+                        "    raise ValueError(\"can't divide by 0\")",
+                        f"{result} = pow({base}, {power}, {modulo})"]
+            if expr.op == FunctionOperator.BINOM:
+                n, k = operands
+                return [f"{result} = {n}.binomial({k})"]
+            if expr.op == FunctionOperator.GCD:
+                a, b = operands
+                return [f"{result} = {a}.gcd({b})"]
+            if expr.op == FunctionOperator.ROOT:
+                value, degree = operands
+                return [f"if {self.condition(f'{degree} == zero')}:",
+                        "    raise ValueError('root of degree 0')",
+                        f"{result} = {value}.irootrem({degree})[0]"]
+            if expr.op == FunctionOperator.ILOG:
+                value, base = operands
+                return [f"if {self.condition(f'{value} == zero')}:",
+                        "    raise ValueError(\"can't compute the log of 0\")",
+                        f"if {self.condition(f'{base} < 2')}:",
+                        "    raise ValueError('log base must be at least 2')",
+                        f"{result} = {value}.ilog({base})"]
+            assert False, "unknown operator"
+        assert False, "unknown node type"
+
+
+# the opcodes of Program, an instruction is the opcode, the target register and the operand registers
+OP_LOAD_VAR = 0  # the operand is the index of the variable name
+OP_ADD = 1
+OP_SUB = 2
+OP_MUL = 3
+OP_DIV = 4
+OP_REM = 5
+OP_POWER = 6
+OP_SQRT = 7
+OP_FACT = 8
+OP_POWMOD = 9
+OP_BINOM = 10
+OP_GCD = 11
+OP_ROOT = 12
+OP_ILOG = 13
+OPCODE_NAMES = ("load_var", "add", "sub", "mul", "div", "rem", "power", "sqrt", "fact",
+                "powmod", "binom", "gcd", "root", "ilog")
+
+BINARY_OPCODES = {BinaryOperator.ADD: OP_ADD, BinaryOperator.SUB: OP_SUB, BinaryOperator.MUL: OP_MUL,
+                  BinaryOperator.DIV: OP_DIV, BinaryOperator.REM: OP_REM, BinaryOperator.POWER: OP_POWER}
+UNARY_OPCODES = {UnaryOperator.SQRT: OP_SQRT, UnaryOperator.FACT: OP_FACT}
+FUNCTION_OPCODES = {FunctionOperator.POWMOD: OP_POWMOD, FunctionOperator.BINOM: OP_BINOM, FunctionOperator.GCD: OP_GCD,
+                    FunctionOperator.ROOT: OP_ROOT, FunctionOperator.ILOG: OP_ILOG}
+
+
+class Program:
+    """An expression compiled for VirtualMachine.
+
+    The code is a flat list of ints, the instructions one after the other. The first registers hold
+    the constant pool (the literals), the next ones the variables, loaded where Solver.solve_normal
+    reads them first, and the rest the intermediate results, reused once they were consumed.
+    A program is pickled with its constants as decimal strings, to be cached or sent to other processes.
+    """
+    def __init__(self, code: list, constants: list, names: list, registers: int, result: int, big_number_type):
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.registers = registers
+        self.result = result
+        self.big_number_type = big_number_type
+        self.zero = big_number_type(0)
+        # the comparisons of batched number types give one result per row
+        self.batched = hasattr(big_number_type, "batch_size")
+
+    def __getstate__(self):
+        return {"code": self.code, "constants": [str(value) for value in self.constants], "names": self.names,
+                "registers": self.registers, "result": self.result, "big_number_type": self.big_number_type}
+
+    def __setstate__(self, state):
+        big_number_type = state["big_number_type"]
+        self.__init__(state["code"], [big_number_type(value) for value in state["constants"]], state["names"],
+                      state["registers"], state["result"], big_number_type)
+
+    def dump(self) -> str:
+        """One line per instruction, e.g. `r5 = sub r3 r0`; the registers of the constants and
+        of the variables are shown by their value and name"""
+        def register(index):
+            if index < len(self.constants):
+                return str(self.constants[index])
+            if index < len(self.constants) + len(self.names):
+                return self.names[index - len(self.constants)]
+            return f"r{index}"
+
+        lines = []
+        pc = 0
+        while pc < len(self.code):
+            op, target = self.code[pc], self.code[pc + 1]
+            count = 1 if op in (OP_LOAD_VAR, OP_SQRT, OP_FACT) else 3 if op == OP_POWMOD else 2
+            operands = self.code[pc + 2:pc + 2 + count]
+            if op == OP_LOAD_VAR:
+                lines.append(f"{register(target)} = {OPCODE_NAMES[op]} {self.names[operands[0]]!r}")
+            else:
+                lines.append(f"{register(target)} = {OPCODE_NAMES[op]} {' '.join(map(register, operands))}")
+            pc += 2 + count
+        return "\n".join(lines)
+
+
+class BytecodeCompiler:
+    """Compiles an expression to a Program, without recursion; the repeated subexpressions are computed
+    once (see ExpressionInterner)"""
+    def __init__(self, big_number_type=BigNum):
+        self.big_number_type = get_backend(big_number_type)
+
+    def compile(self, expr: Expr) -> Program:
+        expr = ExpressionInterner().intern(expr)
+        nodes = list(postorder(expr))
+        constants = []
+        names = []
+        # the number of operations using the value of every node
+        uses = {}
+        for node in nodes:
+            if isinstance(node, NumericExpr):
+                assert isinstance(node.value, self.big_number_type), "Number must have passed type"
+                constants.append(node.value)
+            elif isinstance(node, VariableExpr):
+                names.append(node.variable_name)
+            for operand in operands_of(node):
+                uses[id(operand)] = uses.get(id(operand), 0) + 1
+        # the registers of the variables follow the ones of the constants
+        first_temporary = len(constants) + len(names)
+
+        code = []
+        registers = {}
+        constant = 0
+        variable = 0
+        # the temporaries whose values are not used anymore, the lowest one is reused first
+        free = []
+        count = first_temporary
+        for node in nodes:
+            if isinstance(node, NumericExpr):
+                registers[id(node)] = constant
+                constant += 1
+                continue
+            if isinstance(node, VariableExpr):
+                registers[id(node)] = len(constants) + variable
+                code += [OP_LOAD_VAR, len(constants) + variable, variable]
+                variable += 1
+                continue
+
+            operands = [registers[id(operand)] for operand in operands_of(node)]
+            for operand in operands_of(node):
+                uses[id(operand)] -= 1
+                if uses[id(operand)] == 0 and registers[id(operand)] >= first_temporary:
+                    heapq.heappush(free, registers[id(operand)])
+            if free:
+                target = heapq.heappop(free)
+            else:
+                target = count
+                count += 1
+            if isinstance(node, BinaryExpr):
+                code.append(BINARY_OPCODES[node.op])
+            elif isinstance(node, UnaryExpr):
+                code.append(UNARY_OPCODES[node.op])
+            else:
+                code.append(FUNCTION_OPCODES[node.op])
+            code += [target] + operands
+            registers[id(node)] = target
+
+        return Program(code, constants, names, count, registers[id(expr)], self.big_number_type)
+
+
+class VirtualMachine:
+    """Runs Programs, with the checks and the errors of Solver.solve_normal, in the current context.
+
+    With count=True, the executed instructions are counted per opcode in counters (see counts()).
+    """
+    def __init__(self, count: bool = False):
+        self.counters = [0] * len(OPCODE_NAMES) if count else None
+
+    def counts(self) -> dict:
+        """The number of executed instructions of every opcode that was executed"""
+        return {name: count for name, count in zip(OPCODE_NAMES, self.counters) if count}
+
+    def run(self, program: Program, variables: dict):
+        registers = program.constants + [None] * (program.registers - len(program.constants))
+        code = program.code
+        counters = self.counters
+        batched = program.batched
+        zero = program.zero
+        pc = 0
+        end = len(code)
+        while pc < end:
+            op = code[pc]
+            if counters is not None:
+                counters[op] += 1
+            if op == OP_ADD:
+                registers[code[pc + 1]] = registers[code[pc + 2]] + registers[code[pc + 3]]
+                pc += 4
+            elif op == OP_MUL:
+                registers[code[pc + 1]] = registers[code[pc + 2]] * registers[code[pc + 3]]
+                pc += 4
+            elif op == OP_LOAD_VAR:
+                registers[code[pc + 1]] = variables[program.names[code[pc + 2]]]
+                pc += 3
+            elif op == OP_SUB:
+                left, right = registers[code[pc + 2]], registers[code[pc + 3]]
+                if any_row(left < right) if batched else left < right:
+                    raise ValueError(f"{left}-{right} would result in negative number")
+                registers[code[pc + 1]] = left - right
+                pc += 4
+            elif op == OP_DIV or op == OP_REM:
+                left, right = registers[code[pc + 2]], registers[code[pc + 3]]
+                if any_row(right == zero) if batched else right == zero:
+                    raise ValueError("can't divide by 0")
+                registers[code[pc + 1]] = divmod(left, right)[op - OP_DIV]
+                pc += 4
+            elif op == OP_POWER:
+                registers[code[pc + 1]] = registers[code[pc + 2]] ** registers[code[pc + 3]]
+                pc += 4
+            elif op == OP_SQRT:
+                registers[code[pc + 1]] = registers[code[pc + 2]].isqrtrem()[0]
+                pc += 3
+            elif op == OP_FACT:
+                registers[code[pc + 1]] = registers[code[pc + 2]].factorial()
+                pc += 3
+            elif op == OP_POWMOD:
+                modulo = registers[code[pc + 4]]
+                if any_row(modulo == zero) if batched else modulo == zero:
+                    raise ValueError("can't divide by 0")
+                registers[code[pc + 1]] = pow(registers[code[pc + 2]], registers[code[pc + 3]], modulo)
+                pc += 5
+            elif op == OP_BINOM:
+                registers[code[pc + 1]] = registers[code[pc + 2]].binomial(registers[code[pc + 3]])
+                pc += 4
+            elif op == OP_GCD:
+                registers[code[pc + 1]] = registers[code[pc + 2]].gcd(registers[code[pc + 3]])
+                pc += 4
+            elif op == OP_ROOT:
+                degree = registers[code[pc + 3]]
+                if any_row(degree == zero) if batched else degree == zero:
+                    raise ValueError("root of degree 0")
+                registers[code[pc + 1]] = registers[code[pc + 2]].irootrem(degree)[0]
+                pc += 4
+            elif op == OP_ILOG:
+                value, base = registers[code[pc + 2]], registers[code[pc + 3]]
+                if any_row(value == zero) if batched else value == zero:
+                    raise ValueError("can't compute the log of 0")
+                if any_row(base < 2) if batched else base < 2:
+                    raise ValueError("log base must be at least 2")
+                registers[code[pc + 1]] = value.ilog(base)
+                pc += 4
+            else:
+                assert False, "unknown opcode"
+        return registers[program.result]
+
+
+# word sized primes used by ResultVerifier
+VERIFICATION_PRIMES = (4294967291, 4294967279)
+RESIDUE_DIGITS = 2 * len(str(max(VERIFICATION_PRIMES))) + 1
+
+
+class ResultVerifier:
+    """Checks the result of a solved expression modulo a few word sized primes.
+
+    Additions, subtractions and multiplications are replayed on residues. The other operations
+    can't be replayed on residues, so the Solver certifies them (operands and results) and each
+    certificate is checked by its own identity, e.g. a == b * q + r and r < b for a division.
+    The residues of a batch (BigNumArray) are batches too, so all its rows are checked at once.
+    """
+    def __init__(self, certificates: list):
+        self.certificates = certificates
+
+    def verify(self, expr: Expr, variables: dict, result):
+        # the primes and the products of two residues may have more digits than the limit of the evaluation
+        with local_context(maximum_digits=max(get_context().maximum_digits, RESIDUE_DIGITS)):
+            for prime in VERIFICATION_PRIMES:
+                pending = iter(self.certificates)
+                if any_row(self.residue(expr, variables, prime, pending) != self.residue_of(result, prime)):
+                    raise Exception("result verification failed")
+                if next(pending, None) is not None:
+                    raise Exception("result verification failed")
+
+    @staticmethod
+    def rows(value, count: int = 1) -> list:
+        """the values of a number, or of every row of a batch, as ints; a single value is repeated count times"""
+        values = value.tolist() if hasattr(value, "batch_size") else [int(value)]
+        return values * count if len(values) == 1 else values
+
+    @staticmethod
+    def residue_of(value, prime: int):
+        """value mod prime, as an int or as a batch of residues"""
+        residue = value % prime
+        return residue if hasattr(residue, "batch_size") else int(residue)
+
+    def residue(self, expr: Expr, variables: dict, prime: int, pending):
+        """expr mod prime, in the order of Solver.solve_shared, so a node shared by several
+        operations has one certificate"""
+        residues = {}
+        for node in postorder(expr):
+            if isinstance(node, BinaryExpr):
+                left, right = residues[id(node.left)], residues[id(node.right)]
+                if node.op == BinaryOperator.ADD:
+                    value = (left + right) % prime
+                elif node.op == BinaryOperator.SUB:
+                    value = (left + prime - right) % prime
+                elif node.op == BinaryOperator.MUL:
+                    value = (left * right) % prime
+                else:
+                    value = self.check_certificate(node.op, (left, right), prime, pending)
+            elif isinstance(node, UnaryExpr):
+                value = self.check_certificate(node.op, (residues[id(node.subexpression)],), prime, pending)
+            elif isinstance(node, CallExpr):
+                arguments = tuple(residues[id(argument)] for argument in node.arguments)
+                value = self.check_certificate(node.op, arguments, prime, pending)
+            elif isinstance(node, VariableExpr):
+                value = self.residue_of(variables[node.variable_name], prime)
+            elif isinstance(node, NumericExpr):
+                value = self.residue_of(node.value, prime)
+            else:
+                assert False, "unknown node type"
+            residues[id(node)] = value
+        return residues[id(expr)]
+
+    @staticmethod
+    def check_certificate(op, residues: tuple, prime: int, pending):
+        """Check the next certificate against the residues of the operands, returns the residue of the result"""
+        certificate = next(pending, None)
+        if certificate is None or certificate[0] is not op:
+            raise Exception("result verification failed")
+        _, operands, results = certificate
+        operands_residues = tuple(ResultVerifier.residue_of(value, prime) for value in operands)
+        results_residues = tuple(ResultVerifier.residue_of(value, prime) for value in results)
+
+        # the operators of different enums compare equal by value, so they are matched by identity
+        if op is BinaryOperator.DIV or op is BinaryOperator.REM:
+            a, b = operands_residues
+            q, r = results_residues
+            valid = not any_row(results[1] < 0) and not any_row(results[1] >= operands[1]) \
+                and not any_row((b * q + r + prime - a) % prime != 0)
+            value = q if op is BinaryOperator.DIV else r
+        elif op is BinaryOperator.POWER:
+            a, _ = operands_residues
+            value, = results_residues
+            exponent = int(operands[1]) if isinstance(a, int) else operands[1]
+            valid = not any_row(pow(a, exponent, prime) != value)
+        elif op is UnaryOperator.SQRT:
+            n, = operands_residues
+            s, r = results_residues
+            valid = not any_row(results[1] < 0) and not any_row(results[1] > results[0] + results[0]) \
+                and not any_row((s * s + r + prime - n) % prime != 0)
+            value = s
+        elif op is FunctionOperator.POWMOD:
+            # the residues of a^b mod m do not follow from the residues of the operands, so the result of
+            # every row is compared with the modular power recomputed with native ints
+            value, = results_residues
+            results_rows = ResultVerifier.rows(results[0])
+            operands_rows = zip(*(ResultVerifier.rows(operand, len(results_rows)) for operand in operands))
+            valid = all(pow(a, b, m) == c for (a, b, m), c in zip(operands_rows, results_rows))
+        elif op is UnaryOperator.FACT or op is FunctionOperator.BINOM or op is FunctionOperator.GCD:
+            # checked on the values of every row: the residues of the result against the ones computed
+            # from the operands, and the gcd has to divide both operands
+            value, = results_residues
+            results_rows = ResultVerifier.rows(results[0])
+            operands_rows = list(zip(*(ResultVerifier.rows(operand, len(results_rows)) for operand in operands)))
+            if op is UnaryOperator.FACT:
+                valid = ResultVerifier.rows(value, len(results_rows)) == \
+                    [_factorial_mod(n, prime) for n, in operands_rows]
+            elif op is FunctionOperator.BINOM:
+                valid = ResultVerifier.rows(value, len(results_rows)) == \
+                    [_binomial_mod(n, k, prime) if k <= n else 0 for n, k in operands_rows]
+            else:
+                valid = all(a % g == 0 and b % g == 0 if g else a == b == 0
+                            for (a, b), g in zip(operands_rows, results_rows))
+        elif op is FunctionOperator.ROOT:
+            # n == s ** k + r on the residues, and the bound on the values: (s + 1) ** k > n, or, when
+            # 2 ** k > n, without computing the power: s == min(n, 1)
+            n, _ = operands_residues
+            s, r = results_residues
+            rows = len(ResultVerifier.rows(results[0]))
+            degrees = ResultVerifier.rows(operands[1], rows)
+            valid = ResultVerifier.rows((n + prime - r) % prime, rows) == \
+                [pow(s_, k, prime) for s_, k in zip(ResultVerifier.rows(s, rows), degrees)] and \
+                all(s_ == min(n_, 1) if k >= n_.bit_length() else (s_ + 1) ** k > n_ for n_, k, s_ in
+                    zip(ResultVerifier.rows(operands[0], rows), degrees, ResultVerifier.rows(results[0], rows)))
+            value = s
+        elif op is FunctionOperator.ILOG:
+            value, = results_residues
+            results_rows = ResultVerifier.rows(results[0])
+            operands_rows = zip(*(ResultVerifier.rows(operand, len(results_rows)) for operand in operands))
+            valid = all(b ** e <= n < b ** (e + 1) for (n, b), e in zip(operands_rows, results_rows))
+        else:
+            assert False, "unknown operator"
+
+        if not valid or any(any_row(x != y) for x, y in zip(operands_residues, residues)):
+            raise Exception("result verification failed")
+        return value
+
+
+def verification_settings(verification: Verification):
+    """The certificates list of the Solver (None when they are not checked) and the verification
+    of the context of an evaluation with the self-checks policy verification"""
+    certificates = [] if verification == Verification.FINAL else None
+    sampled = Verification.SAMPLE if verification == Verification.SAMPLE else Verification.OFF
+    return certificates, sampled
+
+
+def expr_solve(expr: Expr, variables: dict, big_number_type=BigNum, verification=Verification.FINAL,
+               context: EvaluationContext = None):
+    """Solve the expression step by step in a copy of context (default the current one);
+    verification selects the self-checks policy for this evaluation"""
+    big_number_type = get_backend(big_number_type)
+    certificates, sampled = verification_settings(verification)
+    interner = ExpressionInterner()
+    shared = interner.intern(expr)
+    with local_context(context, verification=sampled):
+        tracer = StepTracer(expr, variables, Solver(big_number_type, certificates), interner)
+        result = "".join(step + '\n' for step in tracer.steps())
+
+    if certificates is not None:
+        ResultVerifier(certificates).verify(shared, variables, tracer.value)
+    return result, tracer.value
+
+
+def expr_evaluate(expr: Expr, variables: dict, big_number_type=BigNum, verification=Verification.FINAL,
+                  context: EvaluationContext = None):
+    """The value of the expression, like expr_solve but without rendering the steps"""
+    big_number_type = get_backend(big_number_type)
+    certificates, sampled = verification_settings(verification)
+    expr = ExpressionInterner().intern(expr)
+    with local_context(context, verification=sampled):
+        result = Solver(big_number_type, certificates).solve_shared(expr, variables)
+
+    if certificates is not None:
+        ResultVerifier(certificates).verify(expr, variables, result)
+    return result
+
+
+def expr_compile(expr: Expr, big_number_type=BigNum):
+    """A function of the variables dict computing the value of expr, for repeated evaluations,
+    see ExpressionCompiler"""
+    return ExpressionCompiler(big_number_type).compile(expr)
+
+
+def expr_intern(expr: Expr):
+    """The DAG of expr, with its repeated subexpressions interned, and the number of nodes deduplicated,
+    see ExpressionInterner"""
+    interner = ExpressionInterner()
+    return interner.intern(expr), interner.deduplicated
+
+
+def expr_steps(expr: Expr, variables: dict, big_number_type=BigNum, verification=Verification.FINAL,
+               context: EvaluationContext = None, every: int = 1, max_depth: int = None):
+    """The steps of expr_solve generated on demand, one str without newline each, selected by
+    every and max_depth (see StepTracer.steps); the last one is the value, given after it is verified.
+
+    The steps are solved in a copy of the contextvars of the caller taken now, so the evaluation
+    context is kept between the steps and is not seen by the code that consumes them.
+    """
+    big_number_type = get_backend(big_number_type)
+    certificates, sampled = verification_settings(verification)
+    interner = ExpressionInterner()
+    shared = interner.intern(expr)
+    tracer = StepTracer(expr, variables, Solver(big_number_type, certificates), interner)
+    steps = tracer.steps(every, max_depth)
+
+    def solve():
+        caller = get_context()
+        with local_context(context, verification=sampled):
+            for step in steps:
+                if certificates is not None and tracer.value is not None:
+                    # the last step is the value, verified before it is given, in the context of the caller
+                    with local_context(caller):
+                        ResultVerifier(certificates).verify(shared, variables, tracer.value)
+                yield step
+
+    return iter(functools.partial(contextvars.copy_context().run, next, solve(), None), None)
+
+
+def run_one(text: str, variables: dict, big_number_type=BigNum, verification=Verification.FINAL,
+            context: EvaluationContext = None):
+    """Evaluate text; big_number_type is a number type or the name of a registered backend (see backends.py),
+    the variables are converted to its type"""
+    big_number_type = get_backend(big_number_type)
+    with local_context(context):
+        variables = {name: value if isinstance(value, big_number_type) else big_number_type(value)
+                     for name, value in variables.items()}
+    expr = ExpressionParser(text, variables, big_number_type, context).run()
+    return expr_evaluate(expr, variables, big_number_type, verification, context)
\ No newline at end of file
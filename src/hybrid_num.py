@@ -0,0 +1,256 @@
+import math
+from bignum import BigNum, get_context, local_context
+from int_num import _ilog, _iroot
+
+# values below the bound are kept as native ints, the bigger ones are promoted to BigNum
+_WORD_BOUND = 2 ** 63
+_WORD_DIGITS = len(str(_WORD_BOUND)) - 1  # every number of at most this many digits is a native int
+_POWERS_OF_TEN = [10 ** k for k in range(_WORD_DIGITS + 1)]
+_WORD_FACTORIAL = 20  # the biggest n with n! under the word bound
+with local_context(maximum_digits=_WORD_DIGITS + 1):
+    _BIG_WORD_BOUND = BigNum(_WORD_BOUND)
+
+
+def _small_bound() -> int:
+    """ the native results have to be smaller than it: under the word bound and the digits limit """
+    limit = get_context().maximum_digits
+    return _POWERS_OF_TEN[limit] if limit <= _WORD_DIGITS else _WORD_BOUND
+
+
+class HybridNum:
+    """A number that is computed with native ints while it fits in a machine word, and promoted
+    to BigNum when a result would overflow it.
+
+    A native result is kept only when it is under the word bound and the digits limit of the
+    current context; every other operation (too big results, negative differences, divisions by
+    0 etc.) is done by BigNum, so the results, the digits limit and the error messages are exactly
+    the ones of BigNum.
+    """
+
+    __slots__ = ("__value",)
+
+    def __init__(self, value):
+        if isinstance(value, HybridNum):
+            self.__value = value.__value
+        elif type(value) is int and 0 <= value < _small_bound():
+            self.__value = value
+        elif isinstance(value, str) and len(value) <= _WORD_DIGITS and value.isascii() and value.isdigit() \
+                and len(value) <= get_context().maximum_digits:
+            self.__value = int(value)
+        else:
+            # BigNum checks (and rejects) everything else, e.g. the invalid strings
+            self.__value = HybridNum.__demoted(BigNum(value))
+
+    @staticmethod
+    def __demoted(value: BigNum):
+        """ a BigNum result as a native int when it is small enough """
+        return int(value) if value < _BIG_WORD_BOUND else value
+
+    @staticmethod
+    def __wrap(value):
+        result = HybridNum.__new__(HybridNum)
+        result.__value = value if type(value) is int else HybridNum.__demoted(value)
+        return result
+
+    @staticmethod
+    def __coerce(value):
+        if isinstance(value, HybridNum):
+            return value
+        return HybridNum(value)
+
+    def __big(self) -> BigNum:
+        value = self.__value
+        if type(value) is not int:
+            return value
+        if value < _small_bound():
+            return BigNum(value)
+        # a value from a context with a bigger limit, it is converted as it is, like a BigNum is carried over
+        with local_context(maximum_digits=_WORD_DIGITS + 1):
+            return BigNum(value)
+
+    def is_promoted(self) -> bool:
+        """ True when the value is kept as a BigNum """
+        return type(self.__value) is not int
+
+    def __eq__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int:
+            return a == b
+        return self.__big() == other.__big()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int:
+            return a < b
+        return self.__big() < other.__big()
+
+    def __le__(self, other):
+        return not HybridNum.__coerce(other) < self
+
+    def __gt__(self, other):
+        return HybridNum.__coerce(other) < self
+
+    def __ge__(self, other):
+        return not self < other
+
+    def __hash__(self):
+        # BigNum values have the same hash as the equal ints
+        return hash(self.__value)
+
+    def __add__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int:
+            result = a + b
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big() + other.__big())
+
+    def __sub__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int and a >= b:
+            result = a - b
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big() - other.__big())
+
+    def __mul__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int:
+            result = a * b
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big() * other.__big())
+
+    def __divmod__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int and b > 0:
+            q, r = divmod(a, b)
+            bound = _small_bound()
+            if q < bound and r < bound:
+                return HybridNum.__wrap(q), HybridNum.__wrap(r)
+        q, r = divmod(self.__big(), other.__big())
+        return HybridNum.__wrap(q), HybridNum.__wrap(r)
+
+    def __floordiv__(self, other):
+        quotient, _ = divmod(self, other)
+        return quotient
+
+    def __mod__(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int and b > 0:
+            # BigNum computes the quotient too, which has to be under the digits limit as well
+            q, r = divmod(a, b)
+            bound = _small_bound()
+            if q < bound and r < bound:
+                return HybridNum.__wrap(r)
+        return HybridNum.__wrap(self.__big() % other.__big())
+
+    def __pow__(self, power, modulo=None):
+        power = HybridNum.__coerce(power)
+        a, b = self.__value, power.__value
+        if modulo is not None:
+            modulo = HybridNum.__coerce(modulo)
+            m = modulo.__value
+            if type(a) is int and type(b) is int and type(m) is int and m > 0:
+                result = pow(a, b, m)
+                if result < _small_bound():
+                    return HybridNum.__wrap(result)
+            return HybridNum.__wrap(pow(self.__big(), power.__big(), modulo.__big()))
+
+        # BigNum rejects the powers bigger than the digits limit, even for small results
+        if type(a) is int and type(b) is int and b <= get_context().maximum_digits:
+            result = None
+            if b == 0:
+                result = 1
+            elif b == 1 or a < 2:
+                result = a
+            elif (a.bit_length() - 1) * b < 64:
+                result = a ** b
+            if result is not None and result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big() ** power.__big())
+
+    def sqrt(self):
+        """ integer square root, rounded down """
+        res, _ = self.isqrtrem()
+        return res
+
+    def isqrtrem(self):
+        """ integer square root and remainder: self = s * s + r, with 0 <= r <= 2 * s """
+        a = self.__value
+        if type(a) is int and a < _small_bound():
+            s = math.isqrt(a)
+            return HybridNum.__wrap(s), HybridNum.__wrap(a - s * s)
+        s, r = self.__big().isqrtrem()
+        return HybridNum.__wrap(s), HybridNum.__wrap(r)
+
+    def iroot(self, k):
+        """ integer k-th root, rounded down """
+        res, _ = self.irootrem(k)
+        return res
+
+    def irootrem(self, k):
+        """ integer k-th root and remainder: self = s ** k + r, with s ** k <= self < (s + 1) ** k """
+        k = HybridNum.__coerce(k)
+        a, b = self.__value, k.__value
+        if type(a) is int and type(b) is int and b > 0 and a < _small_bound():
+            s = _iroot(a, b)
+            return HybridNum.__wrap(s), HybridNum.__wrap(a - s ** b if s > 1 else a - s)
+        s, r = self.__big().irootrem(k.__big())
+        return HybridNum.__wrap(s), HybridNum.__wrap(r)
+
+    def ilog(self, base):
+        """ integer logarithm, rounded down: base ** e <= self < base ** (e + 1) """
+        base = HybridNum.__coerce(base)
+        a, b = self.__value, base.__value
+        if type(a) is int and type(b) is int and a > 0 and b > 1:
+            result = _ilog(a, b)
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big().ilog(base.__big()))
+
+    def factorial(self):
+        a = self.__value
+        if type(a) is int and a <= _WORD_FACTORIAL:
+            result = math.factorial(a)
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big().factorial())
+
+    def binomial(self, k):
+        k = HybridNum.__coerce(k)
+        a, b = self.__value, k.__value
+        # the binomials under the word bound have at most 63 factors
+        if type(a) is int and type(b) is int and min(b, a - b) < 64:
+            result = math.comb(a, b)
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big().binomial(k.__big()))
+
+    def gcd(self, other):
+        other = HybridNum.__coerce(other)
+        a, b = self.__value, other.__value
+        if type(a) is int and type(b) is int:
+            result = math.gcd(a, b)
+            if result < _small_bound():
+                return HybridNum.__wrap(result)
+        return HybridNum.__wrap(self.__big().gcd(other.__big()))
+
+    def __int__(self):
+        return int(self.__value)
+
+    def __str__(self):
+        return str(self.__value)
+
+    def __repr__(self):
+        return "HybridNum({})".format(self.__value)
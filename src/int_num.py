@@ -0,0 +1,212 @@
+import functools
+import math
+from bignum import BigNum, get_context, _binomial_digits, _factorial_digits
+
+# digits under the int to str conversion limit of python (4300 digits by default, sys.set_int_max_str_digits)
+_INT_STR_DIGITS = 4000
+
+
+def _iroot(n: int, k: int) -> int:
+    """ integer k-th root by Newton's method, starting from a power of two above the root """
+    if k == 1 or n < 2:
+        return n
+    if k == 2:
+        return math.isqrt(n)
+    if k >= n.bit_length():
+        return 1
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def _ilog(n: int, base: int) -> int:
+    """ floor(log(n, base)) for n >= 1 and base >= 2, estimated by math.log and corrected with exact powers """
+    e = int(math.log(n, base))
+    power = base ** e
+    while power > n:
+        e -= 1
+        power //= base
+    while power * base <= n:
+        e += 1
+        power *= base
+    return e
+
+
+@functools.lru_cache(maxsize=8)
+def _limit_bound(limit: int) -> int:
+    """ 10 ** limit, for the few digits limits used recently """
+    return 10 ** limit
+
+
+def _bound() -> int:
+    """ the values have to be smaller than it """
+    return _limit_bound(get_context().maximum_digits)
+
+
+class IntNum(int):
+    """A python int with the digits limit and the error messages of BigNum.
+
+    The operations are computed by the builtin int, then the results are checked against the
+    digits limit of the current context, in the same places as BigNum does it.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value=0):
+        if isinstance(value, str):
+            if len(value) > get_context().maximum_digits:
+                raise Exception("Maximum digits count reached!")
+            if not value.isascii() or not value.isdigit():
+                raise Exception("Invalid numeric string!")
+            number = int(value) if len(value) <= _INT_STR_DIGITS else int(BigNum(value))
+        elif isinstance(value, int):
+            number = int(value)
+            assert number >= 0
+        else:
+            # BigNum accepts (or rejects) the other value types
+            number = int(BigNum(value))
+        return IntNum.__checked(number)
+
+    @staticmethod
+    def __checked(value: int):
+        if value is NotImplemented:  # the other operand is not an int
+            return value
+        if value >= _bound():
+            raise Exception("Maximum digits count reached!")
+        return int.__new__(IntNum, value)
+
+    def __add__(self, other):
+        return IntNum.__checked(int.__add__(self, other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if self < other:
+            raise Exception("Invalid sub operation! Negative result!")
+        return IntNum.__checked(int.__sub__(self, other))
+
+    def __mul__(self, other):
+        return IntNum.__checked(int.__mul__(self, other))
+
+    __rmul__ = __mul__
+
+    def __divmod__(self, other):
+        if other == 0:
+            raise Exception("Division by 0!")
+        if self < other:
+            return IntNum.__checked(0), self
+        q, r = int.__divmod__(self, other)
+        return IntNum.__checked(q), IntNum.__checked(r)
+
+    def __floordiv__(self, other):
+        quotient, _ = divmod(self, other)
+        return quotient
+
+    def __mod__(self, other):
+        if not other > 0:
+            raise Exception("Invalid modulo operand!")
+        _, remainder = divmod(self, other)
+        return remainder
+
+    def __pow__(self, power, modulo=None):
+        if modulo is not None:
+            if not modulo > 0:
+                raise Exception("Invalid modulo operand!")
+            return IntNum.__checked(pow(int(self), int(power), int(modulo)))
+
+        if power == 0:
+            return IntNum.__checked(1)
+        if power == 1 or self < 2:
+            return self
+
+        # reject too big results before computing them, like BigNum
+        limit = get_context().maximum_digits
+        if power > limit or math.floor(int(power) * math.log10(self) * (1 - 1e-12)) + 1 > limit:
+            raise Exception("Maximum digits count reached!")
+        return IntNum.__checked(int.__pow__(self, power))
+
+    # the reflected operators, for a plain int on the left side, are checked like the regular ones
+
+    def __rsub__(self, other):
+        return IntNum(other) - self if isinstance(other, int) else NotImplemented
+
+    def __rdivmod__(self, other):
+        return divmod(IntNum(other), self) if isinstance(other, int) else NotImplemented
+
+    def __rfloordiv__(self, other):
+        return IntNum(other) // self if isinstance(other, int) else NotImplemented
+
+    def __rmod__(self, other):
+        return IntNum(other) % self if isinstance(other, int) else NotImplemented
+
+    def __rpow__(self, other, modulo=None):
+        return pow(IntNum(other), self, modulo) if isinstance(other, int) else NotImplemented
+
+    # the int operators that BigNum does not support would return plain ints, negative values
+    # or floats, bypassing the digits limit
+    def __unsupported(self, *args):
+        raise TypeError("unsupported operation for IntNum")
+
+    __neg__ = __invert__ = __unsupported
+    __truediv__ = __rtruediv__ = __unsupported
+    __lshift__ = __rlshift__ = __rshift__ = __rrshift__ = __unsupported
+    __and__ = __rand__ = __or__ = __ror__ = __xor__ = __rxor__ = __unsupported
+
+    def sqrt(self):
+        """ integer square root, rounded down """
+        res, _ = self.isqrtrem()
+        return res
+
+    def isqrtrem(self):
+        """ integer square root and remainder: self = s * s + r, with 0 <= r <= 2 * s """
+        s = math.isqrt(self)
+        if s > 1:
+            # BigNum computes the square, which has to be under the digits limit as well
+            IntNum.__checked(s * s)
+        return IntNum.__checked(s), IntNum.__checked(self - s * s)
+
+    def iroot(self, k):
+        res, _ = self.irootrem(k)
+        return res
+
+    def irootrem(self, k):
+        """ integer k-th root and remainder: self = s ** k + r, with s ** k <= self < (s + 1) ** k """
+        if k == 0:
+            raise Exception("Invalid root degree!")
+        s = _iroot(int(self), int(k))
+        return IntNum.__checked(s), IntNum.__checked(self - s ** int(k) if s > 1 else self - s)
+
+    def ilog(self, base):
+        """ integer logarithm, rounded down: base ** e <= self < base ** (e + 1) """
+        if self == 0:
+            raise Exception("Invalid log operand!")
+        if base < 2:
+            raise Exception("Invalid log base!")
+        return IntNum.__checked(_ilog(int(self), int(base)))
+
+    def factorial(self):
+        n = int(self)
+        if _factorial_digits(n) > get_context().maximum_digits:
+            raise Exception("Maximum digits count reached!")
+        return IntNum.__checked(math.factorial(n))
+
+    def binomial(self, k):
+        if k > self:
+            return IntNum.__checked(0)
+        n, k = int(self), min(int(k), int(self) - int(k))
+        if _binomial_digits(n, k) > get_context().maximum_digits:
+            raise Exception("Maximum digits count reached!")
+        return IntNum.__checked(math.comb(n, k))
+
+    def gcd(self, other):
+        return IntNum.__checked(math.gcd(self, other))
+
+    def __str__(self):
+        if self.bit_length() * 30103 // 100000 < _INT_STR_DIGITS:
+            return int.__repr__(self)
+        return str(BigNum(int(self)))
+
+    __repr__ = __str__
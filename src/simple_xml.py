@@ -57,6 +57,7 @@ class SimpleXML:
     @staticmethod
     def save(path, expression, variables, result, steps):
         assert type(path) is str and len(path) > 0, "invalid path"
+        assert result is not None or steps is not None, "invalid result"
 
         with open(path, "wt") as fd:
             fd.write(f"<math>\n\t<expression>\n\t\t{expression}\n\t</expression>\n\t")
@@ -66,12 +67,26 @@ class SimpleXML:
                 fd.write(f"\n\t\t<var {name}=\"{value}\" />")
             fd.write("\n\t </variables>")
 
-            fd.write(f"\n\t<result>\n\t\t{result}\n\t</result>")
-
-            fd.write("\n\t<output>")
-            for step in steps.split("\n"):
-                fd.write(f"\n\t\t{step}")
-            fd.write("\n\t</output>")
+            if result is not None:
+                fd.write(f"\n\t<result>\n\t\t{result}\n\t</result>")
+
+            # the steps are a str of lines or any iterable of lines, e.g. expr_steps, written while
+            # they are generated; without steps there is no output
+            if steps is not None:
+                if isinstance(steps, str):
+                    steps = steps.split("\n")
+                fd.write("\n\t<output>")
+                step = None
+                for step in steps:
+                    fd.write(f"\n\t\t{step}")
+                fd.write("\n\t</output>")
+
+                # without a result, the last step is the result, written after the output
+                if result is None:
+                    result = step
+                    fd.write(f"\n\t<result>\n\t\t{result}\n\t</result>")
 
             fd.write("\n</math>")
+
+        return result
             
\ No newline at end of file
@@ -206,8 +206,21 @@ class MathExpressionEvaluatorUi(tk.Frame):
             name, ext = os.path.splitext(filename)
             out_filename = name + "_out" + ext
 
-            self.__command_compute.__undecorated__(self)
-            self.__save_to(out_filename)
+            with ExceptionContext("loading data from GUI"):
+                expression = self.expression_value()
+                variables = self.variables_value()
+                exponent = self.exponent_value()
+
+            # the expression is evaluated once, while the steps are written to the output file
+            with ExceptionContext("computing math expression"):
+                result, steps = self.backend.save_data(out_filename, expression, list(variables.items()), int(exponent),
+                                                       every=Config.STEPS_EVERY, max_depth=Config.STEPS_MAX_DEPTH)
+                assert type(steps) is str and len(steps) > 0, "invalid result"
+                assert type(result) is str and len(result) > 0, "invalid result"
+
+            with ExceptionContext("display results in GUI"):
+                self.result_value(result)
+                self.steps_value(steps)
 
     @command
     def __command_exit(self): # pragma: no cover
@@ -221,7 +234,8 @@ class MathExpressionEvaluatorUi(tk.Frame):
             exponent = self.exponent_value()
 
         with ExceptionContext("computing math expression"):
-            result, steps = self.backend.compute_data(expression, list(variables.items()), int(exponent))
+            result, steps = self.backend.compute_data(expression, list(variables.items()), int(exponent),
+                                                      every=Config.STEPS_EVERY, max_depth=Config.STEPS_MAX_DEPTH)
             assert type(steps) is str and len(steps) > 0, "invalid result"
             assert type(result) is str and len(result) > 0, "invalid result"
 
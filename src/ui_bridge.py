@@ -1,26 +1,66 @@
 from typing import List, Tuple
-from bignum import BigNum
-from expr_parser import ExpressionParser, expr_solve
+from bignum import BigNum, local_context
+from expr_parser import ExpressionParser, expr_evaluate, expr_steps
+from backends import get_backend
+from simple_xml import SimpleXML
 
 
 class BackendBridge:
     def __init__(self):
-        pass
+        # the evaluations run in local contexts, so the last exponent used is kept here
+        self.__exponent = BigNum.exponent()
 
     def exponent(self) -> str:
-        return str(BigNum.exponent())
+        return str(self.__exponent)
 
-    def compute_data(self, expression:str, variables:List[Tuple[str,str]], exponent:int) -> Tuple[str, str]:
-        """Bridge method between GUI and backend logic"""
+    def compute_data(self, expression:str, variables:List[Tuple[str,str]], exponent:int,
+                     backend: str = "bignum", trace: bool = True, every: int = 1,
+                     max_depth: int = None) -> Tuple[str, str]:
+        """Bridge method between GUI and backend logic, the numbers are computed by the named backend.
+        The output has the steps selected by every and max_depth (see expr_steps), it is empty
+        without trace, and then the steps are not computed at all"""
         assert exponent >= 0, "invalid exponent"
+        number_type = get_backend(backend)
+        self.__exponent = exponent
 
-        BigNum.exponent(exponent)
+        # the limit applies only to this evaluation, so concurrent calls do not see each other's limits
+        with local_context(maximum_digits=exponent):
+            vars = {}
+            for var, val in variables:
+                vars[var] = number_type(val)
+            parser = ExpressionParser(expression, vars, number_type)
+            expr = parser.run()
+            if not trace:
+                return (str(expr_evaluate(expr, vars, number_type)), "")
+            steps = list(expr_steps(expr, vars, number_type, every=every, max_depth=max_depth))
 
-        vars = {}
-        for var, val in variables:
-            vars[var] = BigNum(val)
-        parser = ExpressionParser(expression, vars, BigNum)
-        expr = parser.run()
-        output, result = expr_solve(expr, vars)
+        # the last step is the result
+        return (steps[-1], "".join(step + "\n" for step in steps))
 
-        return (str(result), output)
+    def save_data(self, path: str, expression: str, variables: List[Tuple[str, str]], exponent: int,
+                  backend: str = "bignum", every: int = 1, max_depth: int = None) -> Tuple[str, str]:
+        """Bridge method between GUI and backend logic, the expression is evaluated once and saved to
+        the xml file at path, the steps are written while they are generated and the result, their
+        last step, after them. Returns the result and the steps, like compute_data"""
+        assert exponent >= 0, "invalid exponent"
+        number_type = get_backend(backend)
+        self.__exponent = exponent
+
+        with local_context(maximum_digits=exponent):
+            vars = {}
+            for var, val in variables:
+                vars[var] = number_type(val)
+            parser = ExpressionParser(expression, vars, number_type)
+            expr = parser.run()
+            steps = []
+            result = SimpleXML.save(path, expression, dict(variables), None,
+                                    _recorded(expr_steps(expr, vars, number_type, every=every, max_depth=max_depth), steps))
+
+        return (result, "".join(step + "\n" for step in steps))
+
+
+def _recorded(steps, lines: list):
+    """pass the steps through, appending each one to lines"""
+    for step in steps:
+        lines.append(step)
+        yield step
@@ -8,4 +8,8 @@ class Config:
         ('xml files', '*.xml'),
         ("all files", '*.*')
     )
-    UI_BACKGROUND_COLOR = "#f0f0f0"
\ No newline at end of file
+    UI_BACKGROUND_COLOR = "#f0f0f0"
+    # granularity of the steps shown, see expr_parser.expr_steps: every k-th step, and only the ones
+    # at most this deep in the expression tree (None for all of them, 1 for the top-level ones)
+    STEPS_EVERY = 1
+    STEPS_MAX_DEPTH = None
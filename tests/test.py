@@ -8,6 +8,9 @@ sys.path.insert(0, root_dir)
 
 from test_ui import *
 from test_bignum import *
+from test_bignum_array import *
+from test_hybrid_num import *
+from test_backends import *
 from test_expr_parser import *
 from test_ui_bridge import *
 
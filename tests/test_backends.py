@@ -0,0 +1,98 @@
+import unittest
+import random
+from src.backends import NumberType, register_backend, backend_names
+from src.expr_parser import *
+
+
+class TestBackends(unittest.TestCase):
+
+    @staticmethod
+    def outcome(function, *values):
+        """ str of the result or the error message, to compare the backends with BigNum """
+        try:
+            result = function(*values)
+        except Exception as error:
+            return "error: " + str(error)
+        return tuple(str(value) for value in result) if isinstance(result, tuple) else str(result)
+
+    def test_registry(self):
+        self.assertTrue({"bignum", "int", "hybrid"} <= set(backend_names()))
+        self.assertIs(get_backend("bignum"), BigNum)
+        self.assertIs(get_backend(BigNum), BigNum)
+        self.assertIs(get_backend(int), get_backend("int"))
+        with self.assertRaises(ValueError):
+            get_backend("float")
+        with self.assertRaises(ValueError):
+            register_backend("str", str)
+        self.assertFalse(issubclass(int, NumberType))
+
+    def test_same_as_bignum(self):
+        rnd = random.Random(2022)
+        operations = [
+            lambda a, b: a + b,
+            lambda a, b: a - b,
+            lambda a, b: a * b,
+            lambda a, b: divmod(a, b),
+            lambda a, b: a // b,
+            lambda a, b: a % b,
+            lambda a, b: a ** b,
+            lambda a, b: pow(a, b, a + b),
+            lambda a, b: pow(a, b, b),
+            lambda a, b: a.isqrtrem(),
+            lambda a, b: a.factorial() if int(a) < 3000 else None,
+            lambda a, b: a.binomial(b) if min(int(b), int(a) - int(b)) < 3000 else None,
+            lambda a, b: a.gcd(b),
+            lambda a, b: a.irootrem(b),
+            lambda a, b: a.ilog(b),
+            # a batch compares row by row, bool() takes the single row
+            lambda a, b: tuple(map(bool, (a < b, a <= b, a == b, a != b, a > b, a >= b))),
+        ]
+        values = [0, 1, 2, 3, 10, 99, 2 ** 31, 2 ** 62, 2 ** 63 - 1, 2 ** 63, 10 ** 18, 10 ** 19, 10 ** 30 + 7] + \
+                 [rnd.randrange(10 ** rnd.randrange(1, 25)) for _ in range(6)]
+        for backend in ["int", "hybrid", "batch"]:
+            number_type = get_backend(backend)
+            with self.subTest(backend=backend):
+                for limit in [3, 10, 19, 20, 1000]:
+                    with local_context(maximum_digits=limit):
+                        for i in values:
+                            for j in values:
+                                for operation in operations:
+                                    # the operands are built under the biggest limit, as values carried from before
+                                    with local_context(maximum_digits=1000):
+                                        big, number = BigNum(i), number_type(i)
+                                        big_other, number_other = BigNum(j), number_type(j)
+                                    self.assertEqual(self.outcome(operation, number, number_other),
+                                                     self.outcome(operation, big, big_other), (limit, i, j))
+                for value in ["12a", "", "١٢"]:
+                    self.assertEqual(self.outcome(number_type, value), self.outcome(BigNum, value))
+                with local_context(maximum_digits=3):
+                    self.assertEqual(self.outcome(number_type, "1000"), self.outcome(BigNum, "1000"))
+
+    def test_int_reflected_operators(self):
+        int_num = get_backend("int")
+        self.assertEqual(self.outcome(lambda: 10 - int_num(3)), "7")
+        self.assertIs(type(10 - int_num(3)), int_num)
+        self.assertEqual(self.outcome(lambda: (17 // int_num(5), 17 % int_num(5), 2 ** int_num(10))), ("3", "2", "1024"))
+        self.assertEqual(self.outcome(lambda: 3 - int_num(5)), "error: Invalid sub operation! Negative result!")
+        self.assertEqual(self.outcome(lambda: 5 // int_num(0)), "error: Division by 0!")
+        with local_context(maximum_digits=3):
+            self.assertEqual(self.outcome(lambda: 10 ** int_num(5)), "error: Maximum digits count reached!")
+        # the int operators without a BigNum counterpart are rejected
+        for operation in [lambda a: -a, lambda a: ~a, lambda a: a / 2, lambda a: 2 / a, lambda a: a << 3,
+                          lambda a: a >> 1, lambda a: a & 1, lambda a: 1 | a]:
+            with self.assertRaises(TypeError):
+                operation(int_num(6))
+
+    def test_solver(self):
+        text = "powmod(x, 5, 7) + 2 ** 70 * sqrt 50 / 3 - 100 % 7 + x * 12345678901234567"
+        expected = str(run_one(text, {"x": BigNum(4)}, BigNum))
+        for backend in ["int", "hybrid", int]:
+            for verification in Verification:
+                self.assertEqual(str(run_one(text, {"x": 4}, backend, verification)), expected)
+        with local_context(maximum_digits=3):
+            with self.assertRaises(Exception):
+                run_one("999 + 1", {}, "int")
+
+
+if __name__ == '__main__':
+    unittest.main()
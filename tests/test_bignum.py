@@ -1,11 +1,22 @@
+import io
+import math
+import random
+import sys
+import time
 import unittest
-from src.bignum import BigNum
+from src.bignum import BigNum, Verification, local_context
 
 
 class TestBigNum(unittest.TestCase):
 
     _MAX_N = 100
 
+    def unlimited_int_str_digits(self):
+        """ lift the int to str conversion limit of python for this test """
+        if hasattr(sys, "set_int_max_str_digits"):
+            self.addCleanup(sys.set_int_max_str_digits, sys.get_int_max_str_digits())
+            sys.set_int_max_str_digits(0)
+
     def test_add_op(self):
         for i in range(self._MAX_N):
             a = BigNum(i)
@@ -79,7 +90,6 @@ class TestBigNum(unittest.TestCase):
                     )
 
     def test_sqrt_op(self):
-        import math
         for i in range(self._MAX_N):
             a = BigNum(i)
             self.assertEqual(
@@ -138,17 +148,280 @@ class TestBigNum(unittest.TestCase):
             str(110991097895331722531394551808)
         )
         # big pow
-        BigNum.exponent(100001)
-        self.assertEqual(
-            str(BigNum(3) ** BigNum(10000)),
-            "16313501853426258743032567291811547168121324535825379939348203261918257308143190787480155630847848309673252045223235795433405582999177203852381479145368112501453192355166224391025423628843556686559659645012014177448275529990373274425446425751235537341867387607813619937225616872862016504805593174059909520461668500663118926911571773452255850626968526251879139867085080472539640933730243410152186914328917354576854457274195562218013337745628502470673059426999114202540773175988199842487276183685299388927825296786440252999444785694183675323521704432195785806270123388382931770198990841300861506996108944782065015163410344894945809337689156807686673462563038164792190665340124344133980763205594364754963451564072340502606377790585114123814919001637177034457385019939060232925194471114235892978565322415628344142184842892083466227875760501276009801530703037525839157893875741192497705300469691062454369926795975456340236777734354667139072601574969834312769653557184396147587071260443947944862235744459711204473062937764153770030210332183635531818173456618022745975055313212598514429587545547296534609597194836036546870491771927625214352957503454948403635822345728774885175809500158451837389413798095329711993092101417428406774326126450005467888736546254948658602484494535938888656542746977424368385335496083164921318601934977025095780370104307980276356857350349205866078371806065542393536101673402017980951598946980664330391505845803674248348878071010412918667335823849899623486215050304052577789848512410263834811719236949311423411823585316405085306164936671137456985394285677324771775046050970865520893596151687017153855755197348199659070192954771308347627111052471134476325986362838585959552209645382089055182871854866744633737533217524880118401787595094060855717010144087136495532418544241489437080074716158404895914136451802032446707961058757633345691696743293869623745410870051851590672859347061212573446572045088465460616826082579731686004585218284333452396157730036306379421822435818001505905203918209206969662326706952623512427380240468784114535101496733983401240219840048956733689309620321613793757156727562461651933397540266795963865921590913322060572673349849253303397874242381960775337182730037783698708748781738419747698880321601186310506332869704931303076839444790968339306301273371014087248060946851793697973114432706759288546077622831002526800554849696867710280945946603669593797354642136622231192695027321229511912952940320879763123151760555959496961163141455688278842949587288399100273691880018774147568892650186152065335219113072582417699616901995530249937735219099786758954892534365835235843156112799728164123461219817343904782402517111603206575330527850752564642995318064985900815557979945885931124351303252811255254295797082281946658798705979077492469849644183166585950844953164726896146168297808178398470451561320526180542310840744843107469368959707726836608471817060598771730170755446473440774031371227437651048421606224757527085958515947273151027400662948161111284777828103531499488913672800783167888051177155427285103861736658069404797695900758820465238673970882660162285107599221418743657006872537842677883708807515850397691812433880561772652364847297019508025848964833883225165668986935081274596293983121864046277268590401580209059988500511262470167150495261908136688693861324081559046336288963037090312033522400722360882494928182809075406914319957044927504420797278117837677431446979085756432990753582588102440240611039084516401089948868433353748444104639734074519165067632941419347985624435567342072815910754484123812917487312938280670403228188813003978384081332242484646571417574404852962675165616101527367425654869508712001788393846171780457455963045764943565964887518396481296159902471996735508854292964536796779404377230965723361625182030798297734785854606060323419091646711138678490928840107449923456834763763114226000770316931243666699425694828181155048843161380832067845480569758457751090640996007242018255400627276908188082601795520167054701327802366989747082835481105543878446889896230696091881643547476154998574015907396059478684978574180486798918438643164618541351689258379042326487669479733384712996754251703808037828636599654447727795924596382283226723503386540591321268603222892807562509801015765174359627788357881606366119032951829868274617539946921221330284257027058653162292482686679275266764009881985590648534544939224296689791195355783205968492422636277656735338488299104238060289209390654467316291591219712866052661347026855261289381236881063068219249064767086495184176816629077103667131505064964190910450196502178972477361881300608688593782509793781457170396897496908861893034634895715117114601514654381347139092345833472226493656930996045016355808162984965203661519182202145414866559662218796964329217241498105206552200001"
-        )
+        with local_context(maximum_digits=100001):
+            self.assertEqual(
+                str(BigNum(3) ** BigNum(10000)),
+                "16313501853426258743032567291811547168121324535825379939348203261918257308143190787480155630847848309673252045223235795433405582999177203852381479145368112501453192355166224391025423628843556686559659645012014177448275529990373274425446425751235537341867387607813619937225616872862016504805593174059909520461668500663118926911571773452255850626968526251879139867085080472539640933730243410152186914328917354576854457274195562218013337745628502470673059426999114202540773175988199842487276183685299388927825296786440252999444785694183675323521704432195785806270123388382931770198990841300861506996108944782065015163410344894945809337689156807686673462563038164792190665340124344133980763205594364754963451564072340502606377790585114123814919001637177034457385019939060232925194471114235892978565322415628344142184842892083466227875760501276009801530703037525839157893875741192497705300469691062454369926795975456340236777734354667139072601574969834312769653557184396147587071260443947944862235744459711204473062937764153770030210332183635531818173456618022745975055313212598514429587545547296534609597194836036546870491771927625214352957503454948403635822345728774885175809500158451837389413798095329711993092101417428406774326126450005467888736546254948658602484494535938888656542746977424368385335496083164921318601934977025095780370104307980276356857350349205866078371806065542393536101673402017980951598946980664330391505845803674248348878071010412918667335823849899623486215050304052577789848512410263834811719236949311423411823585316405085306164936671137456985394285677324771775046050970865520893596151687017153855755197348199659070192954771308347627111052471134476325986362838585959552209645382089055182871854866744633737533217524880118401787595094060855717010144087136495532418544241489437080074716158404895914136451802032446707961058757633345691696743293869623745410870051851590672859347061212573446572045088465460616826082579731686004585218284333452396157730036306379421822435818001505905203918209206969662326706952623512427380240468784114535101496733983401240219840048956733689309620321613793757156727562461651933397540266795963865921590913322060572673349849253303397874242381960775337182730037783698708748781738419747698880321601186310506332869704931303076839444790968339306301273371014087248060946851793697973114432706759288546077622831002526800554849696867710280945946603669593797354642136622231192695027321229511912952940320879763123151760555959496961163141455688278842949587288399100273691880018774147568892650186152065335219113072582417699616901995530249937735219099786758954892534365835235843156112799728164123461219817343904782402517111603206575330527850752564642995318064985900815557979945885931124351303252811255254295797082281946658798705979077492469849644183166585950844953164726896146168297808178398470451561320526180542310840744843107469368959707726836608471817060598771730170755446473440774031371227437651048421606224757527085958515947273151027400662948161111284777828103531499488913672800783167888051177155427285103861736658069404797695900758820465238673970882660162285107599221418743657006872537842677883708807515850397691812433880561772652364847297019508025848964833883225165668986935081274596293983121864046277268590401580209059988500511262470167150495261908136688693861324081559046336288963037090312033522400722360882494928182809075406914319957044927504420797278117837677431446979085756432990753582588102440240611039084516401089948868433353748444104639734074519165067632941419347985624435567342072815910754484123812917487312938280670403228188813003978384081332242484646571417574404852962675165616101527367425654869508712001788393846171780457455963045764943565964887518396481296159902471996735508854292964536796779404377230965723361625182030798297734785854606060323419091646711138678490928840107449923456834763763114226000770316931243666699425694828181155048843161380832067845480569758457751090640996007242018255400627276908188082601795520167054701327802366989747082835481105543878446889896230696091881643547476154998574015907396059478684978574180486798918438643164618541351689258379042326487669479733384712996754251703808037828636599654447727795924596382283226723503386540591321268603222892807562509801015765174359627788357881606366119032951829868274617539946921221330284257027058653162292482686679275266764009881985590648534544939224296689791195355783205968492422636277656735338488299104238060289209390654467316291591219712866052661347026855261289381236881063068219249064767086495184176816629077103667131505064964190910450196502178972477361881300608688593782509793781457170396897496908861893034634895715117114601514654381347139092345833472226493656930996045016355808162984965203661519182202145414866559662218796964329217241498105206552200001"
+            )
         # big mul
         self.assertEqual(
             str(BigNum("12319023812011109926937089861020589297729876443225196068864") * BigNum("12319023812011109926937089861020589")),
             "151758347680896738252975303878269364169172688915377228432274113364008603746023075749765840896"
         )
 
+    def test_big_operands(self):
+        rnd = random.Random(1000)
+        with local_context(maximum_digits=1000):
+            for _ in range(50):
+                i = rnd.randrange(10 ** rnd.randrange(1, 300))
+                j = rnd.randrange(1, 10 ** rnd.randrange(1, 200))
+                a, b = BigNum(str(i)), BigNum(str(j))
+                self.assertEqual(str(a + b), str(i + j))
+                self.assertEqual(str(a * b), str(i * j))
+                self.assertEqual(str(a // b), str(i // j))
+                self.assertEqual(str(a % b), str(i % j))
+                if i >= j:
+                    self.assertEqual(str(a - b), str(i - j))
+                self.assertEqual(str(a.sqrt()), str(math.isqrt(i)))
+
+
+    def test_mul_algorithms(self):
+        rnd = random.Random(2022)
+        self.unlimited_int_str_digits()
+        with local_context(maximum_digits=10000):
+            # operand sizes around the schoolbook / Karatsuba / Toom-3 crossovers
+            for digits in [500, 900, 1500, 3000, 4000]:
+                i = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                j = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                self.assertEqual(str(BigNum(str(i)) * BigNum(str(j))), str(i * j))
+                self.assertEqual(str(BigNum(str(i)) * BigNum(str(i))), str(i * i))
+                self.assertEqual(str(BigNum(str(i)) * BigNum(str(j // 10 ** (digits // 2)))), str(i * (j // 10 ** (digits // 2))))
+            nines = 10 ** 4000 - 1
+            self.assertEqual(str(BigNum(str(nines)) * BigNum(str(nines))), str(nines * nines))
+
+    def test_ntt_mul(self):
+        rnd = random.Random(2022)
+        self.unlimited_int_str_digits()
+        with local_context(maximum_digits=50000):
+            # operands over the NTT crossover, balanced, unbalanced and squared
+            for digits in [3700, 9000, 20000]:
+                i = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                j = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                self.assertEqual(str(BigNum(str(i)) * BigNum(str(j))), str(i * j))
+                self.assertEqual(str(BigNum(str(i)) ** 2), str(i * i))
+                self.assertEqual(str(BigNum(str(i)) * BigNum(str(j // 10 ** (digits // 3)))), str(i * (j // 10 ** (digits // 3))))
+            # the largest coefficients of the convolution
+            nines = 10 ** 20000 - 1
+            self.assertEqual(str(BigNum(str(nines)) * BigNum(str(nines))), str(nines * nines))
+
+    def test_divmod_op(self):
+        rnd = random.Random(2022)
+        self.unlimited_int_str_digits()
+        with local_context(maximum_digits=10000):
+            # divisor sizes around the Algorithm D / Burnikel-Ziegler crossover
+            for digits in [20, 400, 1400, 2000, 3500]:
+                j = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                for i in [rnd.randrange(10 ** (2 * digits)), j * rnd.randrange(10 ** digits), j - 1, j]:
+                    q, r = divmod(BigNum(str(i)), BigNum(str(j)))
+                    self.assertEqual((str(q), str(r)), (str(i // j), str(i % j)))
+            with self.assertRaises(Exception):
+                divmod(BigNum(100), BigNum(0))
+
+    def test_isqrtrem_op(self):
+        rnd = random.Random(2022)
+        for i in list(range(self._MAX_N)) + [rnd.randrange(10 ** digits) for digits in [18, 19, 40, 300, 999]]:
+            s, r = BigNum(str(i)).isqrtrem()
+            self.assertEqual((str(s), str(r)), (str(math.isqrt(i)), str(i - math.isqrt(i) ** 2)))
+
+    def test_pow_modulo_op(self):
+        for i in range(0, self._MAX_N, 7):
+            for j in range(0, self._MAX_N, 3):
+                for m in [1, 2, 10, 97, 10 ** 12 + 39, 10 ** 40 + 1]:
+                    self.assertEqual(
+                        str(pow(BigNum(i), BigNum(j), BigNum(m))),
+                        str(pow(i, j, m))
+                    )
+        # the modulus keeps the huge exponents out of the digits limit
+        self.assertEqual(str(pow(BigNum(3), BigNum("9" * 900), BigNum(10 ** 9 + 7))), str(pow(3, int("9" * 900), 10 ** 9 + 7)))
+        with self.assertRaises(Exception):
+            pow(BigNum(3), BigNum(3), BigNum(0))
+
+    def test_pow_estimate(self):
+        with local_context(maximum_digits=1000):
+            self.assertEqual(str(BigNum(10) ** BigNum(999)), "1" + "0" * 999)
+            start = time.perf_counter()
+            with self.assertRaises(Exception):
+                BigNum(10 ** 9) ** BigNum(999)
+            self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_sampled_verification(self):
+        BigNum.verification(Verification.SAMPLE, 1)
+        try:
+            a, b = BigNum("123456789123456789123456789"), BigNum("987654321987")
+            self.assertEqual(str(a + b), str(123456789123456789123456789 + 987654321987))
+            self.assertEqual(str(a - b), str(123456789123456789123456789 - 987654321987))
+            self.assertEqual(str(a * b), str(123456789123456789123456789 * 987654321987))
+            self.assertEqual(str(a * a), str(123456789123456789123456789 ** 2))
+            self.assertEqual(str(divmod(a, b)[1]), str(123456789123456789123456789 % 987654321987))
+            self.assertEqual(str(b ** 5), str(987654321987 ** 5))
+            self.assertEqual(str(a.sqrt()), str(math.isqrt(123456789123456789123456789)))
+        finally:
+            BigNum.verification(Verification.OFF, 16)
+        self.assertEqual(BigNum.verification(), Verification.OFF)
+
+    def test_hash_op(self):
+        for i in [0, 1, 10, 2 ** 61 - 1, 2 ** 61, 10 ** 200 + 7]:
+            self.assertEqual(hash(BigNum(i)), hash(i))
+            self.assertEqual(hash(BigNum(BigNum(str(i)))), hash(i))
+        cache = {BigNum(12): "a", BigNum("12345678901234567890"): "b"}
+        self.assertEqual(cache[BigNum("12")], "a")
+        self.assertEqual(cache[12345678901234567890], "b")
+
+    def test_shared_copies(self):
+        a = BigNum("123456789123456789")
+        b = BigNum(a)
+        self.assertEqual(a, b)
+        c = b + 1
+        self.assertEqual(str(a), "123456789123456789")
+        self.assertEqual(str(b), "123456789123456789")
+        self.assertEqual(str(c), "123456789123456790")
+
+    def test_small_operands(self):
+        x = 98765432109876543210987654321098765432109876543210
+        a = BigNum(str(x))
+        for small in [1, 2, 7, 10, 999999999, 10 ** 8, 10 ** 9, 10 ** 20, 10 ** 27, 10 ** 60]:
+            self.assertEqual(str(a * small), str(x * small))
+            self.assertEqual(str(BigNum(small) * a), str(small * x))
+            self.assertEqual(str(a // small), str(x // small))
+            self.assertEqual(str(a % small), str(x % small))
+            self.assertEqual(str(a + small), str(x + small))
+        self.assertEqual(str(BigNum.ZERO), "0")
+        self.assertEqual(str(BigNum.ONE), "1")
+        self.assertEqual(str(BigNum.TEN), "10")
+
+    def test_conversions(self):
+        rnd = random.Random(2022)
+        self.unlimited_int_str_digits()
+        with local_context(maximum_digits=20000):
+            for digits in [1, 9, 10, 500, 577, 1200, 20000]:
+                i = rnd.randrange(10 ** (digits - 1), 10 ** digits)
+                a = BigNum(i)
+                self.assertEqual(str(a), str(i))
+                self.assertEqual(int(BigNum(str(i))), i)
+                stream = io.StringIO()
+                a.write_to(stream, 7)
+                self.assertEqual(stream.getvalue(), str(i))
+
+    def test_augmented_assignment_ops(self):
+        for i in range(self._MAX_N):
+            for j in range(self._MAX_N):
+                a = BigNum(i * 1000003)
+                a += BigNum(j)
+                self.assertEqual(str(a), str(i * 1000003 + j))
+                a -= j
+                self.assertEqual(str(a), str(i * 1000003))
+                a *= j
+                self.assertEqual(str(a), str(i * 1000003 * j))
+                if j > 0:
+                    a //= BigNum(j + 7)
+                    self.assertEqual(str(a), str(i * 1000003 * j // (j + 7)))
+
+        big = 10 ** 40 + 123456789
+        a = BigNum(big)
+        a *= BigNum(10 ** 20 + 1)
+        a //= BigNum(10 ** 15 + 3)
+        self.assertEqual(str(a), str(big * (10 ** 20 + 1) // (10 ** 15 + 3)))
+
+        # the other references to the operand keep their value
+        a = BigNum(10 ** 30)
+        b = BigNum(a)
+        alias = a
+        a += 1
+        self.assertEqual(str(a), str(10 ** 30 + 1))
+        self.assertEqual(str(b), str(10 ** 30))
+        self.assertEqual(str(alias), str(10 ** 30))
+        self.assertEqual(hash(a), hash(10 ** 30 + 1))
+        self.assertEqual(hash(alias), hash(10 ** 30))
+
+        # including the operands returned as results
+        x = BigNum(7)
+        values = {x: "x"}
+        for res in [x ** 1, divmod(x, BigNum(9))[1], BigNum(1) ** 5]:
+            res += 1
+            res *= 3
+        self.assertEqual(str(x), "7")
+        self.assertEqual(values[BigNum(7)], "x")
+        self.assertEqual(str(BigNum(1)), "1")
+
+        # a failing operation leaves the operand unchanged
+        a = BigNum(3)
+        with self.assertRaises(Exception):
+            a -= 4
+        with self.assertRaises(Exception):
+            a //= 0
+        with local_context(maximum_digits=3):
+            a = BigNum(999)
+            with self.assertRaises(Exception):
+                a += 1
+            with self.assertRaises(Exception):
+                a *= 2
+            self.assertEqual(str(a), "999")
+
+    def test_iroot_ilog(self):
+        rnd = random.Random(2022)
+
+        def iroot(n, k):
+            low, high = 0, n
+            while low < high:
+                middle = (low + high + 1) // 2
+                if middle ** k <= n:
+                    low = middle
+                else:
+                    high = middle - 1
+            return low
+
+        with local_context(maximum_digits=2000):
+            for _ in range(500):
+                n = rnd.randrange(10 ** rnd.randrange(1, 300))
+                k = rnd.randrange(1, 40)
+                s, r = BigNum(n).irootrem(k)
+                self.assertEqual(int(s), iroot(n, k))
+                self.assertEqual(int(r), n - iroot(n, k) ** k)
+            for n in [0, 1, 2, 8, 9, 10 ** 18 - 1, 10 ** 18, 2 ** 64, 10 ** 27]:
+                for k in [1, 2, 3, 5, 64, 65, 100]:
+                    self.assertEqual(int(BigNum(n).iroot(k)), iroot(n, k))
+                self.assertEqual(int(BigNum(n).iroot(10 ** 20)), min(n, 1))
+            for _ in range(500):
+                n = rnd.randrange(1, 10 ** rnd.randrange(1, 300))
+                b = rnd.randrange(2, 10 ** rnd.randrange(1, 30))
+                e = int(BigNum(n).ilog(b))
+                self.assertTrue(b ** e <= n < b ** (e + 1))
+            for n in [1, 9, 10, 11, 99, 100, 10 ** 100 - 1, 10 ** 100]:
+                self.assertEqual(int(BigNum(n).ilog(10)), len(str(n)) - 1)
+
+            with self.assertRaises(Exception):
+                BigNum(5).iroot(0)
+            with self.assertRaises(Exception):
+                BigNum(0).ilog(2)
+            with self.assertRaises(Exception):
+                BigNum(5).ilog(1)
+
+    def test_factorial_binomial_gcd(self):
+        rnd = random.Random(2022)
+        with local_context(maximum_digits=20000):
+            for n in list(range(60)) + [100, 1000, 3000]:
+                self.assertEqual(int(BigNum(n).factorial()), math.factorial(n))
+            for _ in range(200):
+                n = rnd.randrange(0, 3000)
+                k = rnd.randrange(0, n + 5)
+                self.assertEqual(int(BigNum(n).binomial(k)), math.comb(n, k))
+            for n, k in [(10 ** 50, 3), (10 ** 20 + 7, 40), (123456789012, 300)]:
+                self.assertEqual(int(BigNum(n).binomial(k)), math.comb(n, k))
+            for _ in range(200):
+                g = rnd.randrange(1, 10 ** rnd.randrange(1, 60))
+                a = g * rnd.randrange(10 ** rnd.randrange(1, 400))
+                b = g * rnd.randrange(10 ** rnd.randrange(1, 400))
+                self.assertEqual(int(BigNum(a).gcd(b)), math.gcd(a, b))
+            self.assertEqual(str(BigNum(0).gcd(0)), "0")
+            self.assertEqual(str(BigNum(12).gcd(0)), "12")
+
+        with local_context(maximum_digits=10):
+            self.assertEqual(str(BigNum(13).factorial()), str(math.factorial(13)))
+            for value in [BigNum(14), BigNum(10 ** 9)]:
+                with self.assertRaises(Exception):
+                    value.factorial()
+            with self.assertRaises(Exception):
+                BigNum(40).binomial(20)
 
 if __name__ == '__main__':
     unittest.main()
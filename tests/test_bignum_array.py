@@ -0,0 +1,91 @@
+import unittest
+import math
+import random
+import sys
+from src.bignum_array import BigNumArray, numpy
+from src.bignum import BigNum
+from src.expr_parser import *
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBigNumArray(unittest.TestCase):
+
+    def setUp(self):
+        if hasattr(sys, "set_int_max_str_digits"):
+            self.addCleanup(sys.set_int_max_str_digits, sys.get_int_max_str_digits())
+            sys.set_int_max_str_digits(0)
+        rnd = random.Random(2022)
+        self.xs = [rnd.randrange(10 ** rnd.randrange(1, 80)) for _ in range(300)] + [0, 1, 10 ** 9 - 1, 10 ** 9]
+        self.ys = [rnd.randrange(1, 10 ** rnd.randrange(1, 80)) for _ in range(300)] + [1, 10 ** 9 - 1, 10 ** 9, 3]
+
+    def test_arithmetic_ops(self):
+        x, y = BigNumArray(self.xs), BigNumArray(self.ys)
+        self.assertEqual((x + y).tolist(), [a + b for a, b in zip(self.xs, self.ys)])
+        self.assertEqual((x * y).tolist(), [a * b for a, b in zip(self.xs, self.ys)])
+        self.assertEqual((x * y - x).tolist(), [a * b - a for a, b in zip(self.xs, self.ys)])
+        self.assertEqual((x ** 3).tolist(), [a ** 3 for a in self.xs])
+        self.assertEqual(pow(x, y, BigNumArray(1000003)).tolist(), [pow(a, b, 1000003) for a, b in zip(self.xs, self.ys)])
+        self.assertEqual(x.sqrt().tolist(), [math.isqrt(a) for a in self.xs])
+        with self.assertRaises(Exception):
+            BigNumArray([1, 2]) - BigNumArray([1, 3])
+
+        # a shared exponent is checked against the digits limit before any multiplication, except for 0 and 1
+        with local_context(maximum_digits=1000):
+            with self.assertRaises(Exception):
+                BigNumArray(2) ** BigNumArray(1500)
+            with self.assertRaises(Exception):
+                BigNumArray([1, 10 ** 9]) ** 200
+            self.assertEqual((BigNumArray([0, 1]) ** BigNumArray(1500)).tolist(), [0, 1])
+
+    def test_divmod_op(self):
+        x, y = BigNumArray(self.xs), BigNumArray(self.ys)
+        q, r = divmod(x, y)
+        self.assertEqual((q.tolist(), r.tolist()), ([a // b for a, b in zip(self.xs, self.ys)], [a % b for a, b in zip(self.xs, self.ys)]))
+        small = [b % (10 ** 9 - 1) + 1 for b in self.ys]
+        q, r = divmod(x, BigNumArray(small))
+        self.assertEqual((q.tolist(), r.tolist()), ([a // b for a, b in zip(self.xs, small)], [a % b for a, b in zip(self.xs, small)]))
+        self.assertEqual((x % 7).tolist(), [a % 7 for a in self.xs])
+        # word sized remainders bigger than a limb
+        r = x % 4294967291
+        self.assertEqual((r * r + r).tolist(), [(a % 4294967291) ** 2 + a % 4294967291 for a in self.xs])
+        with self.assertRaises(Exception):
+            x // BigNumArray([0] + self.ys[1:])
+
+    def test_compare_ops(self):
+        x, y = BigNumArray(self.xs), BigNumArray(self.ys)
+        self.assertEqual((x < y).tolist(), [a < b for a, b in zip(self.xs, self.ys)])
+        self.assertEqual((x >= y).tolist(), [a >= b for a, b in zip(self.xs, self.ys)])
+        self.assertEqual((x == x).all(), True)
+        self.assertEqual((x == 0).tolist(), [a == 0 for a in self.xs])
+
+    def test_values(self):
+        self.assertEqual(str(BigNumArray(5)), "5")
+        self.assertEqual(str(BigNumArray(["12", 10 ** 20, BigNum(3)])), "[12, 100000000000000000000, 3]")
+        self.assertEqual(int(BigNumArray(10 ** 30)), 10 ** 30)
+        with self.assertRaises(Exception):
+            BigNumArray(["12a"])
+        with self.assertRaises(Exception):
+            BigNumArray([-1])
+        with self.assertRaises(Exception):
+            BigNumArray([1, 2]) + BigNumArray([1, 2, 3])
+        with local_context(maximum_digits=3):
+            with self.assertRaises(Exception):
+                BigNumArray([1, 1000])
+            with self.assertRaises(Exception):
+                BigNumArray([1, 999]) * 2
+
+    def test_solver(self):
+        text = "x * y + powmod(x, 3, 1000) + sqrt x - x / 3 % 5 + x ** 2"
+        expected = [a * b + pow(a, 3, 1000) + math.isqrt(a) - a // 3 % 5 + a ** 2 for a, b in zip(self.xs, self.ys)]
+        for verification in Verification:
+            result = run_one(text, {"x": BigNumArray(self.xs), "y": BigNumArray(self.ys)}, BigNumArray, verification)
+            self.assertEqual(result.tolist(), expected)
+        # the error of any row fails the whole batch
+        with self.assertRaises(ValueError):
+            run_one("x / y", {"x": BigNumArray([4, 5]), "y": BigNumArray([2, 0])}, BigNumArray)
+        with self.assertRaises(ValueError):
+            run_one("x - 3", {"x": BigNumArray([4, 2])}, BigNumArray)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,9 @@
+import math
+import pickle
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.backends import backend_names, get_backend
 from src.expr_parser import *
 
 class ExprParserTestCases(unittest.TestCase):
@@ -12,6 +17,26 @@ class ExprParserTestCases(unittest.TestCase):
         with self.assertRaises(Exception):
             run_one("```x - 1", {"x": BigNum(0)})
 
+    def test_tokenizer(self):
+        text = " 12 ** x+sqrt(y2) %\tpowmod(1,2,3) "
+        tokens = ExpressionTokenizer(text).tokenize()
+        self.assertEqual([token.kind for token in tokens], [
+            TokenKind.NUMBER, TokenKind.DOUBLE_STAR, TokenKind.VARIABLE, TokenKind.PLUS, TokenKind.SQRT,
+            TokenKind.OPEN_PAREN, TokenKind.VARIABLE, TokenKind.NUMBER, TokenKind.CLOSED_PAREN, TokenKind.MODULO,
+            TokenKind.POWMOD, TokenKind.OPEN_PAREN, TokenKind.NUMBER, TokenKind.COMMA, TokenKind.NUMBER,
+            TokenKind.COMMA, TokenKind.NUMBER, TokenKind.CLOSED_PAREN, TokenKind.END])
+        self.assertEqual([text[token.loc.start:token.loc.end] for token in tokens[:8]],
+                         ["12", "**", "x", "+", "sqrt", "(", "y", "2"])
+        self.assertEqual((tokens[-1].loc.start, tokens[-1].loc.end), (len(text), len(text)))
+        self.assertEqual([(token.kind, token.loc.start) for token in ExpressionTokenizer(text).iter_tokens()],
+                         [(token.kind, token.loc.start) for token in tokens])
+        self.assertFalse(hasattr(tokens[0], "__dict__"))
+        for text in ["1 $ 2", "1 + 2 #", "1 + \u00b2"]:
+            with self.assertRaises(ValueError):
+                ExpressionTokenizer(text).tokenize()
+            with self.assertRaises(ValueError):
+                ExpressionParser(text, {}).run()
+
     def test_missing_paren(self):
         with self.assertRaises(Exception):
             run_one("(x - 1", {})
@@ -68,4 +93,290 @@ class ExprParserTestCases(unittest.TestCase):
         with_big = run_one("1 + 1", {})
         with_int = run_one("1 + 1", {}, int)
         self.assertEqual(str(with_big), str(with_int))
-        self.assertEqual(with_int, 2)
\ No newline at end of file
+        self.assertEqual(with_int, 2)
+
+    def test_precedence(self):
+        # an operator of higher priority takes the rest of the level of the right operand
+        self.assertEqual(ExpressionParser("7 * 3 ** 2 / 4", {}).run().dump(), "(7 * ((3 ** 2) / 4))")
+        self.assertEqual(ExpressionParser("1 + 2 * 3 - 4", {}).run().dump(), "((1 + (2 * 3)) - 4)")
+        self.assertEqual(ExpressionParser("sqrt 16 ** 2 % 5", {}).run().dump(), "((sqrt 16 ** 2) % 5)")
+
+    def test_deep_nesting(self):
+        depth = 100000
+        expr = ExpressionParser("(1 + " * depth + "x" + ")" * depth, {}).run()
+        for _ in range(depth):
+            self.assertIsInstance(expr, BinaryExpr)
+            expr = expr.right
+        self.assertIsInstance(expr, VariableExpr)
+        expr = ExpressionParser("sqrt " * depth + "4", {}).run()
+        for _ in range(depth):
+            self.assertIsInstance(expr, UnaryExpr)
+            expr = expr.subexpression
+        self.assertIsInstance(expr, NumericExpr)
+        with self.assertRaises(ValueError):
+            ExpressionParser("(" * depth + "1" + ")" * (depth - 1), {}).run()
+
+    def test_steps(self):
+        variables = {"x": BigNum(7), "y": BigNum(10 ** 20)}
+        for text in ["2 ** (1 + 2 * x - 3 / sqrt y)", "powmod(x + 1, 2 ** 100, 1000) * gcd(y, 12) % 7",
+                     "fact x - binom(x, 3) + root(y, 3) * ilog(y, x)", "(((x)))", "42"]:
+            expr = ExpressionParser(text, variables).run()
+            # the steps of the previous solver, a new tree and a new dump at every step
+            expected = expr.dump() + '\n'
+            leftmost = expr
+            while not isinstance(leftmost, NumericExpr):
+                leftmost = Solver(BigNum).solve_leftmost(leftmost, variables)
+                expected += leftmost.dump() + '\n'
+            steps, result = expr_solve(expr, variables)
+            self.assertEqual(steps, expected)
+            self.assertEqual(str(result), str(leftmost.value))
+
+        # deeper than the recursion limit, without the recursive verification
+        expr = ExpressionParser("1" + " + x" * 3000, variables).run()
+        steps, result = expr_solve(expr, variables, verification=Verification.OFF)
+        self.assertEqual(result, 1 + 7 * 3000)
+        self.assertEqual(steps.count('\n'), 6001)
+        self.assertTrue(steps.endswith("\n(20994 + x)\n(20994 + 7)\n21001\n"))
+
+    def test_lazy_steps(self):
+        variables = {"x": BigNum(7)}
+        expr = ExpressionParser("1 + 2 * 3 + x * 5", variables).run()
+        steps, result = expr_solve(expr, variables)
+        lines = steps.split('\n')[:-1]
+        self.assertEqual(list(expr_steps(expr, variables)), lines)
+        self.assertEqual(str(expr_evaluate(expr, variables)), str(result))
+        self.assertEqual(list(expr_steps(expr, variables, every=2)), [lines[0]] + lines[2::2] + ["42"])
+        self.assertEqual(list(expr_steps(expr, variables, max_depth=1)),
+                         ["((1 + (2 * 3)) + (x * 5))", "(7 + (x * 5))", "(7 + 35)", "42"])
+        self.assertEqual(list(expr_steps(expr, variables, max_depth=0)), [lines[0], "42"])
+        with self.assertRaises(ValueError):
+            expr_steps(expr, variables, every=0)
+
+        # the steps are generated on demand, in the context of the call
+        steps = expr_steps(ExpressionParser("10 ** 3 - 10 ** 4", {}).run(), {}, context=EvaluationContext(4))
+        self.assertEqual(next(steps), "((10 ** 3) - (10 ** 4))")
+        self.assertEqual(next(steps), "(1000 - (10 ** 4))")
+        with local_context(maximum_digits=100):
+            with self.assertRaises(Exception):
+                next(steps)
+
+    def test_compiled(self):
+        text = "x - 3 / y + powmod(x, 2, 7) * sqrt x % y + root(x, 2) + ilog(x + 1, y + 2) + fact 3 - binom(5, 2)"
+        for number_type in [BigNum, int]:
+            expr = ExpressionParser(text, {}, number_type).run()
+            evaluate = expr_compile(expr, number_type)
+            solver = Solver(number_type)
+            for x, y in [(9, 2), (12345, 678), (10 ** 30, 7)]:
+                variables = {"x": get_backend(number_type)(x), "y": get_backend(number_type)(y)}
+                self.assertEqual(str(evaluate(variables)), str(solver.solve_normal(expr, variables)))
+            for variables in [{"x": 0, "y": 2}, {"x": 9, "y": 0}]:
+                variables = {name: get_backend(number_type)(value) for name, value in variables.items()}
+                with self.assertRaises(ValueError) as compiled_error:
+                    evaluate(variables)
+                with self.assertRaises(ValueError) as solver_error:
+                    solver.solve_normal(expr, variables)
+                self.assertEqual(str(compiled_error.exception), str(solver_error.exception))
+            with self.assertRaises(KeyError):
+                evaluate({"x": get_backend(number_type)(1)})
+
+        # deeper than the recursion limit
+        evaluate = expr_compile(ExpressionParser("(1 + " * 5000 + "x" + ")" * 5000, {}).run())
+        self.assertEqual(evaluate({"x": BigNum(1)}), 5001)
+
+    def test_virtual_machine(self):
+        text = "x - 3 / y + powmod(x, 2, 7) * sqrt x % y + root(x, 2) + ilog(x + 1, y + 2) + fact 3 - binom(5, 2)"
+        for number_type in [BigNum, int]:
+            expr = ExpressionParser(text, {}, number_type).run()
+            program = pickle.loads(pickle.dumps(BytecodeCompiler(number_type).compile(expr)))
+            solver = Solver(number_type)
+            for x, y in [(9, 2), (12345, 678), (10 ** 30, 7)]:
+                variables = {"x": get_backend(number_type)(x), "y": get_backend(number_type)(y)}
+                self.assertEqual(str(VirtualMachine().run(program, variables)), str(solver.solve_normal(expr, variables)))
+            for variables in [{"x": 0, "y": 2}, {"x": 9, "y": 0}]:
+                variables = {name: get_backend(number_type)(value) for name, value in variables.items()}
+                with self.assertRaises(ValueError) as machine_error:
+                    VirtualMachine().run(program, variables)
+                with self.assertRaises(ValueError) as solver_error:
+                    solver.solve_normal(expr, variables)
+                self.assertEqual(str(machine_error.exception), str(solver_error.exception))
+            with self.assertRaises(KeyError):
+                VirtualMachine().run(program, {"x": get_backend(number_type)(1)})
+
+        program = BytecodeCompiler().compile(ExpressionParser("x * 2 + sqrt (x * y) - 1", {}).run())
+        self.assertEqual(program.dump(), "x = load_var 'x'\nr4 = mul x 2\ny = load_var 'y'\nr5 = mul x y\n"
+                                         "r5 = sqrt r5\nr4 = add r4 r5\nr4 = sub r4 1")
+        machine = VirtualMachine(count=True)
+        for x in range(1, 4):
+            self.assertEqual(machine.run(program, {"x": BigNum(x), "y": BigNum(x)}), 3 * x - 1)
+        self.assertEqual(machine.counts(), {"load_var": 6, "add": 3, "sub": 3, "mul": 6, "sqrt": 3})
+
+        # deeper than the recursion limit
+        program = BytecodeCompiler().compile(ExpressionParser("(1 + " * 5000 + "x" + ")" * 5000, {}).run())
+        self.assertEqual(VirtualMachine().run(program, {"x": BigNum(1)}), 5001)
+
+    def test_interning(self):
+        variables = {"a": BigNum(3), "b": BigNum(4), "c": BigNum(5), "d": BigNum(6)}
+        expr = ExpressionParser("(a * b + c) ** 2 + (a * b + c) * d", variables).run()
+        shared, deduplicated = expr_intern(expr)
+        self.assertEqual(deduplicated, 5)
+        self.assertEqual(sum(1 for _ in postorder(shared)), sum(1 for _ in postorder(expr)) - 5)
+        self.assertIs(shared.left.left, shared.right.left)
+        self.assertEqual(shared.dump(), expr.dump())
+
+        # the repeated subexpression is solved once
+        certificates = []
+        self.assertEqual(Solver(BigNum, certificates).solve_shared(shared, variables), 17 ** 2 + 17 * 6)
+        self.assertEqual(len(certificates), 1)
+        self.assertEqual(str(expr_evaluate(expr, variables)), str(17 ** 2 + 17 * 6))
+
+        # the steps keep the shape of the expression
+        steps, _ = expr_solve(expr, variables)
+        self.assertEqual(steps.split('\n')[:9], [
+            "((((a * b) + c) ** 2) + (((a * b) + c) * d))",
+            "((((3 * b) + c) ** 2) + (((a * b) + c) * d))",
+            "((((3 * 4) + c) ** 2) + (((a * b) + c) * d))",
+            "(((12 + c) ** 2) + (((a * b) + c) * d))",
+            "(((12 + 5) ** 2) + (((a * b) + c) * d))",
+            "((17 ** 2) + (((a * b) + c) * d))",
+            "(289 + (((a * b) + c) * d))",
+            "(289 + (((3 * b) + c) * d))",
+            "(289 + (((3 * 4) + c) * d))",
+        ])
+
+        expr = ExpressionParser("x + 1 + (x + 1) + 7 * 8 - 7 * 8", {}).run()
+        self.assertEqual(expr_intern(expr)[1], 6)
+
+    def test_powmod(self):
+        with_big = run_one("powmod(x + 1, 2 ** 100, 1000) * 2", {"x": BigNum(6)})
+        with_int = run_one("powmod(x + 1, 2 ** 100, 1000) * 2", {"x": int(6)}, int)
+        self.assertEqual(str(with_big), str(with_int))
+        self.assertEqual(with_int, pow(7, 2 ** 100, 1000) * 2)
+        expr = ExpressionParser("powmod(x, 3, 5)", {}).run()
+        self.assertEqual(expr.dump(), "powmod(x, 3, 5)")
+        with self.assertRaises(Exception):
+            run_one("powmod(2, 3, x)", {"x": BigNum(0)})
+        with self.assertRaises(Exception):
+            run_one("powmod(2, 3)", {})
+        with self.assertRaises(Exception):
+            run_one("powmod 2", {})
+
+        # a wrong result is detected, even when it is smaller than the modulo
+        expr = ExpressionParser("powmod(7, 5, 1000)", {}).run()
+        ResultVerifier([(FunctionOperator.POWMOD, (BigNum(7), BigNum(5), BigNum(1000)), (BigNum(807),))]).verify(
+            expr, {}, BigNum(807))
+        with self.assertRaises(Exception):
+            ResultVerifier([(FunctionOperator.POWMOD, (BigNum(7), BigNum(5), BigNum(1000)), (BigNum(808),))]).verify(
+                expr, {}, BigNum(808))
+
+    def test_fact_binom_gcd(self):
+        text = "fact 10 + binom(20, 10) * gcd(x, 84) + binom(3, 5) + fact (2 + 3)"
+        expected = math.factorial(10) + math.comb(20, 10) * math.gcd(36, 84) + 120
+        for verification in Verification:
+            self.assertEqual(str(run_one(text, {"x": BigNum(36)}, BigNum, verification)), str(expected))
+            self.assertEqual(run_one(text, {"x": 36}, int, verification), expected)
+        expr = ExpressionParser("fact x + binom(5, gcd(4, 6))", {}).run()
+        self.assertEqual(expr.dump(), "(fact x + binom(5, gcd(4, 6)))")
+        with self.assertRaises(Exception):
+            run_one("gcd(2)", {})
+        with local_context(maximum_digits=5):
+            with self.assertRaises(Exception):
+                run_one("fact 9", {})
+
+        # operands too big for a float estimate of the digits count are rejected by the digits limit
+        x, n, k = 10 ** 399 + 7, 10 ** 499 + 3, 10 ** 419 + 1
+        for backend in backend_names():
+            number_type = get_backend(backend)
+            variables = {"x": number_type(x), "n": number_type(n), "k": number_type(k)}
+            for text in ["fact x", "binom(n, k)", "binom(n, n - k)"]:
+                with self.assertRaisesRegex(Exception, "Maximum digits count reached!"):
+                    run_one(text, variables, number_type)
+
+        # the certificates of the new operators are checked too
+        expr = ExpressionParser("fact 4 + gcd(6, 4)", {}).run()
+        certificates = [(UnaryOperator.FACT, (BigNum(4),), (BigNum(24),)),
+                        (FunctionOperator.GCD, (BigNum(6), BigNum(4)), (BigNum(2),))]
+        ResultVerifier(certificates).verify(expr, {}, BigNum(26))
+        with self.assertRaises(Exception):
+            ResultVerifier([certificates[0], (FunctionOperator.GCD, (BigNum(6), BigNum(4)), (BigNum(4),))]).verify(
+                expr, {}, BigNum(28))
+
+    def test_root_ilog(self):
+        text = "root(x ** 3 + 5, 3) + ilog(x, 2) * 1000 + root(x, 1) + ilog(2 ** 100, 10)"
+        for verification in Verification:
+            self.assertEqual(str(run_one(text, {"x": BigNum(12345)}, BigNum, verification)), "37720")
+            self.assertEqual(run_one(text, {"x": 12345}, int, verification), 37720)
+        expr = ExpressionParser("root(x, 3) + ilog(x, 10)", {}).run()
+        self.assertEqual(expr.dump(), "(root(x, 3) + ilog(x, 10))")
+        for text in ["root(5, 0)", "ilog(0, 2)", "ilog(5, 1)", "root(5)"]:
+            with self.assertRaises(ValueError):
+                run_one(text, {})
+
+        # a root that is too small is detected by the final verification
+        expr = ExpressionParser("root(30, 3)", {}).run()
+        ResultVerifier([(FunctionOperator.ROOT, (BigNum(30), BigNum(3)), (BigNum(3), BigNum(3)))]).verify(expr, {}, BigNum(3))
+        with self.assertRaises(Exception):
+            ResultVerifier([(FunctionOperator.ROOT, (BigNum(30), BigNum(3)), (BigNum(2), BigNum(22)))]).verify(
+                expr, {}, BigNum(2))
+
+        # also when the degree is so big that the root can only be 0 or 1
+        expr = ExpressionParser("root(30, 40)", {}).run()
+        ResultVerifier([(FunctionOperator.ROOT, (BigNum(30), BigNum(40)), (BigNum(1), BigNum(29)))]).verify(
+            expr, {}, BigNum(1))
+        with self.assertRaises(Exception):
+            ResultVerifier([(FunctionOperator.ROOT, (BigNum(30), BigNum(40)), (BigNum(0), BigNum(30)))]).verify(
+                expr, {}, BigNum(0))
+
+    def test_verification(self):
+        text = "powmod(x, 5, 7) + 2 ** 3 * sqrt 50 / 3 - 100 % 7"
+        for verification in Verification:
+            with_big = run_one(text, {"x": BigNum(4)}, BigNum, verification)
+            with_int = run_one(text, {"x": int(4)}, int, verification)
+            self.assertEqual(str(with_big), str(with_int))
+            self.assertEqual(with_int, pow(4, 5, 7) + 2 ** 3 * 7 // 3 - 100 % 7)
+
+        # the verification works with limits smaller than the digits of the primes
+        with local_context(maximum_digits=3):
+            self.assertEqual(str(run_one("2 * 3 + 10 / 3", {})), "9")
+
+        # a wrong result or a wrong certificate is detected
+        expr = ExpressionParser("2 * 3 + 10 / 3", {}).run()
+        certificates = [(BinaryOperator.DIV, (BigNum(10), BigNum(3)), (BigNum(3), BigNum(1)))]
+        ResultVerifier(certificates).verify(expr, {}, BigNum(9))
+        with self.assertRaises(Exception):
+            ResultVerifier(certificates).verify(expr, {}, BigNum(10))
+        with self.assertRaises(Exception):
+            ResultVerifier([(BinaryOperator.DIV, (BigNum(10), BigNum(3)), (BigNum(2), BigNum(4)))]).verify(expr, {}, BigNum(8))
+
+    def test_concurrent_contexts(self):
+        # every evaluation has its own digits limit, the limit of one thread never leaks into another
+        barrier = threading.Barrier(8)
+
+        def evaluate(job):
+            limit = 5 + job % 20
+            context = EvaluationContext(maximum_digits=limit)
+            barrier.wait()
+            results = []
+            for power in range(1, 30):
+                try:
+                    results.append(str(run_one("10 ** p + x", {"p": BigNum(power), "x": BigNum(1)}, BigNum, context=context)))
+                except Exception:
+                    results.append(None)
+            return limit, results
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outcomes = list(executor.map(evaluate, range(64)))
+
+        for limit, results in outcomes:
+            expected = [str(10 ** power + 1) if power + 1 <= limit else None for power in range(1, 30)]
+            self.assertEqual(results, expected)
+
+        # the limit set in a local context is restored at exit and is not seen by other threads
+        maximum_digits = BigNum.exponent()
+        with local_context(maximum_digits=3):
+            self.assertEqual(BigNum.exponent(), 3)
+            with self.assertRaises(Exception):
+                run_one("999 + 1", {})
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(BigNum.exponent).result(), 1000)
+                self.assertEqual(str(executor.submit(run_one, "999 + 1", {}).result()), "1000")
+        self.assertEqual(BigNum.exponent(), maximum_digits)
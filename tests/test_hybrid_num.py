@@ -0,0 +1,42 @@
+import unittest
+from src.hybrid_num import HybridNum
+from src.bignum import BigNum, local_context
+from src.expr_parser import *
+
+
+class TestHybridNum(unittest.TestCase):
+
+    def test_promotion(self):
+        a = HybridNum(2 ** 62)
+        self.assertFalse(a.is_promoted())
+        b = a * 4
+        self.assertTrue(b.is_promoted())
+        self.assertEqual(str(b), str(2 ** 64))
+        c = b // 8
+        self.assertFalse(c.is_promoted())
+        self.assertEqual(str(c), str(2 ** 61))
+        self.assertEqual(hash(b), hash(2 ** 64))
+        self.assertEqual(str(HybridNum("123456789012345678901234")), "123456789012345678901234")
+        for value in ["12a", "", -1]:
+            with self.assertRaises(BaseException):
+                HybridNum(value)
+        with local_context(maximum_digits=3):
+            with self.assertRaises(Exception):
+                HybridNum("1000")
+            with self.assertRaises(Exception):
+                HybridNum(999) + 1
+
+    def test_solver(self):
+        text = "powmod(x, 5, 7) + 2 ** 70 * sqrt 50 / 3 - 100 % 7 + x * 12345678901234567"
+        for verification in Verification:
+            with_hybrid = run_one(text, {"x": HybridNum(4)}, HybridNum, verification)
+            with_big = run_one(text, {"x": BigNum(4)}, BigNum, verification)
+            self.assertEqual(str(with_hybrid), str(with_big))
+        with local_context(maximum_digits=3):
+            self.assertEqual(str(run_one("2 + 3", {}, HybridNum)), "5")
+            with self.assertRaises(Exception):
+                run_one("999 + 1", {}, HybridNum)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,42 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 from src.ui_bridge import *
 
 class UiBridgeTestCases(unittest.TestCase):
     def test_one_and_only_usecase(self):
         backend = BackendBridge()
         (result, output) = backend.compute_data("1+a", [("a", 1)], 10)
-        self.assertEqual(result, "2")
\ No newline at end of file
+        self.assertEqual(result, "2")
+        self.assertEqual(output, "(1 + a)\n(1 + 1)\n2\n")
+
+    def test_exponent(self):
+        backend = BackendBridge()
+        self.assertEqual(backend.exponent(), str(BigNum.exponent()))
+        backend.compute_data("1+a", [("a", 1)], 25)
+        self.assertEqual(backend.exponent(), "25")
+        self.assertEqual(BackendBridge().exponent(), str(BigNum.exponent()))
+
+    def test_trace_granularity(self):
+        backend = BackendBridge()
+        (result, output) = backend.compute_data("1+a*a", [("a", 3)], 10, trace=False)
+        self.assertEqual((result, output), ("10", ""))
+        (result, output) = backend.compute_data("1+a*a", [("a", 3)], 10, every=2)
+        self.assertEqual((result, output), ("10", "(1 + (a * a))\n(1 + (3 * 3))\n10\n"))
+
+    def test_save_streams_steps(self):
+        backend = BackendBridge()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "output.xml")
+            # the expression is evaluated once, by the traced run
+            with mock.patch("src.ui_bridge.expr_steps", wraps=expr_steps) as steps, \
+                    mock.patch("src.ui_bridge.expr_evaluate", side_effect=AssertionError("evaluated twice")):
+                (result, output) = backend.save_data(path, "1+a*a", [("a", "3")], 10, every=2)
+            self.assertEqual(steps.call_count, 1)
+            self.assertEqual((result, output), backend.compute_data("1+a*a", [("a", "3")], 10, every=2))
+            with open(path) as fd:
+                self.assertEqual(fd.read(), "<math>\n\t<expression>\n\t\t1+a*a\n\t</expression>\n\t"
+                                            "<variables>\n\t\t<var a=\"3\" />\n\t </variables>"
+                                            "\n\t<output>\n\t\t(1 + (a * a))\n\t\t(1 + (3 * 3))\n\t\t10\n\t</output>"
+                                            "\n\t<result>\n\t\t10\n\t</result>\n</math>")